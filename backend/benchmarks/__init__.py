@@ -0,0 +1,5 @@
+"""
+性能基准测试包
+
+包含本地模拟的LLM服务和各项性能基准脚本，无需消耗真实的API额度。
+"""
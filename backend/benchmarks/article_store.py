@@ -0,0 +1,112 @@
+"""
+文章存储基准测试
+
+向临时数据库批量写入大量模拟文章，然后对比：
+- 通过FTS5全文索引搜索（/article/history/search 使用的方式）
+- 逐篇扫描文章内容（相当于在 output 目录中 grep）
+
+用法：
+    python -m backend.benchmarks.article_store --articles 20000 --queries 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from backend.benchmarks.common import summarize, use_stub_provider
+
+# 常用汉字，用于生成模拟文章的词汇
+CHARS = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经"
+    "十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严龙飞"
+)
+
+def make_words(rng: random.Random, count: int) -> List[str]:
+    """生成由两个汉字组成的词汇表"""
+    return ["".join(rng.sample(CHARS, 2)) for _ in range(count)]
+
+def make_content(rng: random.Random, words: List[str], index: int) -> str:
+    """生成一篇模拟文章"""
+    title = "".join(rng.sample(words, 3))
+    paragraphs = [
+        "，".join(rng.choice(words) for _ in range(30)) + "。"
+        for _ in range(8)
+    ]
+    return f"# {title}{index}\n\n" + "\n\n".join(paragraphs)
+
+async def run(articles: int, queries: int, directory: str) -> dict:
+    """执行基准测试并返回结果"""
+    from backend.models.article import Article
+    from backend.services.article_store import ArticleStore
+
+    rng = random.Random(42)
+    words = make_words(rng, 5000)
+    store = ArticleStore(os.path.join(directory, "articles.db"), batch_size=500, flush_interval=0.05)
+    contents: List[str] = []
+
+    start = time.perf_counter()
+    for index in range(articles):
+        content = make_content(rng, words, index)
+        contents.append(content)
+        store.add(Article(
+            title=Article.title_from_content(content),
+            content=content,
+            directions=[],
+            description=f"模拟文章 {index}",
+            provider="monica",
+            model="stub"
+        ))
+    await store.flush()
+    write_seconds = time.perf_counter() - start
+
+    terms = [" ".join(rng.sample(words, 2)) for _ in range(queries)]
+
+    fts: List[float] = []
+    for query in terms:
+        start = time.perf_counter()
+        await store.search(query, page_size=20)
+        fts.append(time.perf_counter() - start)
+
+    scan: List[float] = []
+    for query in terms[:max(1, queries // 10)]:
+        keywords = query.split()
+        start = time.perf_counter()
+        [content for content in contents if all(keyword in content for keyword in keywords)]
+        scan.append(time.perf_counter() - start)
+
+    return {
+        "articles": articles,
+        "write": {
+            "seconds": round(write_seconds, 2),
+            "articles_per_second": round(articles / write_seconds),
+            "batches": store.batches,
+        },
+        "fts_search": summarize(fts),
+        # 内存中的扫描，不含读取文件的IO，实际 grep 目录更慢
+        "scan": summarize(scan),
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="文章存储基准测试")
+    parser.add_argument("--articles", type=int, default=20000, help="写入的文章数")
+    parser.add_argument("--queries", type=int, default=200, help="搜索次数")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # 只测量本地存储，不发送请求
+    use_stub_provider("monica", "http://127.0.0.1:9")
+    with tempfile.TemporaryDirectory() as directory:
+        result = asyncio.run(run(args.articles, args.queries, directory))
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
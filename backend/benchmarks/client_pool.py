@@ -0,0 +1,96 @@
+"""
+API客户端连接池基准测试
+
+对比两种方式调用本地模拟LLM服务的延迟分布：
+- per_request: 每个请求新建一个提供商客户端（旧的做法，每次都要建立新连接）
+- pooled: 从 ClientRegistry 获取共享客户端，复用连接池中的长连接
+
+本地模拟服务使用明文HTTP，省下的只有TCP建连开销；
+对真实的HTTPS端点，节省的TLS握手时间会更明显。
+
+用法：
+    python -m backend.benchmarks.client_pool --provider monica --requests 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Callable, List
+
+from backend.benchmarks.common import summarize, use_stub_provider
+from backend.benchmarks.stub_server import StubLLMServer
+
+async def measure(get_client: Callable, requests: int, concurrency: int) -> List[float]:
+    """
+    以给定并发数发起请求，返回每个请求的延迟
+
+    Args:
+        get_client: 每个请求获取客户端的函数
+        requests: 请求总数
+        concurrency: 并发数
+
+    Returns:
+        List[float]: 每个请求的延迟（秒）
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    created = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            client = get_client()
+            await client.call_api(prompt="ping")
+            latencies.append(time.perf_counter() - start)
+            created.append(client)
+
+    await asyncio.gather(*[one() for _ in range(requests)])
+
+    # 测量结束后再释放连接，不计入延迟
+    for client in set(created):
+        await client.aclose()
+    return latencies
+
+async def run(provider: str, requests: int, concurrency: int) -> dict:
+    """执行基准测试并返回结果"""
+    from backend.utils.api_client import APIClientFactory, ClientRegistry
+
+    per_request = await measure(
+        lambda: APIClientFactory.create_client(provider),
+        requests,
+        concurrency
+    )
+    pooled = await measure(
+        lambda: ClientRegistry.get(provider),
+        requests,
+        concurrency
+    )
+    await ClientRegistry.aclose_all()
+
+    return {
+        "provider": provider,
+        "per_request": summarize(per_request),
+        "pooled": summarize(pooled),
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="API客户端连接池基准测试")
+    parser.add_argument("--provider", default="monica", choices=["monica", "zhipu"])
+    parser.add_argument("--requests", type=int, default=200, help="请求总数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--delay", type=float, default=0.02, help="模拟服务的单请求延迟（秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with StubLLMServer(delay=args.delay) as server:
+        use_stub_provider(args.provider, server.url)
+        result = asyncio.run(run(args.provider, args.requests, args.concurrency))
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
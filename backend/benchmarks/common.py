@@ -0,0 +1,77 @@
+"""
+基准测试公共工具
+
+提供延迟统计等各基准脚本共用的辅助函数。
+"""
+
+import math
+import os
+from typing import Dict, List
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 样本列表
+        p: 百分位，取值范围 0-100
+
+    Returns:
+        float: 对应的百分位数，样本为空时返回0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    汇总延迟样本
+
+    Args:
+        latencies: 延迟样本（秒）
+
+    Returns:
+        Dict[str, float]: 包含样本数、p50、p99、平均值（毫秒）的字典
+    """
+    count = len(latencies)
+    return {
+        "count": count,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+    }
+
+def use_stub_provider(provider: str, url: str) -> None:
+    """
+    把指定提供商指向本地模拟服务
+
+    必须在创建 Config 单例之前调用。
+
+    Args:
+        provider: AI提供商类型，如"monica"或"zhipu"
+        url: 模拟服务的基础URL
+    """
+    os.environ["AI_PROVIDER"] = provider
+    os.environ["MONICA_API_KEY"] = "bench-key"
+    os.environ["MONICA_API_ENDPOINT"] = url
+    # 智谱SDK要求 id.secret 格式的密钥
+    os.environ["ZHIPU_API_KEY"] = "bench.secret"
+    os.environ["ZHIPU_API_ENDPOINT"] = url
+    os.environ["CACHE_ENABLED"] = "false"
+
+def use_mock_provider(**settings: object) -> None:
+    """
+    把默认提供商设为模拟提供商（不发送网络请求）
+
+    必须在创建 Config 单例之前调用。
+
+    Args:
+        **settings: 其他配置项，如 MOCK_LATENCY_MEAN=0.1
+    """
+    os.environ["AI_PROVIDER"] = "mock"
+    os.environ["MOCK_ENABLED"] = "true"
+    os.environ["CACHE_ENABLED"] = "false"
+    for key, value in settings.items():
+        os.environ[key] = str(value)
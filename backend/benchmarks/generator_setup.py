@@ -0,0 +1,78 @@
+"""
+文章生成器的单请求准备开销基准测试
+
+对比两种方式在每个请求上花费的准备时间（不包括生成本身）：
+- 每个请求新建 ArticleGenerator（读取配置、创建缓存和API客户端）
+- 使用进程内共享的生成器，按提供商取出已创建的客户端
+
+用法：
+    python -m backend.benchmarks.generator_setup --iterations 20000
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable, List
+
+from backend.benchmarks.common import percentile, use_stub_provider
+
+def measure(setup: Callable[[], object], iterations: int) -> List[float]:
+    """重复执行准备步骤，返回每次的耗时（秒）"""
+    latencies: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        setup()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def summarize_us(latencies: List[float]) -> dict:
+    """汇总延迟样本，准备开销很小，以微秒为单位"""
+    return {
+        "count": len(latencies),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 2),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 2),
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 2),
+    }
+
+def run(provider: str, iterations: int) -> dict:
+    """执行基准测试并返回结果"""
+    from backend.services.article_generator import ArticleGenerator
+
+    def per_request():
+        generator = ArticleGenerator()
+        return generator.client_for(provider)
+
+    def shared():
+        return ArticleGenerator.get_instance().client_for(provider)
+
+    # 预热：创建共享的缓存后端、客户端注册表和共享实例
+    per_request()
+    shared()
+
+    per_request_latencies = measure(per_request, iterations)
+    shared_latencies = measure(shared, iterations)
+    return {
+        "provider": provider,
+        "iterations": iterations,
+        "per_request": summarize_us(per_request_latencies),
+        "shared": summarize_us(shared_latencies),
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="文章生成器准备开销基准测试")
+    parser.add_argument("--provider", default="monica", choices=["monica", "zhipu"])
+    parser.add_argument("--iterations", type=int, default=20000, help="每种方式的重复次数")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # 只测量准备开销，不发送请求，模拟服务地址不需要可用
+    use_stub_provider(args.provider, "http://127.0.0.1:9")
+    result = run(args.provider, args.iterations)
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
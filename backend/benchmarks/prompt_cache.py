@@ -0,0 +1,76 @@
+"""
+提供商提示词缓存基准测试
+
+对本地模拟LLM服务生成多篇不同描述的文章，按 /metrics 中的token计数器统计每篇文章的
+输入token构成。模拟服务和真实提供商一样对相同的消息前缀计为缓存命中，
+固定的系统提示词放在最前面时，除第一篇外的输入token大部分应计入 input_cached。
+
+用法：
+    python -m backend.benchmarks.prompt_cache --provider monica --articles 20
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict
+
+from backend.benchmarks.common import use_stub_provider
+from backend.benchmarks.stub_server import StubLLMServer
+
+def token_totals(provider: str) -> Dict[str, float]:
+    """读取进程内token计数器的当前值"""
+    from backend.utils.metrics import LLM_TOKENS
+
+    totals = {"input_cached": 0.0, "input_uncached": 0.0, "output": 0.0}
+    for metric in LLM_TOKENS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total") and sample.labels.get("provider") == provider:
+                totals[sample.labels["direction"]] += sample.value
+    return totals
+
+async def run(provider: str, articles: int, concurrency: int) -> dict:
+    """执行基准测试并返回结果"""
+    from backend.services.article_generator import ArticleGenerator
+
+    generator = ArticleGenerator(provider)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        async with semaphore:
+            await generator.generate_content(f"提示词缓存测试文章 {index}")
+
+    # 第一篇单独生成，让模拟服务缓存系统提示词
+    await one(0)
+    await asyncio.gather(*[one(i) for i in range(1, articles)])
+
+    totals = token_totals(provider)
+    input_tokens = totals["input_cached"] + totals["input_uncached"]
+    return {
+        "provider": provider,
+        "articles": articles,
+        "input_tokens_per_article": round(input_tokens / articles, 1),
+        "cached_input_tokens_per_article": round(totals["input_cached"] / articles, 1),
+        "uncached_input_tokens_per_article": round(totals["input_uncached"] / articles, 1),
+        "cached_ratio": round(totals["input_cached"] / input_tokens, 3) if input_tokens else 0.0,
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="提供商提示词缓存基准测试")
+    parser.add_argument("--provider", default="monica", choices=["monica", "zhipu"])
+    parser.add_argument("--articles", type=int, default=20, help="生成的文章数")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发数")
+    parser.add_argument("--delay", type=float, default=0.05, help="模拟服务的单请求延迟（秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with StubLLMServer(delay=args.delay) as server:
+        use_stub_provider(args.provider, server.url)
+        result = asyncio.run(run(args.provider, args.articles, args.concurrency))
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+容错基准测试
+
+主提供商（monica）指向按比例注入503错误的模拟服务，备用提供商（zhipu）指向正常的模拟服务，
+分别在以下配置下发起请求，比较错误率和尾延迟：
+- no_retry: 不重试
+- retry: 指数退避重试
+- retry_failover: 重试失败后故障转移到备用提供商
+
+用法：
+    python -m backend.benchmarks.resilience --error-rate 0.3 --requests 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from backend.benchmarks.common import summarize, use_stub_provider
+from backend.benchmarks.stub_server import StubLLMServer
+
+async def scenario(
+    requests: int,
+    concurrency: int,
+    max_retries: int,
+    failover: bool
+) -> dict:
+    """执行一种配置并返回错误率和延迟统计"""
+    from backend.utils.api_client import ClientRegistry
+    from backend.utils.api_client.resilience import ProviderHealth, ResilientAPIClient, RetryPolicy
+
+    # 每种配置使用全新的熔断器和重试预算
+    ProviderHealth._providers.clear()
+    policy = RetryPolicy(max_retries=max_retries, base_delay=0.05, max_delay=1.0)
+    fallback = (lambda: ResilientAPIClient("zhipu", ClientRegistry.get("zhipu"))) if failover else None
+    client = ResilientAPIClient("monica", ClientRegistry.get("monica"), fallback=fallback, policy=policy)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.call_api(prompt="ping")
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*[one() for _ in range(requests)])
+    result = summarize(latencies)
+    result["error_rate"] = round(errors / requests, 4)
+    result["health"] = ProviderHealth.stats()
+    return result
+
+async def run(requests: int, concurrency: int, max_retries: int) -> dict:
+    """依次执行各配置"""
+    from backend.utils.api_client import ClientRegistry
+
+    result = {
+        "no_retry": await scenario(requests, concurrency, 0, False),
+        "retry": await scenario(requests, concurrency, max_retries, False),
+        "retry_failover": await scenario(requests, concurrency, max_retries, True),
+    }
+    await ClientRegistry.aclose_all()
+    return result
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="容错基准测试")
+    parser.add_argument("--requests", type=int, default=200, help="每种配置的请求数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--error-rate", type=float, default=0.3, help="主提供商的错误率")
+    parser.add_argument("--max-retries", type=int, default=3, help="重试配置下的最大重试次数")
+    parser.add_argument("--delay", type=float, default=0.05, help="模拟服务的单请求延迟（秒）")
+    parser.add_argument("--budget-ratio", type=float, default=1.0, help="重试预算比例（RETRY_BUDGET_RATIO）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    with StubLLMServer(delay=args.delay, error_rate=args.error_rate) as flaky, \
+            StubLLMServer(delay=args.delay) as healthy:
+        use_stub_provider("monica", flaky.url)
+        os.environ["ZHIPU_API_ENDPOINT"] = healthy.url
+        # 提高熔断阈值，让对比集中在重试和故障转移的效果上
+        os.environ.setdefault("CIRCUIT_FAILURE_THRESHOLD", "20")
+        os.environ["RETRY_BUDGET_RATIO"] = str(args.budget_ratio)
+        result = asyncio.run(run(args.requests, args.concurrency, args.max_retries))
+
+    for name, value in result.items():
+        print(f"{name}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+自动路由和对冲请求基准测试
+
+启动两个本地模拟LLM服务分别作为 monica 和 zhipu：
+- monica 平时更快，但有一小部分请求很慢（长尾延迟）
+- zhipu 稍慢但稳定
+
+依次测量只用 monica、只用 zhipu、model_type=auto（不对冲）和 auto + 对冲请求的延迟。
+auto 会选择p50更低的 monica，对冲请求在 monica 超过其p95仍未返回时改发给 zhipu，
+用少量额外调用压低p99。
+
+用法：
+    python -m backend.benchmarks.routing --requests 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import List
+
+from backend.benchmarks.common import summarize, use_stub_provider
+from backend.benchmarks.stub_server import StubLLMServer
+
+async def measure(model_type: str, requests: int, concurrency: int) -> List[float]:
+    """以指定并发发送请求，返回每个请求的耗时（秒）"""
+    from backend.utils.api_client import APIClient
+
+    client = APIClient(model_type)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await client.call_api(prompt=f"路由测试 {i}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+async def run(requests: int, concurrency: int) -> dict:
+    """执行基准测试并返回结果"""
+    from backend.config import Config
+    from backend.utils.api_client import ClientRegistry
+
+    config = Config.get_instance()
+    result = {}
+    # 单提供商的测量同时为自动路由积累延迟统计
+    for name, model_type, hedge in [
+        ("monica", "monica", False),
+        ("zhipu", "zhipu", False),
+        ("auto", "auto", False),
+        ("auto_hedge", "auto", True),
+    ]:
+        config.AUTO_HEDGE_ENABLED = hedge
+        latencies = await measure(model_type, requests, concurrency)
+        result[name] = summarize(latencies)
+
+    router = ClientRegistry.get("auto")
+    result["auto_routing"] = router.stats()
+    await ClientRegistry.aclose_all()
+    return result
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="自动路由和对冲请求基准测试")
+    parser.add_argument("--requests", type=int, default=200, help="每种方式的请求数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发请求数")
+    parser.add_argument("--fast-delay", type=float, default=0.1, help="monica 的常规延迟（秒）")
+    parser.add_argument("--slow-rate", type=float, default=0.04, help="monica 慢请求的概率")
+    parser.add_argument("--slow-delay", type=float, default=1.5, help="monica 慢请求额外增加的延迟（秒）")
+    parser.add_argument("--steady-delay", type=float, default=0.2, help="zhipu 的延迟（秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    fast = StubLLMServer(delay=args.fast_delay, slow_rate=args.slow_rate, slow_delay=args.slow_delay)
+    steady = StubLLMServer(delay=args.steady_delay)
+    with fast, steady:
+        use_stub_provider("monica", fast.url)
+        os.environ["ZHIPU_API_ENDPOINT"] = steady.url
+        # 关闭随机探索，使 auto 的结果可重复
+        os.environ["AUTO_EXPLORE_RATE"] = "0"
+        result = asyncio.run(run(args.requests, args.concurrency))
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+语义近似缓存基准测试
+
+向临时的SQLite索引写入大量随机描述，然后测量：
+- 对已有描述做细微改动（空白、全角标点、大小写）后的查询延迟和命中率
+- 对全新描述查询时的误命中率
+
+用法：
+    python -m backend.benchmarks.semantic_cache --entries 100000 --queries 1000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from backend.benchmarks.common import summarize
+from backend.utils.semantic_cache import SemanticCacheIndex
+
+# 用于拼接随机描述的常用汉字
+_CHARS = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经"
+    "十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+)
+
+def random_description(rng: random.Random, length: int) -> str:
+    """生成一段随机描述"""
+    return "".join(rng.choice(_CHARS) for _ in range(length))
+
+def perturb(rng: random.Random, text: str) -> str:
+    """对描述做细微改动：插入空白、全角标点和大小写不同的英文"""
+    pos = rng.randrange(len(text))
+    return f"  {text[:pos]}，{text[pos:]} AI。 "
+
+def run(entries: int, queries: int, threshold: float, ngram: int, length: int) -> dict:
+    """执行基准测试并返回结果"""
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SemanticCacheIndex(
+            os.path.join(tmp, "semantic.db"),
+            threshold=threshold,
+            ngram=ngram,
+            max_entries=entries * 2,
+            expire_time=3600
+        )
+        # 临时索引不需要持久化保证，关闭fsync加快写入
+        index._db.conn.execute("PRAGMA synchronous=OFF")
+
+        texts: List[str] = []
+        start = time.perf_counter()
+        for i in range(entries):
+            text = random_description(rng, length) + " ai"
+            texts.append(text)
+            index.add("bench", text, f"key-{i}")
+        build_seconds = time.perf_counter() - start
+
+        near_latencies: List[float] = []
+        near_hits = 0
+        for i in rng.sample(range(entries), min(queries, entries)):
+            query = perturb(rng, texts[i])
+            start = time.perf_counter()
+            key = index.lookup("bench", query)
+            near_latencies.append(time.perf_counter() - start)
+            near_hits += key == f"key-{i}"
+
+        new_latencies: List[float] = []
+        false_hits = 0
+        for _ in range(queries):
+            query = random_description(rng, length)
+            start = time.perf_counter()
+            false_hits += index.lookup("bench", query) is not None
+            new_latencies.append(time.perf_counter() - start)
+
+    return {
+        "entries": entries,
+        "build_seconds": round(build_seconds, 2),
+        "near_duplicate_lookup": summarize(near_latencies),
+        "near_duplicate_hit_rate": round(near_hits / len(near_latencies), 4),
+        "new_lookup": summarize(new_latencies),
+        "false_hit_rate": round(false_hits / queries, 4),
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="语义近似缓存基准测试")
+    parser.add_argument("--entries", type=int, default=100000, help="索引中的条目数")
+    parser.add_argument("--queries", type=int, default=1000, help="每种查询的次数")
+    parser.add_argument("--threshold", type=float, default=0.85, help="相似度阈值")
+    parser.add_argument("--ngram", type=int, default=3, help="n-gram的字符数")
+    parser.add_argument("--length", type=int, default=60, help="随机描述的字数")
+    args = parser.parse_args()
+
+    result = run(args.entries, args.queries, args.threshold, args.ngram, args.length)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
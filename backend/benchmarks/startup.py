@@ -0,0 +1,108 @@
+"""
+应用启动耗时基准测试
+
+同时启动多个子进程模拟 uvicorn --workers N 的冷启动，每个子进程导入 backend.main 并执行
+lifespan 的启动阶段，记录：
+- import: 导入 backend.main 的耗时
+- ready: 从开始导入到 lifespan 启动完成（可以处理请求）的耗时
+- process: 从创建进程到就绪的耗时，包括解释器启动
+- sdks: 就绪时已加载的提供商SDK，只应包含正在使用的提供商
+
+不发送任何请求，API密钥为假值。
+
+用法：
+    python -m backend.benchmarks.startup --provider monica --workers 8 --rounds 3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from backend.benchmarks.common import summarize, use_mock_provider, use_stub_provider
+
+# 提供商SDK的顶层模块
+SDK_MODULES = ["openai", "zhipuai", "httpx"]
+
+def child() -> None:
+    """子进程：导入应用并执行启动阶段，向标准输出打印一行JSON"""
+    async def start() -> dict:
+        from backend.main import app, startup_seconds
+
+        async with app.router.lifespan_context(app):
+            return {
+                "import": startup_seconds["import"],
+                "ready": startup_seconds["ready"],
+                "sdks": [name for name in SDK_MODULES if name in sys.modules],
+                # 与父进程比较的时间点，使用系统时间
+                "ready_at": time.time(),
+            }
+
+    print(json.dumps(asyncio.run(start())), flush=True)
+
+def start_workers(workers: int) -> List[dict]:
+    """同时启动指定数量的子进程，返回每个子进程的结果"""
+    started = time.time()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "backend.benchmarks.startup", "--child"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    for process in processes:
+        line = process.stdout.readline()
+        process.wait()
+        if not line:
+            raise RuntimeError(f"子进程启动失败，退出码: {process.returncode}")
+        result = json.loads(line)
+        result["process"] = result.pop("ready_at") - started
+        results.append(result)
+    return results
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="应用启动耗时基准测试")
+    parser.add_argument("--provider", default="monica", choices=["monica", "zhipu", "mock"], help="AI_PROVIDER")
+    parser.add_argument("--workers", type=int, default=8, help="同时启动的worker进程数")
+    parser.add_argument("--rounds", type=int, default=3, help="重复次数")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.provider == "mock":
+            use_mock_provider()
+        else:
+            # 启动阶段只创建客户端，不会连接这个地址
+            use_stub_provider(args.provider, "http://127.0.0.1:9")
+        os.environ["ENVIRONMENT"] = "production"
+        os.environ["ARTICLE_STORE_DB_PATH"] = os.path.join(directory, "articles.db")
+        os.environ["JOB_QUEUE_BACKEND"] = "memory"
+
+        results: List[dict] = []
+        for _ in range(args.rounds):
+            results.extend(start_workers(args.workers))
+
+    print(f"provider: {args.provider}")
+    print(f"workers: {args.workers}")
+    for key in ("import", "ready", "process"):
+        print(f"{key}: {summarize([r[key] for r in results])}")
+    print(f"sdks: {sorted({name for r in results for name in r['sdks']})}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+本地模拟LLM服务
+
+提供兼容 OpenAI / 智谱 的 /chat/completions 接口，按配置的延迟返回固定内容，
+支持 stream=True 的SSE流式返回、按比例注入错误和慢请求（长尾延迟），
+用于在不消耗真实API额度的情况下进行并发、延迟和容错测试。
+
+usage 按字符数计算token，并模拟提供商的前缀缓存：请求开头与之前请求相同的消息
+计入 prompt_tokens_details.cached_tokens。
+
+用法：
+    python -m backend.benchmarks.stub_server --port 8900 --delay 2
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_CONTENT = "# 模拟文章\n\n" + "这是一段由本地模拟服务返回的文章内容。\n\n" * 20
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """客户端提前断开（如对冲请求取消了较慢的调用）时不打印异常堆栈"""
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+class StubLLMServer:
+    """
+    本地模拟LLM服务
+
+    在后台线程中运行一个多线程HTTP服务，每个请求睡眠 delay 秒后返回。
+
+    属性：
+        host: 监听地址
+        port: 监听端口，为0时自动分配
+        delay: 每个请求的模拟延迟（秒），流式请求时平均分摊到每个片段
+        content: 返回的文章内容
+        chunks: 流式返回时的片段数量
+        error_rate: 返回错误响应的概率，取值范围 0-1
+        error_status: 注入错误时返回的HTTP状态码
+        slow_rate: 请求变慢的概率，取值范围 0-1，用于模拟长尾延迟
+        slow_delay: 慢请求额外增加的延迟（秒），流式请求时加在第一个片段之前
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 1.0,
+        content: str = DEFAULT_CONTENT,
+        chunks: int = 20,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        slow_rate: float = 0.0,
+        slow_delay: float = 0.0
+    ):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.content = content
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.request_count = 0
+        self.error_count = 0
+        self._lock = threading.Lock()
+        self._prefixes: set = set()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """服务的基础URL，可直接作为 MONICA_API_ENDPOINT / ZHIPU_API_ENDPOINT 使用"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                # 关闭默认的访问日志，避免干扰测试输出
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.request_count += 1
+
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                if random.random() < stub.error_rate:
+                    with stub._lock:
+                        stub.error_count += 1
+                    self._send_json(stub.error_status, {"error": {"message": "injected failure"}})
+                    return
+
+                extra = stub.slow_delay if random.random() < stub.slow_rate else 0.0
+                if body.get("stream"):
+                    self._send_stream(body, extra)
+                    return
+
+                time.sleep(stub.delay + extra)
+                self._send_json(200, stub._completion(body))
+
+            def _send_stream(self, body: dict, extra: float = 0.0):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                time.sleep(extra)
+                for piece in stub._split_content():
+                    time.sleep(stub.delay / stub.chunks)
+                    chunk = stub._chunk(body, piece)
+                    data = json.dumps(chunk, ensure_ascii=False)
+                    self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                # 最后一个片段只包含usage
+                usage_chunk = dict(stub._chunk(body, ""), choices=[], usage=stub._usage(body))
+                data = json.dumps(usage_chunk, ensure_ascii=False)
+                self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_json(self, status: int, data: dict):
+                payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def _completion(self, body: dict) -> dict:
+        """构造非流式的完成响应"""
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.content},
+                    "finish_reason": "stop"
+                }
+            ],
+            "usage": self._usage(body)
+        }
+
+    def _usage(self, body: dict) -> dict:
+        """按字符数计算token用量，开头与之前请求相同的消息计为缓存命中"""
+        prompt_tokens = 0
+        cached_tokens = 0
+        prefix = hashlib.sha256()
+        hit = True
+        with self._lock:
+            for message in body.get("messages", []):
+                prefix.update(json.dumps(message, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+                key = prefix.hexdigest()
+                content = message.get("content") or ""
+                if isinstance(content, list):
+                    content = "".join(item.get("text", "") for item in content if isinstance(item, dict))
+                hit = hit and key in self._prefixes
+                if hit:
+                    cached_tokens += len(content)
+                prompt_tokens += len(content)
+                self._prefixes.add(key)
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(self.content),
+            "total_tokens": prompt_tokens + len(self.content),
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+
+    def _split_content(self) -> list:
+        """把返回内容切分为 chunks 个片段"""
+        size = max(1, -(-len(self.content) // self.chunks))
+        return [self.content[i:i + size] for i in range(0, len(self.content), size)]
+
+    def _chunk(self, body: dict, piece: str) -> dict:
+        """构造流式响应的单个片段"""
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": piece},
+                    "finish_reason": None
+                }
+            ]
+        }
+
+    def start(self) -> "StubLLMServer":
+        """在后台线程中启动服务"""
+        self._server = _QuietHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main():
+    """命令行入口：前台运行模拟服务"""
+    parser = argparse.ArgumentParser(description="本地模拟LLM服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--delay", type=float, default=1.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回错误响应的概率")
+    parser.add_argument("--error-status", type=int, default=503, help="注入错误时的HTTP状态码")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="慢请求的概率")
+    parser.add_argument("--slow-delay", type=float, default=0.0, help="慢请求额外增加的延迟（秒）")
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        host=args.host,
+        port=args.port,
+        delay=args.delay,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay
+    ).start()
+    print(f"模拟LLM服务已启动: {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
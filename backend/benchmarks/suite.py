@@ -0,0 +1,303 @@
+"""
+离线基准测试套件
+
+使用模拟提供商（AI_PROVIDER=mock），不发送任何外部请求，依次测量：
+- cache: Cache 的 aset、命中内存层的 aget 和未命中的 aget（tiered 后端，数据库在临时目录）
+- cache_key: ArticleGenerator._get_cache_key
+- prompt: ArticleGenerator._build_content_messages
+- generate: 以 1~N 个并发worker持续请求 /article/generate 的吞吐量和延迟
+
+结果以JSON输出，用 --out 保存后，下次运行时通过 --baseline 对比，
+延迟变长或吞吐量下降超过 --threshold 的指标列在 regressions 中，此时退出码为1。
+
+端到端测试默认在进程内调用应用；指定 --url 时改为请求已启动的服务，
+例如用 uvicorn --workers N 启动 AI_PROVIDER=mock 的服务来测量多进程的扩展性。
+生成的文章和正常请求一样写入 output 目录。
+
+用法：
+    python -m backend.benchmarks.suite --workers 1,4,16 --requests 200 --out bench.json
+    python -m backend.benchmarks.suite --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.benchmarks.common import percentile, summarize, use_mock_provider
+
+def micro(latencies: List[float]) -> Dict[str, float]:
+    """
+    汇总微基准的样本
+
+    Args:
+        latencies: 每次操作的耗时（秒）
+
+    Returns:
+        Dict[str, float]: 包含样本数、p50、p99、平均值（微秒）和每秒操作数的字典
+    """
+    count = len(latencies)
+    total = sum(latencies)
+    return {
+        "count": count,
+        "p50_us": round(percentile(latencies, 50) * 1e6, 2),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 2),
+        "mean_us": round(total / count * 1e6, 2) if count else 0.0,
+        "ops_per_second": round(count / total) if total else 0,
+    }
+
+def time_sync(fn: Callable[[int], Any], iterations: int) -> Dict[str, float]:
+    """逐次计时执行同步操作"""
+    latencies: List[float] = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return micro(latencies)
+
+async def time_async(fn: Callable[[int], Any], iterations: int) -> Dict[str, float]:
+    """逐次计时执行异步操作"""
+    latencies: List[float] = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await fn(i)
+        latencies.append(time.perf_counter() - start)
+    return micro(latencies)
+
+async def bench_cache(iterations: int) -> Dict[str, Any]:
+    """测量 Cache 的读写"""
+    from backend.utils.cache import Cache
+
+    cache = Cache()
+    value = {"content": "模拟文章" * 500}
+    result = {"backend": cache.backend.name}
+    result["aset"] = await time_async(lambda i: cache.aset(f"bench:{i}", value), iterations)
+    # 内存层只保留最近的条目，命中测试读取最后写入的键
+    recent = min(iterations, cache.config.CACHE_MEMORY_MAX_ENTRIES)
+    result["aget_hit"] = await time_async(lambda i: cache.aget(f"bench:{iterations - 1 - i % recent}"), iterations)
+    result["aget_miss"] = await time_async(lambda i: cache.aget(f"bench:missing:{i}"), iterations)
+    return result
+
+def bench_generator(iterations: int) -> Dict[str, Any]:
+    """测量缓存键计算和提示词构建"""
+    from backend.services.article_generator import CONTENT_TEMPLATE, ArticleGenerator
+    from backend.services.prompts import PromptRegistry
+
+    generator = ArticleGenerator.get_instance()
+    route = generator.resolve_model()
+    template_key = PromptRegistry.get(CONTENT_TEMPLATE).key
+    description = "如何在工作之余坚持跑步并养成长期的运动习惯"
+    return {
+        "cache_key": time_sync(
+            lambda i: generator._get_cache_key(route, "content", template_key, f"{description}{i}", "坚持"),
+            iterations
+        ),
+        "prompt": time_sync(lambda i: generator._build_content_messages(f"{description}{i}", "坚持"), iterations),
+    }
+
+async def bench_generate(client: Any, workers: int, requests: int, tag: str) -> Dict[str, Any]:
+    """
+    以指定数量的worker请求 /article/generate
+
+    Args:
+        client: httpx.AsyncClient
+        workers: 并发worker数
+        requests: 总请求数
+        tag: 描述中的标记，保证各轮请求互不命中缓存
+
+    Returns:
+        Dict[str, Any]: 吞吐量、延迟统计和失败数
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+    latencies: List[float] = []
+    failures = 0
+
+    async def worker() -> None:
+        nonlocal failures
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post("/article/generate", json={
+                "description": f"离线基准测试文章 {tag}-{i}",
+                "model_type": "mock",
+            })
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "requests_per_second": round(requests / elapsed, 1),
+        "failures": failures,
+        **summarize(latencies),
+    }
+
+async def run_generate(worker_counts: List[int], requests: int, url: Optional[str]) -> Dict[str, Any]:
+    """按各并发级别执行端到端测试"""
+    import httpx
+
+    result: Dict[str, Any] = {}
+    tag = f"{os.getpid()}-{int(time.time())}"
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+            for workers in worker_counts:
+                result[str(workers)] = await bench_generate(client, workers, requests, f"{tag}-{workers}")
+        return result
+
+    from backend.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        # 应用启动时按环境配置了DEBUG日志，基准测试只保留警告
+        for name in ("", "backend.main", "uvicorn.access"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for workers in worker_counts:
+                result[str(workers)] = await bench_generate(client, workers, requests, f"{tag}-{workers}")
+    return result
+
+def git_revision() -> Optional[str]:
+    """当前代码的git提交，不在git仓库中时返回None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def flatten(data: Any, prefix: str = "") -> Dict[str, float]:
+    """把嵌套的结果展开为 a.b.c -> 数值 的字典"""
+    items: Dict[str, float] = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            items.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        items[prefix[:-1]] = data
+    return items
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """
+    与基线结果对比
+
+    只比较延迟（_ms、_us 结尾，越小越好）和吞吐量（per_second 结尾，越大越好）。
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 变差超过该比例时视为退化
+
+    Returns:
+        Dict[str, Any]: 每个指标的变化比例和退化的指标列表
+    """
+    now = flatten(current["results"])
+    before = flatten(baseline.get("results", {}))
+    changes: Dict[str, float] = {}
+    regressions: List[str] = []
+    for key, value in now.items():
+        old = before.get(key)
+        if not old:
+            continue
+        if key.endswith(("_ms", "_us")):
+            change = value / old - 1
+        elif key.endswith("per_second"):
+            change = old / value - 1 if value else 1.0
+        else:
+            continue
+        # 正数表示变差
+        changes[key] = round(change, 3)
+        if change > threshold:
+            regressions.append(key)
+    return {
+        "baseline_revision": baseline.get("revision"),
+        "threshold": threshold,
+        "changes": changes,
+        "regressions": regressions,
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """执行基准测试并返回结果"""
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    results: Dict[str, Any] = {}
+    results["cache"] = await bench_cache(args.iterations)
+    results.update(bench_generator(args.iterations))
+    results["generate"] = await run_generate(worker_counts, args.requests, args.url)
+    return results
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="离线基准测试套件（模拟提供商）")
+    parser.add_argument("--iterations", type=int, default=20000, help="微基准每项的操作次数")
+    parser.add_argument("--workers", default="1,4,16", help="端到端测试的并发worker数，逗号分隔")
+    parser.add_argument("--requests", type=int, default=200, help="每个并发级别的请求数")
+    parser.add_argument("--url", help="请求已启动的服务而不是进程内的应用，如 http://127.0.0.1:8000")
+    parser.add_argument("--latency", type=float, default=0.2, help="模拟提供商的平均首字延迟（秒）")
+    parser.add_argument("--latency-stddev", type=float, default=0.1, help="首字延迟的标准差（秒）")
+    parser.add_argument(
+        "--distribution", default="lognormal", choices=["fixed", "uniform", "normal", "lognormal"],
+        help="首字延迟分布"
+    )
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="模拟输出速度，0表示不限")
+    parser.add_argument("--error-rate", type=float, default=0, help="模拟错误率")
+    parser.add_argument("--out", help="把结果JSON写入文件")
+    parser.add_argument("--baseline", help="与之前保存的结果JSON对比")
+    parser.add_argument("--threshold", type=float, default=0.2, help="视为退化的变差比例")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.url:
+            # 先导入应用：存在 backend/.env 时它会覆盖已有的环境变量，下面的设置必须在其后
+            import backend.main  # noqa: F401
+
+        use_mock_provider(
+            MOCK_LATENCY_DISTRIBUTION=args.distribution,
+            MOCK_LATENCY_MEAN=args.latency,
+            MOCK_LATENCY_STDDEV=args.latency_stddev,
+            MOCK_TOKENS_PER_SECOND=args.tokens_per_second,
+            MOCK_ERROR_RATE=args.error_rate,
+            CACHE_ENABLED="true",
+            CACHE_BACKEND="tiered",
+            CACHE_DB_PATH=os.path.join(directory, "cache.db"),
+            SEMANTIC_CACHE_ENABLED="false",
+            ARTICLE_STORE_DB_PATH=os.path.join(directory, "articles.db"),
+        )
+        results = asyncio.run(run(args))
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("out", "baseline")},
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    if report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
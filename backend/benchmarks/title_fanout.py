@@ -0,0 +1,76 @@
+"""
+多平台标题生成基准测试
+
+对本地模拟LLM服务分别按顺序和并发为多个平台生成标题，对比总耗时。
+并发生成的总耗时应接近单个平台的耗时，而不是各平台耗时之和。
+
+用法：
+    python -m backend.benchmarks.title_fanout --provider monica --rounds 5 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from backend.benchmarks.common import summarize, use_stub_provider
+from backend.benchmarks.stub_server import StubLLMServer
+
+PLATFORMS = ["xiaohongshu", "weixin", "zhihu"]
+
+# 模拟服务返回的标题内容
+TITLES = "\n".join(
+    f"{i}. 示例标题{i}\n   - 标题类型：干货型\n   - 适用场景：经验分享\n   - 预期效果：收藏"
+    for i in range(1, 11)
+)
+
+async def run(provider: str, rounds: int) -> dict:
+    """执行基准测试并返回结果"""
+    from backend.services.article_generator import ArticleGenerator
+
+    generator = ArticleGenerator(provider)
+    sequential: List[float] = []
+    fanout: List[float] = []
+
+    for i in range(rounds):
+        description = f"多平台标题测试 {i}"
+
+        start = time.perf_counter()
+        for platform in PLATFORMS:
+            await generator.generate_titles(description, platform)
+        sequential.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = await generator.generate_titles_for_platforms(description, PLATFORMS)
+        fanout.append(time.perf_counter() - start)
+        failed = [p for p, r in results.items() if isinstance(r, Exception)]
+        if failed:
+            raise RuntimeError(f"平台生成失败: {failed}")
+
+    return {
+        "provider": provider,
+        "platforms": len(PLATFORMS),
+        "sequential": summarize(sequential),
+        "fanout": summarize(fanout),
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="多平台标题生成基准测试")
+    parser.add_argument("--provider", default="monica", choices=["monica", "zhipu"])
+    parser.add_argument("--rounds", type=int, default=5, help="测试轮数")
+    parser.add_argument("--delay", type=float, default=0.5, help="模拟服务的单请求延迟（秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with StubLLMServer(delay=args.delay, content=TITLES) as server:
+        use_stub_provider(args.provider, server.url)
+        result = asyncio.run(run(args.provider, args.rounds))
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+智谱客户端并发基准测试
+
+启动本地模拟LLM服务，对 /article/generate 发起 N 个并发请求，
+比较单个请求耗时与 N 个并发请求的总耗时，并在压测期间测量 /health 的响应延迟。
+如果智谱请求阻塞了事件循环，总耗时会接近 N 倍单请求耗时。
+
+用法：
+    python -m backend.benchmarks.zhipu_concurrency --concurrency 8 --delay 2
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from backend.benchmarks.stub_server import StubLLMServer
+
+def build_app():
+    """构建只包含文章路由和健康检查的测试应用，避免加载 main.py 的副作用"""
+    from fastapi import FastAPI
+    from backend.routers import article
+
+    app = FastAPI()
+    app.include_router(article.router, prefix="/article")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+async def run(concurrency: int) -> dict:
+    """执行基准测试并返回结果"""
+    import httpx
+    from backend.utils.stats import collect_stats
+
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    def payload(i: int) -> dict:
+        # 每个请求使用不同的描述，避免被请求合并或缓存
+        return {"description": f"写一篇关于并发基准测试的文章（{i}）", "core_idea": "事件循环"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        # 单个请求的基准耗时
+        start = time.perf_counter()
+        response = await client.post("/article/generate", json=payload(0))
+        response.raise_for_status()
+        single = time.perf_counter() - start
+
+        # 并发请求，同时测量健康检查的延迟
+        async def probe_health():
+            await asyncio.sleep(single / 4)
+            probe_start = time.perf_counter()
+            await client.get("/health")
+            return time.perf_counter() - probe_start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            probe_health(),
+            *[client.post("/article/generate", json=payload(i + 1)) for i in range(concurrency)]
+        )
+        total = time.perf_counter() - start
+        health_latency = results[0]
+        failed = sum(1 for r in results[1:] if r.status_code != 200)
+
+    return {
+        "concurrency": concurrency,
+        "single_request_seconds": round(single, 3),
+        "concurrent_total_seconds": round(total, 3),
+        "speedup_vs_serial": round(single * concurrency / total, 2),
+        "health_latency_seconds": round(health_latency, 4),
+        "failed": failed,
+        "stats": collect_stats(),
+    }
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="智谱客户端并发基准测试")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发请求数")
+    parser.add_argument("--delay", type=float, default=2.0, help="模拟服务的单请求延迟（秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with StubLLMServer(delay=args.delay) as server:
+        # 必须在创建 Config 单例之前设置环境变量
+        os.environ["AI_PROVIDER"] = "zhipu"
+        os.environ["ZHIPU_API_KEY"] = "bench.secret"
+        os.environ["ZHIPU_API_ENDPOINT"] = server.url
+        os.environ["CACHE_ENABLED"] = "false"
+
+        result = asyncio.run(run(args.concurrency))
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
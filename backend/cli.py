@@ -1,58 +1,342 @@
+"""
+命令行入口
+
+单篇生成：
+    python -m backend.cli <文章描述> [核心主题]
+
+批量生成：
+    python -m backend.cli batch topics.jsonl --concurrency 8 --out results.jsonl
+
+批量输入每行一项，可以是JSON（{"description": ..., "core_idea": ..., "model_type": ..., "model": ..., "id": ...}，
+只有 description 必填），也可以是纯文本（描述和核心主题以Tab分隔）；输入文件为 - 时从标准输入读取。
+
+每完成一项立即向 --out 文件追加一行结果，这个文件同时是检查点：中断后重新运行相同的命令，
+已成功的项会被跳过，失败的项会重新生成。
+"""
+
 import sys
+import argparse
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
 
 from backend.services.article_generator import ArticleGenerator
+from backend.services.article_store import ArticleStore
 from backend.schemas.article import ArticleRequest
 from backend.utils.logger import setup_logging
 
+logger = logging.getLogger(__name__)
+
+# 批量模式下进度的最短刷新间隔（秒）
+PROGRESS_INTERVAL = 1.0
+
+def load_env() -> None:
+    """加载 backend/.env（如果存在），与服务端使用相同的配置"""
+    env_file = Path(__file__).resolve().parent / '.env'
+    if env_file.exists():
+        load_dotenv(env_file)
+
 async def generate_article(description: str, core_idea: Optional[str] = None) -> str:
     """
     异步生成文章
-    
+
     Args:
         description: 文章描述
         core_idea: 核心主题（可选）
-        
+
     Returns:
         str: 生成的文章文件路径
     """
-    generator = ArticleGenerator()
+    generator = ArticleGenerator.get_instance()
     request = ArticleRequest(description=description, core_idea=core_idea)
-    
+
     try:
         response = await generator.generate(request)
-        return response.file_path
+        return response.data.file_path
     except Exception as e:
         logger.error(f"生成文章时发生错误: {str(e)}")
         raise
+    finally:
+        # 文章存储在后台批量写入，退出前写完
+        await ArticleStore.close_instance()
+
+def parse_item(line: str) -> Dict[str, Any]:
+    """
+    解析批量输入的一行
+
+    Args:
+        line: 去掉首尾空白的输入行
+
+    Returns:
+        Dict[str, Any]: 包含 description、core_idea 等字段的字典
+
+    Raises:
+        ValueError: JSON格式错误或不是对象时抛出
+    """
+    if line.startswith("{"):
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            raise ValueError("输入行必须是JSON对象")
+        return item
+    description, _, core_idea = line.partition("\t")
+    return {"description": description.strip(), "core_idea": core_idea.strip() or None}
+
+def item_key(item: Dict[str, Any]) -> str:
+    """
+    计算输入项的标识，用于断点续传
+
+    有 id 字段时直接使用，否则取请求内容的摘要，输入文件的行顺序变化不影响续传。
+    """
+    if item.get("id") is not None:
+        return str(item["id"])
+    fields = [item.get(name) for name in ("description", "core_idea", "model_type", "model")]
+    return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+def read_items(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    读取批量输入，跳过空行和 # 开头的注释行，相同的项只保留一个
+
+    无法解析的行也作为一项返回（带 error 字段），在结果文件中记录为失败。
+    """
+    items: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            item = parse_item(line)
+        except ValueError as e:
+            item = {"id": f"line-{number}", "error": f"第{number}行无法解析: {str(e)}"}
+        key = item_key(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        items.append(dict(item, id=key))
+    return items
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    读取结果文件中已成功的项
+
+    Args:
+        path: 结果文件路径
+
+    Returns:
+        Set[str]: 已成功项的标识
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 上次中断时可能只写了半行
+                continue
+            if record.get("status") == "succeeded":
+                done.add(record["id"])
+    return done
+
+class Progress:
+    """
+    批量生成的进度显示
+
+    属性：
+        total: 本次需要生成的项数
+    """
+
+    def __init__(self, total: int, stream: TextIO = sys.stderr):
+        self.total = total
+        self.stream = stream
+        self.succeeded = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self._printed_at = 0.0
+
+    @property
+    def finished(self) -> int:
+        return self.succeeded + self.failed
+
+    def update(self, ok: bool) -> None:
+        """记录一项完成，并按间隔刷新进度"""
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        now = time.monotonic()
+        if now - self._printed_at >= PROGRESS_INTERVAL or self.finished == self.total:
+            self._printed_at = now
+            self.print()
+
+    def print(self) -> None:
+        """输出进度、吞吐量和预计剩余时间"""
+        elapsed = time.monotonic() - self.started_at
+        rate = self.finished / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.finished
+        eta = _format_seconds(remaining / rate) if rate > 0 else "--:--"
+        print(
+            f"[{self.finished}/{self.total}] 成功 {self.succeeded} 失败 {self.failed} "
+            f"| {rate * 60:.1f} 篇/分钟 | 已用 {_format_seconds(elapsed)} 预计剩余 {eta}",
+            file=self.stream,
+            flush=True
+        )
+
+def _format_seconds(seconds: float) -> str:
+    """把秒数格式化为 [h:]mm:ss"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+async def run_batch(
+    items: List[Dict[str, Any]],
+    out: TextIO,
+    concurrency: int,
+    progress: Progress,
+    model_type: Optional[str] = None,
+    model: Optional[str] = None
+) -> None:
+    """
+    以指定并发生成一批文章，每完成一项向结果文件追加一行
+
+    Args:
+        items: 待生成的输入项
+        out: 以追加模式打开的结果文件
+        concurrency: 同时生成的文章数
+        progress: 进度显示
+        model_type: 输入项未指定时使用的AI提供商
+        model: 输入项未指定时使用的模型
+    """
+    generator = ArticleGenerator.get_instance()
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    def record(item: Dict[str, Any], **result: Any) -> None:
+        line = {"id": item["id"], "description": item.get("description"), "core_idea": item.get("core_idea"), **result}
+        out.write(json.dumps(line, ensure_ascii=False) + "\n")
+        # 每项结果立即落盘，进程被杀时最多丢失正在生成的项
+        out.flush()
+        os.fsync(out.fileno())
+        progress.update(result["status"] == "succeeded")
+
+    async def worker() -> None:
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item.get("error"):
+                record(item, status="failed", error=item["error"])
+                continue
+            try:
+                request = ArticleRequest(
+                    description=item.get("description"),
+                    core_idea=item.get("core_idea"),
+                    model_type=item.get("model_type") or model_type,
+                    model=item.get("model") or model
+                )
+                response = await generator.generate(request)
+                record(
+                    item,
+                    status="succeeded",
+                    file_path=response.data.file_path,
+                    article_id=response.data.article_id
+                )
+            except ValidationError as e:
+                record(item, status="failed", error=f"输入无效: {e.errors()[0]['msg']}")
+            except Exception as e:
+                logger.error(f"批量生成单项失败: id={item['id']}, {str(e)}")
+                record(item, status="failed", error=str(e))
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        await ArticleStore.close_instance()
+
+def batch_main(argv: List[str]) -> int:
+    """
+    批量模式入口
+
+    Args:
+        argv: batch 之后的命令行参数
+
+    Returns:
+        int: 进程退出码，有失败项时为1
+    """
+    parser = argparse.ArgumentParser(prog="python -m backend.cli batch", description="批量生成文章，支持断点续传")
+    parser.add_argument("input", help="输入文件（JSONL或每行一个描述），- 表示标准输入")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时生成的文章数")
+    parser.add_argument("--out", help="结果文件（JSONL，同时作为检查点），默认为 <输入文件>.results.jsonl")
+    parser.add_argument("--model-type", help="输入项未指定时使用的AI提供商")
+    parser.add_argument("--model", help="输入项未指定时使用的模型")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        items = read_items(sys.stdin)
+        out_path = args.out or "results.jsonl"
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            items = read_items(f)
+        out_path = args.out or f"{args.input}.results.jsonl"
+
+    done = load_checkpoint(out_path)
+    pending = [item for item in items if item["id"] not in done]
+    skipped = len(items) - len(pending)
+    print(f"共 {len(items)} 项，已完成 {skipped} 项，本次生成 {len(pending)} 项，结果写入 {out_path}", file=sys.stderr)
+    if not pending:
+        return 0
+
+    progress = Progress(len(pending))
+    try:
+        with open(out_path, "a", encoding="utf-8") as out:
+            asyncio.run(run_batch(pending, out, args.concurrency, progress, args.model_type, args.model))
+    except KeyboardInterrupt:
+        progress.print()
+        print(f"已中断，重新运行相同的命令会从 {out_path} 继续", file=sys.stderr)
+        return 130
+
+    print(f"完成: 成功 {progress.succeeded} 项，失败 {progress.failed} 项，结果见 {out_path}", file=sys.stderr)
+    return 1 if progress.failed else 0
 
 def main():
     """命令行主函数"""
+    load_env()
+
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # 批量模式下控制台只输出警告，避免淹没进度信息
+        setup_logging(logging.WARNING)
+        sys.exit(batch_main(sys.argv[2:]))
+
     # 设置日志
-    global logger
-    logger = setup_logging()
-    
+    setup_logging()
+
     # 检查参数
     if len(sys.argv) < 2:
         print("使用方法: python -m backend.cli <文章描述> [核心主题]")
+        print("          python -m backend.cli batch <输入文件|-> [--concurrency N] [--out results.jsonl]")
         sys.exit(1)
-    
+
     description = sys.argv[1]
     core_idea = sys.argv[2] if len(sys.argv) > 2 else None
-    
+
     logger.info(f"开始生成文章，描述：{description}，核心主题：{core_idea}")
-    
+
     try:
         filename = asyncio.run(generate_article(description, core_idea))
         logger.info(f"文章已生成并保存到：{filename}")
         print(f"文章已生成并保存到：{filename}")
-        
+
     except Exception as e:
         logger.error(f"程序执行出错: {str(e)}")
         print(f"发生错误: {str(e)}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -7,8 +7,8 @@
 import os
 from dataclasses import dataclass
 import logging
-from typing import Optional
-from backend.utils.string import parse_bool
+from typing import List, Optional, Tuple
+from backend.utils.string import parse_bool, parse_list
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +41,7 @@ class Config:
         logger.info(f"加载配置: AI_PROVIDER={self.AI_PROVIDER}")
 
         # 验证AI提供商
-        if self.AI_PROVIDER not in ["monica", "zhipu"]:
+        if self.AI_PROVIDER not in ["monica", "zhipu", "mock"]:
             logger.error(f"不支持的AI提供商: {self.AI_PROVIDER}")
             raise ValueError(f"不支持的AI提供商: {self.AI_PROVIDER}")
 
@@ -49,34 +49,188 @@ class Config:
         self.MONICA_API_ENDPOINT = os.getenv("MONICA_API_ENDPOINT", "https://openapi.monica.im/v1")
         self.MONICA_API_KEY = os.getenv("MONICA_API_KEY")
         self.MONICA_MODEL = os.getenv("MONICA_MODEL", "gpt-4o-mini")
+        # 请求中可以指定的其他模型（逗号分隔），默认模型总是可用
+        self.MONICA_MODELS = parse_list(os.getenv("MONICA_MODELS", ""))
 
         # 智谱AI配置
         self.ZHIPU_API_ENDPOINT = os.getenv("ZHIPU_API_ENDPOINT", "https://open.bigmodel.cn/api/paas/v4")
         self.ZHIPU_API_KEY = os.getenv("ZHIPU_API_KEY")
         self.ZHIPU_MODEL = os.getenv("ZHIPU_MODEL", "glm-4")
+        self.ZHIPU_MODELS = parse_list(os.getenv("ZHIPU_MODELS", ""))
+        # 智谱SDK为同步接口，请求在线程池中执行，这里限制最大并发请求数
+        self.ZHIPU_MAX_WORKERS = int(os.getenv("ZHIPU_MAX_WORKERS", "32"))
+
+        # 模拟提供商配置：不发送网络请求，返回合成内容，用于离线压测和基准测试
+        # 默认只在 AI_PROVIDER=mock 时可用，避免线上请求通过 model_type=mock 拿到合成内容
+        self.MOCK_ENABLED = parse_bool(os.getenv("MOCK_ENABLED", str(self.AI_PROVIDER == "mock")))
+        self.MOCK_MODEL = os.getenv("MOCK_MODEL", "mock-article")
+        self.MOCK_MODELS = parse_list(os.getenv("MOCK_MODELS", ""))
+        # 首字延迟分布：fixed、uniform（均值±标准差）、normal 或 lognormal（长尾），单位秒
+        self.MOCK_LATENCY_DISTRIBUTION = os.getenv("MOCK_LATENCY_DISTRIBUTION", "fixed").lower()
+        self.MOCK_LATENCY_MEAN = float(os.getenv("MOCK_LATENCY_MEAN", "0.5"))
+        self.MOCK_LATENCY_STDDEV = float(os.getenv("MOCK_LATENCY_STDDEV", "0.2"))
+        # 输出速度（每秒token数，按每个字符一个token计算），0表示首字延迟后立即返回全部内容
+        self.MOCK_TOKENS_PER_SECOND = float(os.getenv("MOCK_TOKENS_PER_SECOND", "0"))
+        # 合成文章的大致字数和流式输出每个片段的字数
+        self.MOCK_ARTICLE_LENGTH = int(os.getenv("MOCK_ARTICLE_LENGTH", "1500"))
+        self.MOCK_STREAM_CHUNK_SIZE = int(os.getenv("MOCK_STREAM_CHUNK_SIZE", "20"))
+        # 错误注入：按比例返回指定HTTP状态码的错误，默认503（可重试）
+        self.MOCK_ERROR_RATE = float(os.getenv("MOCK_ERROR_RATE", "0"))
+        self.MOCK_ERROR_STATUS = int(os.getenv("MOCK_ERROR_STATUS", "503"))
+        # 随机种子，设置后延迟和错误的序列可重复
+        mock_seed = os.getenv("MOCK_SEED", "")
+        self.MOCK_SEED = int(mock_seed) if mock_seed else None
 
         # 记录当前使用的模型
         if self.AI_PROVIDER == "monica":
             logger.info(f"使用Monica AI模型: {self.MONICA_MODEL}")
+        elif self.AI_PROVIDER == "mock":
+            logger.info(f"使用模拟AI模型: {self.MOCK_MODEL}")
         else:
             logger.info(f"使用智谱AI模型: {self.ZHIPU_MODEL}")
 
         # 通用AI配置
         self.API_TEMPERATURE = float(os.getenv("API_TEMPERATURE", "0.7"))
         self.API_MAX_TOKENS = int(os.getenv("API_MAX_TOKENS", "5000"))
+        # 重试配置：MAX_RETRIES为失败后的最大重试次数，RETRY_DELAY为指数退避的基础等待时间（秒）
         self.MAX_RETRIES = int(os.getenv("MAX_RETRIES", "1"))
-        self.RETRY_DELAY = int(os.getenv("RETRY_DELAY", "2"))
+        self.RETRY_DELAY = float(os.getenv("RETRY_DELAY", "2"))
+        self.RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+        # 重试请求最多占总请求数的比例，避免故障时的重试风暴
+        self.RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+
+        # 熔断配置：连续失败次数达到阈值后暂停调用该提供商，经过恢复时间（秒）后再探测
+        self.CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.CIRCUIT_RECOVERY_TIME = float(os.getenv("CIRCUIT_RECOVERY_TIME", "30"))
+
+        # 故障转移：当前提供商不可用时自动改用另一个已配置API密钥的提供商
+        self.FAILOVER_ENABLED = parse_bool(os.getenv("FAILOVER_ENABLED", "false"))
+
+        # 自动路由配置（model_type=auto）：在已配置API密钥的候选提供商中选择最近延迟最低的健康提供商
+        self.AUTO_PROVIDERS = parse_list(os.getenv("AUTO_PROVIDERS", "monica,zhipu"))
+        # 最近调用的错误率超过该值时视为不健康，只在没有健康提供商时使用
+        self.AUTO_MAX_ERROR_RATE = float(os.getenv("AUTO_MAX_ERROR_RATE", "0.5"))
+        # 随机改用次优提供商的比例，保证各提供商的延迟统计持续更新
+        self.AUTO_EXPLORE_RATE = float(os.getenv("AUTO_EXPLORE_RATE", "0.05"))
+        # 对冲请求：首选提供商超过阈值仍未返回（流式为未收到第一个片段）时，向次优提供商再发一个请求，
+        # 先返回的结果胜出，另一个请求被取消
+        self.AUTO_HEDGE_ENABLED = parse_bool(os.getenv("AUTO_HEDGE_ENABLED", "false"))
+        # 对冲阈值（秒），0表示使用首选提供商最近的p95延迟
+        self.AUTO_HEDGE_DELAY = float(os.getenv("AUTO_HEDGE_DELAY", "0"))
+        # 流式请求的对冲阈值（秒），以收到第一个片段为准，0表示使用首选提供商最近首个片段耗时的p95
+        self.AUTO_STREAM_HEDGE_DELAY = float(os.getenv("AUTO_STREAM_HEDGE_DELAY", "0"))
+
+        # 客户端限流配置：每个提供商每分钟的请求数和token数上限，0表示不限制
+        self.MONICA_RPM = int(os.getenv("MONICA_RPM", "0"))
+        self.MONICA_TPM = int(os.getenv("MONICA_TPM", "0"))
+        self.ZHIPU_RPM = int(os.getenv("ZHIPU_RPM", "0"))
+        self.ZHIPU_TPM = int(os.getenv("ZHIPU_TPM", "0"))
+        # 允许的突发量，按多少秒的配额计算
+        self.RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+        # RATE_LIMIT_STORE=sqlite 时所有worker进程共享配额，否则每个进程独立计算
+        self.RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "")
+        self.RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "")
+
+        # HTTP连接池配置（每个提供商/模型共享一个连接池）
+        self.HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+        self.HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "600"))
+        self.HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+        self.HTTP2_ENABLED = parse_bool(os.getenv("HTTP2_ENABLED", "true"))
 
         # 文章配置
         self.MIN_WORD_COUNT = int(os.getenv("MIN_WORD_COUNT", "1000"))
         self.MAX_WORD_COUNT = int(os.getenv("MAX_WORD_COUNT", "3000"))
         self.MIN_CORE_WORD_COUNT = int(os.getenv("MIN_CORE_WORD_COUNT", "300"))
 
+        # 标题生成配置：text（带序号的文本）或 json（要求模型输出紧凑的JSON，输出token更少）
+        self.TITLE_OUTPUT_FORMAT = os.getenv("TITLE_OUTPUT_FORMAT", "text").lower()
+        self.TITLE_MAX_TOKENS = int(os.getenv("TITLE_MAX_TOKENS", "4095"))
+
+        # 批量生成配置：每个提供商的最大并发数，未单独配置时使用BATCH_CONCURRENCY
+        self.BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.MONICA_BATCH_CONCURRENCY = int(os.getenv("MONICA_BATCH_CONCURRENCY", str(self.BATCH_CONCURRENCY)))
+        self.ZHIPU_BATCH_CONCURRENCY = int(os.getenv("ZHIPU_BATCH_CONCURRENCY", str(self.BATCH_CONCURRENCY)))
+        # 已完成的批量任务在内存中的保留时间（秒）
+        self.BATCH_JOB_TTL = int(os.getenv("BATCH_JOB_TTL", "3600"))
+
+        # 后台任务队列配置
+        # JOB_QUEUE_BACKEND: memory（进程内）或 sqlite（持久化，所有worker共享，重启后继续执行）
+        self.JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")
+        self.JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", "")
+        self.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+        # 任务租约时间（秒），执行期间定期续租，持有者异常退出后超过该时间任务会被重新执行
+        # 默认取一次生成的最长耗时：每次调用最多 HTTP_TIMEOUT 秒，加上重试等待，开启故障转移时再调用一个提供商
+        generation_seconds = (1 + self.MAX_RETRIES) * self.HTTP_TIMEOUT + self.MAX_RETRIES * self.RETRY_MAX_DELAY
+        if self.FAILOVER_ENABLED:
+            generation_seconds *= 2
+        self.JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", str(generation_seconds)))
+        self.JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+        # 持久化队列中每个任务最多执行的次数，租约到期重新领取也计入，超过后任务标记为失败
+        self.JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        # 已完成任务的保留时间（秒）
+        self.JOB_TTL = int(os.getenv("JOB_TTL", "86400"))
+
+        # 文章保存配置：写文件线程池的最大并发数
+        self.STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "4"))
+
+        # 文章存储配置：把文章和元数据保存到SQLite，支持分页列出和全文搜索
+        self.ARTICLE_STORE_ENABLED = parse_bool(os.getenv("ARTICLE_STORE_ENABLED", "true"))
+        # 数据库文件路径，为空时使用 cache/articles.db
+        self.ARTICLE_STORE_DB_PATH = os.getenv("ARTICLE_STORE_DB_PATH", "")
+        # 后台批量写入：攒够 BATCH_SIZE 篇或等待 FLUSH_INTERVAL 秒后写入一次
+        self.ARTICLE_STORE_BATCH_SIZE = int(os.getenv("ARTICLE_STORE_BATCH_SIZE", "100"))
+        self.ARTICLE_STORE_FLUSH_INTERVAL = float(os.getenv("ARTICLE_STORE_FLUSH_INTERVAL", "0.2"))
+
         # 缓存配置
         self.CACHE_ENABLED = parse_bool(os.getenv("CACHE_ENABLED", "false"))
         self.CACHE_EXPIRE_TIME = int(os.getenv("CACHE_EXPIRE_TIME", "3600"))
+        # 缓存后端: tiered（内存LRU + SQLite，默认）, memory, sqlite, file
+        self.CACHE_BACKEND = os.getenv("CACHE_BACKEND", "tiered")
+        self.CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "1000"))
+        self.CACHE_DISK_MAX_ENTRIES = int(os.getenv("CACHE_DISK_MAX_ENTRIES", "100000"))
+        # SQLite缓存文件路径，为空时使用 cache/cache.db
+        self.CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+
+        # 语义近似缓存：精确缓存未命中时，按规范化后的输入查找相似度超过阈值的已生成文章
+        self.SEMANTIC_CACHE_ENABLED = parse_bool(os.getenv("SEMANTIC_CACHE_ENABLED", "false"))
+        self.SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+        self.SEMANTIC_CACHE_NGRAM = int(os.getenv("SEMANTIC_CACHE_NGRAM", "3"))
+        self.SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "200000"))
+        # 语义索引文件路径，为空时使用 cache/semantic.db
+        self.SEMANTIC_CACHE_DB_PATH = os.getenv("SEMANTIC_CACHE_DB_PATH", "")
+
+        # 请求合并配置：相同内容的并发生成请求只调用一次AI接口
+        # SINGLEFLIGHT_LOCK_STORE=sqlite 时跨worker进程合并，等待者通过共享缓存获取结果，
+        # 因此只在 CACHE_ENABLED=true 且缓存后端为 tiered/sqlite/file 时生效
+        self.SINGLEFLIGHT_LOCK_STORE = os.getenv("SINGLEFLIGHT_LOCK_STORE", "")
+        self.SINGLEFLIGHT_LOCK_DB_PATH = os.getenv("SINGLEFLIGHT_LOCK_DB_PATH", "")
+        # 跨进程锁的租约（秒），持锁期间自动续租；其他进程最多等待这么久，超时后自行执行
+        # 默认与 JOB_LEASE_SECONDS 相同，取一次生成的最长耗时
+        self.SINGLEFLIGHT_LEASE_SECONDS = float(os.getenv("SINGLEFLIGHT_LEASE_SECONDS", str(generation_seconds)))
+
+        # 准入控制：生成接口（文章、流式文章、标题）同时处理的请求数上限，超出时短暂排队，队列满或等待超时返回503
+        self.ADMISSION_ENABLED = parse_bool(os.getenv("ADMISSION_ENABLED", "true"))
+        # 每个worker同时处理的最大请求数和等待队列长度
+        self.ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+        self.ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+        # 在队列中等待的最长时间（秒）
+        self.ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+        # 所有worker合计的最大请求数（通过SQLite共享），0表示不限制
+        self.ADMISSION_GLOBAL_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_GLOBAL_MAX_IN_FLIGHT", "0"))
+        # 数据库文件路径，为空时使用 cache/admission.db
+        self.ADMISSION_DB_PATH = os.getenv("ADMISSION_DB_PATH", "")
+        # 全局槽位的租约时间（秒），worker异常退出后最晚在租约到期时释放
+        # 默认与 JOB_LEASE_SECONDS 相同，取一次生成的最长耗时，避免仍在处理的请求的槽位被提前回收
+        self.ADMISSION_LEASE_SECONDS = float(os.getenv("ADMISSION_LEASE_SECONDS", str(generation_seconds)))
+        # 503响应中 Retry-After 的上限（秒）
+        self.ADMISSION_MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "60"))
+
+        # 日志配置：DEBUG级别下完整记录提示词内容的采样率（0~1），INFO级别只记录哈希和长度
+        self.LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
 
-        logger.info(f"config: cache_enabled: {self.CACHE_ENABLED}")
+        logger.info(f"config: cache_enabled: {self.CACHE_ENABLED}, cache_backend: {self.CACHE_BACKEND}")
 
         # 验证必需的配置项
         self._validate_config()
@@ -88,6 +242,67 @@ class Config:
         elif self.AI_PROVIDER == "zhipu" and not self.ZHIPU_API_KEY:
             raise ValueError("使用智谱AI时必须设置ZHIPU_API_KEY环境变量")
 
+    def provider_configured(self, provider: str) -> bool:
+        """
+        判断提供商是否配置了API密钥
+
+        Args:
+            provider: AI提供商类型
+
+        Returns:
+            bool: 已配置返回True；auto 在任一候选提供商已配置时返回True，
+            mock 不需要API密钥，启用（MOCK_ENABLED）时返回True
+        """
+        if provider == "auto":
+            return any(self.provider_configured(p) for p in self.AUTO_PROVIDERS if p != "auto")
+        if provider == "mock":
+            return self.MOCK_ENABLED
+        return bool(getattr(self, f"{provider.upper()}_API_KEY", None))
+
+    def batch_concurrency(self, provider: str) -> int:
+        """
+        获取提供商的批量生成并发数
+
+        Args:
+            provider: AI提供商类型
+
+        Returns:
+            int: 最大并发数
+        """
+        return getattr(self, f"{provider.upper()}_BATCH_CONCURRENCY", self.BATCH_CONCURRENCY)
+
+    def allowed_models(self, provider: str) -> List[str]:
+        """
+        获取请求中可以指定的模型
+
+        Args:
+            provider: AI提供商类型
+
+        Returns:
+            List[str]: 默认模型在前，其后是 <PROVIDER>_MODELS 中配置的模型
+        """
+        if provider == "auto":
+            # 自动路由由路由客户端选择提供商和模型
+            return ["auto"]
+        prefix = provider.upper()
+        default = getattr(self, f"{prefix}_MODEL", None)
+        models = [default] if default else []
+        models.extend(m for m in getattr(self, f"{prefix}_MODELS", []) if m not in models)
+        return models
+
+    def rate_limits(self, provider: str) -> Tuple[int, int]:
+        """
+        获取提供商的限流配置
+
+        Args:
+            provider: AI提供商类型
+
+        Returns:
+            Tuple[int, int]: (每分钟请求数上限, 每分钟token数上限)，0表示不限制
+        """
+        prefix = provider.upper()
+        return getattr(self, f"{prefix}_RPM", 0), getattr(self, f"{prefix}_TPM", 0)
+
     @classmethod
     def get_instance(cls) -> 'Config':
         """
@@ -1,44 +1,68 @@
 # 标准库导入
-import datetime
+import asyncio
 import json
 import logging
 import os
 import sys
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+# 导入开始时间，用于统计worker从导入到可以处理请求的耗时
+IMPORT_STARTED_AT = time.perf_counter()
+
 # 第三方库导入
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-# 本地应用导入
-from backend.routers import article
-from backend.utils.paths import LOG_DIR
-
 ###################
-# 日志配置
+# 初始化配置
 ###################
 
-# 生成日志文件名
-log_file = os.path.join(LOG_DIR, f"{datetime.datetime.now().strftime('%Y%m%d')}.log")
+# 环境变量文件路径
+ENV_FILE = Path(__file__).resolve().parent / '.env'
 
-# 根据环境设置日志级别
-log_level = logging.INFO if os.getenv("ENVIRONMENT") == "production" else logging.DEBUG
+# 加载环境变量文件
+def load_env_file() -> bool:
+    """加载环境变量文件
 
-# 配置日志格式
-logging.basicConfig(
-    level=log_level,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.StreamHandler(),  # 输出到控制台
-        logging.FileHandler(log_file, encoding='utf-8')  # 输出到文件
-    ]
-)
+    .env 不存在时直接使用进程的环境变量（如容器中注入的配置），缺少必需的配置项时
+    由 Config 在启动时报错。
+
+    Returns:
+        bool: 是否加载了 .env
+    """
+    if not ENV_FILE.exists():
+        return False
+    load_dotenv(ENV_FILE, override=True)
+    return True
+
+# 在导入本地模块之前加载（只读取文件，不修改其他状态）：CORS等在创建应用时读取的配置可以写在 .env 中，
+# prometheus_client 也在导入时根据 PROMETHEUS_MULTIPROC_DIR 决定是否启用多进程模式
+ENV_FILE_LOADED = load_env_file()
+
+# 本地应用导入
+from backend.routers import article
+from backend.services.article_generator import ArticleGenerator
+from backend.services.article_store import ArticleStore
+from backend.services.job_queue import JobQueue
+from backend.services.prompts import PromptRegistry
+from backend.utils import metrics
+from backend.utils.admission import AdmissionController
+from backend.utils.api_client import ClientRegistry
+from backend.utils.logger import setup_logging, stop_logging
+from backend.utils.paths import LOG_DIR, OUTPUT_DIR, ensure_dir
+from backend.utils.stats import collect_stats, register_stats
+
+# 导入本模块没有副作用：日志、目录、配置和API客户端都在应用启动（lifespan）时初始化
 
 # 获取应用的logger
 logger = logging.getLogger(__name__)
-logger.setLevel(log_level)
+
+###################
+# 日志配置
+###################
 
 # 创建一个过滤器来过滤健康检查日志
 class HealthCheckFilter(logging.Filter):
@@ -51,59 +75,98 @@ class HealthCheckFilter(logging.Filter):
             return False
         return True
 
-# 为所有相关的logger添加过滤器
+# 需要过滤健康检查日志的logger
 loggers_to_filter = [
     "uvicorn.access",  # uvicorn访问日志
     "fastapi",         # FastAPI日志
     __name__,          # 当前模块的日志
 ]
 
-for logger_name in loggers_to_filter:
-    logger = logging.getLogger(logger_name)
-    logger.addFilter(HealthCheckFilter())
-
-# 配置uvicorn访问日志
-uvicorn_access_logger = logging.getLogger("uvicorn.access")
-uvicorn_access_logger.setLevel(log_level)  # 保持与全局日志级别一致
-handler = logging.StreamHandler()
-handler.setFormatter(
-    logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-)
-uvicorn_access_logger.handlers = [handler]
+# 重复启动（如测试中多次进入lifespan）时复用同一个过滤器，不会重复添加
+health_check_filter = HealthCheckFilter()
 
-###################
-# 初始化配置
-###################
+def configure_logging() -> None:
+    """配置日志
 
-# 加载环境变量文件
-def load_env_file():
-    """加载环境变量文件"""
-    current_dir = Path(__file__).resolve().parent
-    env_file = current_dir / '.env'
-
-    if env_file.exists():
-        load_dotenv(env_file, override=True)
-        logger.info(f"已加载环境变量文件: {env_file}")
-    else:
-        logger.warning("警告：未找到环境变量文件 .env")
-        raise FileNotFoundError("未找到必需的环境变量文件 .env")
+    根据环境设置日志级别（production: INFO，其他: DEBUG），日志由后台线程格式化并写入控制台和文件，
+    请求处理中只有一次入队。在应用启动时调用，导入本模块不会创建日志文件。
+    """
+    log_level = logging.INFO if os.getenv("ENVIRONMENT") == "production" else logging.DEBUG
+    setup_logging(log_level)
+    logger.setLevel(log_level)
+
+    # 为所有相关的logger添加过滤器
+    for logger_name in loggers_to_filter:
+        logging.getLogger(logger_name).addFilter(health_check_filter)
 
-load_env_file()
+    # 配置uvicorn访问日志：交给根日志记录器的队列处理器，同样在后台线程中写入
+    uvicorn_access_logger = logging.getLogger("uvicorn.access")
+    uvicorn_access_logger.setLevel(log_level)  # 保持与全局日志级别一致
+    uvicorn_access_logger.handlers = []
+    uvicorn_access_logger.propagate = True
 
 # 设置 Python 路径
 BACKEND_DIR = Path(__file__).resolve().parent.parent
 if str(BACKEND_DIR) not in sys.path:
     sys.path.append(str(BACKEND_DIR))
 
+###################
+# 应用生命周期
+###################
+
+# 启动耗时（秒）：导入本模块的耗时和从开始导入到可以处理请求的耗时
+startup_seconds = {"import": 0.0, "ready": 0.0}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理
+
+    启动时配置日志、创建输出目录、加载提示词模板，创建所有请求共享的文章生成器、文章存储和准入控制器，
+    预先创建默认提供商的API客户端（只加载该提供商的SDK），启动后台任务队列的worker池
+    （持久化队列会继续执行未完成的任务）；关闭时停止worker池，写完待写的文章，释放共享的API客户端
+    及其HTTP连接池，并写完队列中剩余的日志。
+    """
+    configure_logging()
+    if ENV_FILE_LOADED:
+        logger.info(f"已加载环境变量文件: {ENV_FILE}")
+    else:
+        logger.warning("未找到环境变量文件 .env，使用进程的环境变量")
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR") and not metrics.multiprocess_enabled():
+        logger.warning("PROMETHEUS_MULTIPROC_DIR 在导入 prometheus_client 之后才设置，/metrics 只包含当前worker的指标")
+    ensure_dir(OUTPUT_DIR)
+    PromptRegistry.load()
+    generator = ArticleGenerator.get_instance()
+    # 第一个请求不再承担SDK导入和客户端创建的开销
+    generator.client_for()
+    if generator.config.ARTICLE_STORE_ENABLED:
+        ArticleStore.get_instance()
+    if generator.config.ADMISSION_ENABLED:
+        AdmissionController.get_instance()
+    job_queue = JobQueue.get_instance()
+    job_queue.start()
+    startup_seconds["ready"] = time.perf_counter() - IMPORT_STARTED_AT
+    logger.info(
+        f"启动完成: 导入耗时 {startup_seconds['import']:.3f}秒，"
+        f"导入到就绪 {startup_seconds['ready']:.3f}秒"
+    )
+    yield
+    await job_queue.stop()
+    await ArticleStore.close_instance()
+    await ClientRegistry.aclose_all()
+    ArticleGenerator.reset_instance()
+    AdmissionController.reset_instance()
+    metrics.mark_process_dead()
+    stop_logging()
+
+register_stats("startup", lambda: {key: round(value, 3) for key, value in startup_seconds.items()})
+
 ###################
 # FastAPI 应用配置
 ###################
 
 # 创建FastAPI应用
 app = FastAPI(
+    lifespan=lifespan,
     title="AI 文章生成器",
     description="""
     这是一个基于Monica AI的智能文章生成工具。
@@ -174,7 +237,7 @@ async def health_check():
             return {"status": "unhealthy", "detail": "log directory is not writable"}, 500
 
         # 检查输出目录是否可写
-        output_dir = Path("output")
+        output_dir = Path(OUTPUT_DIR)
         if not output_dir.exists() or not os.access(output_dir, os.W_OK):
             logger.error("Health check failed: output directory is not writable")
             return {"status": "unhealthy", "detail": "output directory is not writable"}, 500
@@ -185,6 +248,27 @@ async def health_check():
         logger.error(f"Health check failed: {str(e)}")
         return {"status": "unhealthy", "detail": str(e)}, 500
 
+@app.get("/stats")
+async def stats():
+    """运行时统计端点
+
+    返回当前worker中各组件（如智谱请求线程池）的统计信息，
+    包括排队数、执行中的请求数和平均耗时等。
+    部分统计需要查询SQLite（如全局准入槽位数），在线程中汇总，不阻塞事件循环。
+    """
+    return await asyncio.to_thread(collect_stats)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus指标端点
+
+    包括各阶段（缓存查询、提示词构建、AI接口调用、文章保存）的耗时直方图，
+    以及缓存命中、token用量、错误数和并发请求数。
+    设置 PROMETHEUS_MULTIPROC_DIR 时汇总所有worker进程的指标。
+    """
+    content, content_type = metrics.export_metrics()
+    return Response(content=content, media_type=content_type)
+
 @app.get("/")
 async def root():
     """API根路径"""
@@ -203,6 +287,26 @@ async def log_requests(request: Request, call_next):
     """请求日志中间件"""
     # 记录所有请求，过滤器会自动过滤掉健康检查请求
     logger.info(f"Request: {request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code}")
+    start = time.perf_counter()
+    metrics.HTTP_IN_FLIGHT.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    except Exception as e:
+        metrics.record_error("http", e)
+        raise
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
+        # 使用路由模板作为标签，避免路径参数（如任务ID）导致标签数量无限增长
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        ).observe(time.perf_counter() - start)
+    logger.info(f"Response: {status}")
     return response
+
+# 记录导入本模块（包括创建应用和注册路由）的耗时
+startup_seconds["import"] = time.perf_counter() - IMPORT_STARTED_AT
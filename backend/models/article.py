@@ -2,31 +2,69 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import uuid4
 
+# 从内容中提取标题时的最大长度
+MAX_TITLE_LENGTH = 100
+
 class Article:
     """
     文章数据模型
-    
-    注意：这是一个基础的数据模型，目前没有使用数据库。
-    当需要数据库支持时，可以方便地转换为 SQLAlchemy 或其他 ORM 模型。
+
+    由 services/article_store 持久化到SQLite，除文章本身外还记录生成时使用的
+    提供商、模型、提示词模板版本、耗时和token用量，用于查询历史文章。
     """
-    
+
     def __init__(
         self,
         title: str,
         content: str,
         directions: List[str],
         description: str,
-        core_idea: Optional[str] = None
+        core_idea: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        file_path: Optional[str] = None,
+        id: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None
     ):
-        self.id = str(uuid4())
+        self.id = id or str(uuid4())
         self.title = title
         self.content = content
         self.directions = directions
         self.description = description
         self.core_idea = core_idea
-        self.created_at = datetime.utcnow()
-        self.updated_at = self.created_at
-        
+        self.provider = provider
+        self.model = model
+        self.prompt_version = prompt_version
+        self.latency_ms = latency_ms
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.file_path = file_path
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or self.created_at
+
+    @staticmethod
+    def title_from_content(content: str) -> str:
+        """
+        从文章内容中提取标题
+
+        取第一个Markdown标题，没有时取第一个非空行。
+
+        Args:
+            content: 文章内容
+
+        Returns:
+            str: 标题，最多 MAX_TITLE_LENGTH 个字符
+        """
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        heading = next((line for line in lines if line.startswith("#")), None)
+        title = (heading or (lines[0] if lines else "")).lstrip("#").strip()
+        return title[:MAX_TITLE_LENGTH]
+
     def to_dict(self) -> dict:
         """转换为字典格式"""
         return {
@@ -36,17 +74,36 @@ class Article:
             "directions": self.directions,
             "description": self.description,
             "core_idea": self.core_idea,
+            "provider": self.provider,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+            "latency_ms": self.latency_ms,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "file_path": self.file_path,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
-        
+
     @classmethod
     def from_dict(cls, data: dict) -> "Article":
-        """从字典创建实例"""
+        """从字典创建实例，保留已有的ID和时间"""
+        created_at = data.get("created_at")
+        updated_at = data.get("updated_at")
         return cls(
             title=data["title"],
             content=data["content"],
             directions=data["directions"],
             description=data["description"],
-            core_idea=data.get("core_idea")
-        ) 
\ No newline at end of file
+            core_idea=data.get("core_idea"),
+            provider=data.get("provider"),
+            model=data.get("model"),
+            prompt_version=data.get("prompt_version"),
+            latency_ms=data.get("latency_ms"),
+            prompt_tokens=data.get("prompt_tokens") or 0,
+            completion_tokens=data.get("completion_tokens") or 0,
+            file_path=data.get("file_path"),
+            id=data.get("id"),
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+            updated_at=datetime.fromisoformat(updated_at) if updated_at else None
+        )
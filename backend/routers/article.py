@@ -1,11 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query
+from starlette.background import BackgroundTask
+from typing import Optional, Dict, Any, List, AsyncIterator
 import logging
 
-from backend.schemas.article import ArticleRequest, ArticleResponse, ArticleData, TitleRequest, TitleResponse, TitleData
+from backend.config import Config
+from backend.schemas.article import (
+    ArticleRequest, ArticleResponse, TitleRequest, TitleResponse,
+    MultiTitleRequest, MultiTitleResponse, PlatformTitleData,
+    BatchRequest, BatchResponse, JobRequest, JobResponse,
+    ArticleListData, ArticleListResponse, ArticleRecord, ArticleRecordResponse, ArticleSummary
+)
 from backend.schemas.errors import APIError
 from backend.services.article_generator import ArticleGenerator
+from backend.services.article_store import ArticleStore
+from backend.services.batch import BatchJob, BatchManager
+from backend.services.job_queue import JobQueue, to_job_data
+from backend.utils.admission import AdmissionController, AdmissionRejected, AdmissionSlot
+from backend.utils.metrics import usage_scope
+from backend.utils.sse import format_sse, sse_response
 
 logger = logging.getLogger(__name__)
 
@@ -14,21 +26,78 @@ router = APIRouter(
     tags=["文章生成"]
 )
 
-@router.post("/generate")
-async def generate_article(request: ArticleRequest):
+def get_generator() -> ArticleGenerator:
+    """
+    获取进程内共享的文章生成器，供路由通过 Depends 注入
+
+    Returns:
+        ArticleGenerator: 应用启动时创建的生成器实例
+    """
+    return ArticleGenerator.get_instance()
+
+async def admit_generation() -> AsyncIterator[Optional[AdmissionSlot]]:
+    """
+    生成接口的准入控制，供路由通过 Depends 注入
+
+    请求处理期间占用一个槽位，处理结束后释放；流式接口调用 slot.detach() 后由响应结束时释放。
+    未开启 ADMISSION_ENABLED 时不做限制，注入None。
+
+    Yields:
+        Optional[AdmissionSlot]: 占用的槽位
+
+    Raises:
+        HTTPException:
+            - 503: 负载过高，响应头 Retry-After 为建议的重试等待秒数
+    """
+    if not Config.get_instance().ADMISSION_ENABLED:
+        yield None
+        return
+
+    try:
+        slot = await AdmissionController.get_instance().acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"负载过高，拒绝生成请求: reason={e.reason}, retry_after={e.retry_after}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    try:
+        yield slot
+    finally:
+        if not slot.detached:
+            await slot.release()
+
+def _check_model(generator: ArticleGenerator, model_type: Optional[str], model: Optional[str]) -> None:
+    """
+    检查请求指定的提供商和模型是否可用
+
+    Raises:
+        HTTPException:
+            - 400: 提供商或模型不支持
+    """
+    try:
+        generator.resolve_model(model_type, model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/generate", dependencies=[Depends(admit_generation)])
+async def generate_article(
+    request: ArticleRequest,
+    generator: ArticleGenerator = Depends(get_generator)
+):
     """
     生成文章的API接口
 
     处理流程：
     1. 接收包含文章描述和核心主题的请求
-    2. 创建文章生成器实例
-    3. 调用生成器的generate方法生成文章内容
+    2. 调用共享生成器的generate_content方法生成文章内容
+    3. 保存文章到输出目录
     4. 返回生成的文章信息
 
     Args:
         request (ArticleRequest): 包含以下字段的请求对象
             - description: 文章描述（必填，5-1000字）
             - core_idea: 核心主题（选填，最多100字）
+            - model_type: AI提供商（选填，默认使用服务端配置）
+            - model: 模型名称（选填，默认使用提供商的默认模型）
 
     Returns:
         ArticleResponse: 包含以下字段的响应对象
@@ -37,31 +106,29 @@ async def generate_article(request: ArticleRequest):
             - data: 包含文章信息的字典
                 - content: 文章内容
                 - file_path: 保存的文件路径
+                - article_id: 文章存储中的ID
 
     Raises:
         HTTPException:
+            - 400: 提供商或模型不支持
             - 500: 生成文章过程中发生错误
+            - 503: 负载过高，响应头 Retry-After 为建议的重试等待秒数
     """
     logger.info(f"Received generate request: {request}")
-    # 创建文章生成器实例
-    generator = ArticleGenerator()
+    _check_model(generator, request.model_type, request.model)
 
     try:
-        # 生成内容
-        content = await generator.generate_content(
-            request.description,
-            request.core_idea
-        )
+        # 生成内容，使用请求指定的提供商和模型，同时统计耗时和token用量
+        with usage_scope() as usage:
+            content = await generator.generate_content(
+                request.description,
+                request.core_idea,
+                request.model_type,
+                request.model
+            )
 
-        # 生成文件路径
-        timestamp = datetime.now().strftime("%Y%m%d%H%M")
-        file_path = f"output/{timestamp}.md"
-
-        # 创建ArticleData实例
-        article_data = ArticleData(
-            content=content,
-            file_path=file_path
-        )
+        # 保存文章，返回实际写入的文件路径和文章ID
+        article_data = await generator.save_article(content, request, usage)
 
         # 将结果封装在响应模型中返回
         return ArticleResponse(
@@ -78,8 +145,260 @@ async def generate_article(request: ArticleRequest):
             detail=f"生成文章失败: {str(e)}"
         )
 
-@router.post("/generatetitle")
-async def generate_title(request: TitleRequest) -> TitleResponse:
+@router.post("/generate/stream")
+async def generate_article_stream(
+    request: ArticleRequest,
+    generator: ArticleGenerator = Depends(get_generator),
+    slot: Optional[AdmissionSlot] = Depends(admit_generation)
+):
+    """
+    流式生成文章的API接口（Server-Sent Events）
+
+    事件类型：
+    - delta: 文章内容片段，data为 {"content": "..."}
+    - done: 生成完成，data为 {"file_path": "...", "article_id": "...", "length": 文章长度}
+    - error: 生成失败，data为 {"detail": "错误信息"}
+
+    Args:
+        request (ArticleRequest): 包含以下字段的请求对象
+            - description: 文章描述（必填，5-1000字）
+            - core_idea: 核心主题（选填，最多100字）
+            - model_type: AI提供商（选填）
+            - model: 模型名称（选填）
+
+    Returns:
+        StreamingResponse: text/event-stream 格式的响应
+
+    Raises:
+        HTTPException:
+            - 400: 提供商或模型不支持
+            - 503: 负载过高，响应头 Retry-After 为建议的重试等待秒数
+    """
+    logger.info(f"Received generate stream request: {request}")
+    _check_model(generator, request.model_type, request.model)
+
+    # 槽位在流结束时释放，而不是在返回响应对象时
+    background = None
+    if slot is not None:
+        slot.detach()
+        background = BackgroundTask(slot.release)
+
+    async def event_stream():
+        parts = []
+        try:
+            with usage_scope() as usage:
+                async for chunk in generator.stream_content(
+                    request.description,
+                    request.core_idea,
+                    request.model_type,
+                    request.model
+                ):
+                    parts.append(chunk)
+                    yield format_sse("delta", {"content": chunk})
+
+            # 与非流式接口一样保存完整文章
+            content = ''.join(parts)
+            data = await generator.save_article(content, request, usage)
+            yield format_sse("done", {"file_path": data.file_path, "article_id": data.article_id, "length": len(content)})
+
+        except Exception as e:
+            logger.error(f"Error streaming article: {e}")
+            yield format_sse("error", {"detail": f"生成文章失败: {str(e)}"})
+
+        finally:
+            if slot is not None:
+                await slot.release()
+
+    return sse_response(event_stream(), background=background)
+
+def _batch_events(job: BatchJob):
+    """
+    把批量任务转换为SSE事件流
+
+    事件类型：
+    - job: 任务创建，data为任务状态
+    - item: 某项完成，data为该项的状态和结果
+    - done: 所有项完成，data为最终的任务状态
+    """
+    async def event_stream():
+        yield format_sse("job", job.to_data().model_dump())
+        async for item in job.results():
+            yield format_sse("item", item.model_dump())
+        yield format_sse("done", job.to_data().model_dump(exclude={"items"}))
+
+    return event_stream()
+
+@router.post("/batch")
+async def create_batch(
+    request: BatchRequest,
+    stream: bool = Query(False, description="是否以SSE直接返回每项的结果"),
+    generator: ArticleGenerator = Depends(get_generator)
+):
+    """
+    批量生成文章的API接口
+
+    各项在后台按提供商的并发上限执行。批量任务保存在处理请求的worker进程中，
+    多worker部署时建议使用 stream=true 在同一个连接中接收结果。
+
+    Args:
+        request (BatchRequest): 包含文章生成请求列表的请求对象
+        stream: 为true时返回SSE事件流，否则立即返回任务ID和各项状态
+
+    Returns:
+        BatchResponse | StreamingResponse: 任务状态，或SSE事件流
+
+    Raises:
+        HTTPException:
+            - 400: 某项的提供商或模型不支持
+    """
+    logger.info(f"Received batch request: 项数={len(request.items)}")
+    for item in request.items:
+        _check_model(generator, item.model_type, item.model)
+    job = BatchManager.get_instance().submit(request.items)
+
+    if stream:
+        return sse_response(_batch_events(job))
+
+    return BatchResponse(
+        success=True,
+        message="批量任务已提交",
+        data=job.to_data()
+    )
+
+@router.get("/batch/{job_id}")
+async def get_batch(job_id: str) -> BatchResponse:
+    """
+    查询批量任务状态
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        BatchResponse: 任务状态和各项结果
+
+    Raises:
+        HTTPException:
+            - 404: 任务不存在或已过期
+    """
+    job = BatchManager.get_instance().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"批量任务不存在: {job_id}")
+
+    return BatchResponse(
+        success=True,
+        message="查询成功",
+        data=job.to_data()
+    )
+
+@router.get("/batch/{job_id}/stream")
+async def stream_batch(job_id: str):
+    """
+    以SSE订阅批量任务的结果，已完成的项会先全部返回
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        StreamingResponse: text/event-stream 格式的响应
+
+    Raises:
+        HTTPException:
+            - 404: 任务不存在或已过期
+    """
+    job = BatchManager.get_instance().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"批量任务不存在: {job_id}")
+
+    return sse_response(_batch_events(job))
+
+@router.post("/jobs")
+async def create_job(
+    request: JobRequest,
+    generator: ArticleGenerator = Depends(get_generator)
+) -> JobResponse:
+    """
+    提交后台文章生成任务的API接口
+
+    立即返回任务ID，文章由后台worker生成。客户端通过
+    GET /article/jobs/{job_id} 轮询，或通过 GET /article/jobs/{job_id}/events 订阅进度。
+
+    Args:
+        request (JobRequest): 与 /article/generate 相同的请求对象
+
+    Returns:
+        JobResponse: 新建任务的状态
+
+    Raises:
+        HTTPException:
+            - 400: 提供商或模型不支持
+    """
+    logger.info(f"Received job request: {request}")
+    _check_model(generator, request.model_type, request.model)
+    job = await JobQueue.get_instance().submit(request)
+
+    return JobResponse(
+        success=True,
+        message="任务已提交",
+        data=to_job_data(job)
+    )
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> JobResponse:
+    """
+    查询后台任务状态
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        JobResponse: 任务状态，成功时包含文章数据
+
+    Raises:
+        HTTPException:
+            - 404: 任务不存在或已过期
+    """
+    job = await JobQueue.get_instance().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+
+    return JobResponse(
+        success=True,
+        message="查询成功",
+        data=to_job_data(job)
+    )
+
+@router.get("/jobs/{job_id}/events")
+async def watch_job(job_id: str):
+    """
+    以SSE订阅后台任务进度
+
+    每次状态变化时发送一个 status 事件，data为任务状态；任务完成或失败后结束。
+
+    Args:
+        job_id: 任务ID
+
+    Returns:
+        StreamingResponse: text/event-stream 格式的响应
+
+    Raises:
+        HTTPException:
+            - 404: 任务不存在或已过期
+    """
+    queue = JobQueue.get_instance()
+    if await queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+
+    async def event_stream():
+        async for job in queue.watch(job_id):
+            yield format_sse("status", to_job_data(job).model_dump())
+
+    return sse_response(event_stream())
+
+@router.post("/generatetitle", dependencies=[Depends(admit_generation)])
+async def generate_title(
+    request: TitleRequest,
+    generator: ArticleGenerator = Depends(get_generator)
+) -> TitleResponse:
     """
     生成文章标题的API接口
 
@@ -87,28 +406,39 @@ async def generate_title(request: TitleRequest) -> TitleResponse:
         request (TitleRequest): 包含以下字段的请求对象
             - description: 文章描述（必填，5-1000字）
             - platform: 平台名称（必填，例如：xiaohongshu, weixin, zhihu等）
+            - model_type: AI提供商（选填）
+            - model: 模型名称（选填）
 
     Returns:
         TitleResponse: 包含以下字段的响应对象
             - success: 是否成功
             - message: 响应消息
             - data: 包含标题内容的字典
-                - content: 生成的标题内容
+                - content: 生成的标题内容（带序号的文本）
+                - titles: 解析后的标题列表，每项包含 title、type、scenario、effect
+
+    Raises:
+        HTTPException:
+            - 400: 提供商或模型不支持
+            - 500: 生成标题过程中发生错误
+            - 503: 负载过高，响应头 Retry-After 为建议的重试等待秒数
     """
     logger.info(f"Received generate title request: {request}")
-    generator = ArticleGenerator()
+    _check_model(generator, request.model_type, request.model)
 
     try:
         # 生成标题
-        titles = await generator.generate_titles(
+        data = await generator.generate_titles(
             description=request.description,
-            platform=request.platform
+            platform=request.platform,
+            model_type=request.model_type,
+            model=request.model
         )
 
         return TitleResponse(
             success=True,
             message="标题生成成功",
-            data=TitleData(content=titles[0])
+            data=data
         )
 
     except Exception as e:
@@ -117,3 +447,160 @@ async def generate_title(request: TitleRequest) -> TitleResponse:
             status_code=500,
             detail=f"生成标题失败: {str(e)}"
         )
+
+@router.post("/generatetitles", dependencies=[Depends(admit_generation)])
+async def generate_titles_multi(
+    request: MultiTitleRequest,
+    generator: ArticleGenerator = Depends(get_generator)
+) -> MultiTitleResponse:
+    """
+    同时为多个平台生成标题的API接口
+
+    各平台并发生成，某个平台失败时仍返回其他平台的结果。
+
+    Args:
+        request (MultiTitleRequest): 包含以下字段的请求对象
+            - description: 文章描述（必填，5-1000字）
+            - platforms: 平台列表（必填，例如：["xiaohongshu", "weixin", "zhihu"]）
+
+    Returns:
+        MultiTitleResponse: 包含以下字段的响应对象
+            - success: 是否至少有一个平台生成成功
+            - message: 响应消息
+            - data: 各平台的结果列表，每项包含 platform、success、data、error
+
+    Raises:
+        HTTPException:
+            - 400: 提供商或模型不支持
+            - 500: 所有平台都生成失败
+            - 503: 负载过高，响应头 Retry-After 为建议的重试等待秒数
+    """
+    logger.info(f"Received generate titles request: platforms={request.platforms}")
+    _check_model(generator, request.model_type, request.model)
+
+    results = await generator.generate_titles_for_platforms(
+        description=request.description,
+        platforms=request.platforms,
+        model_type=request.model_type,
+        model=request.model
+    )
+
+    data = [
+        PlatformTitleData(platform=platform, success=False, error=str(result))
+        if isinstance(result, Exception)
+        else PlatformTitleData(platform=platform, success=True, data=result)
+        for platform, result in results.items()
+    ]
+    failed = [item for item in data if not item.success]
+    if len(failed) == len(data):
+        raise HTTPException(
+            status_code=500,
+            detail="生成标题失败: " + "; ".join(f"{item.platform}: {item.error}" for item in failed)
+        )
+
+    return MultiTitleResponse(
+        success=True,
+        message="标题生成成功" if not failed else f"部分平台标题生成失败: {', '.join(item.platform for item in failed)}",
+        data=data
+    )
+
+def get_store() -> ArticleStore:
+    """
+    获取进程内共享的文章存储，供历史文章接口通过 Depends 注入
+
+    Raises:
+        HTTPException:
+            - 404: 未开启文章存储（ARTICLE_STORE_ENABLED=false）
+    """
+    if not Config.get_instance().ARTICLE_STORE_ENABLED:
+        raise HTTPException(status_code=404, detail="未开启文章存储")
+    return ArticleStore.get_instance()
+
+@router.get("/history")
+async def list_articles(
+    page: int = Query(1, ge=1, description="页码，从1开始"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    provider: Optional[str] = Query(None, description="只列出该提供商生成的文章"),
+    model: Optional[str] = Query(None, description="只列出该模型生成的文章"),
+    store: ArticleStore = Depends(get_store)
+) -> ArticleListResponse:
+    """
+    按创建时间倒序分页列出已生成的文章
+
+    Returns:
+        ArticleListResponse: 当前页的文章摘要（不含正文）和总数
+
+    Raises:
+        HTTPException:
+            - 404: 未开启文章存储
+    """
+    items, total = await store.list(page, page_size, provider, model)
+    return ArticleListResponse(
+        success=True,
+        message="查询成功",
+        data=ArticleListData(
+            items=[ArticleSummary(**item) for item in items],
+            total=total,
+            page=page,
+            page_size=page_size
+        )
+    )
+
+@router.get("/history/search")
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索关键词，多个关键词以空格分隔"),
+    page: int = Query(1, ge=1, description="页码，从1开始"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    store: ArticleStore = Depends(get_store)
+) -> ArticleListResponse:
+    """
+    全文搜索已生成文章的标题、正文和描述
+
+    结果需包含所有关键词，按相关度排序；每项的 snippet 为正文中命中的片段。
+
+    Returns:
+        ArticleListResponse: 当前页的文章摘要和总数
+
+    Raises:
+        HTTPException:
+            - 404: 未开启文章存储
+    """
+    items, total = await store.search(q, page, page_size)
+    return ArticleListResponse(
+        success=True,
+        message="查询成功",
+        data=ArticleListData(
+            items=[ArticleSummary(**item) for item in items],
+            total=total,
+            page=page,
+            page_size=page_size
+        )
+    )
+
+@router.get("/history/{article_id}")
+async def get_article(
+    article_id: str,
+    store: ArticleStore = Depends(get_store)
+) -> ArticleRecordResponse:
+    """
+    按ID获取已生成的文章
+
+    Args:
+        article_id: 文章ID（生成接口返回的 article_id）
+
+    Returns:
+        ArticleRecordResponse: 文章内容和元数据
+
+    Raises:
+        HTTPException:
+            - 404: 文章不存在或未开启文章存储
+    """
+    article = await store.get(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail=f"文章不存在: {article_id}")
+
+    return ArticleRecordResponse(
+        success=True,
+        message="查询成功",
+        data=ArticleRecord(**article)
+    )
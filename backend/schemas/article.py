@@ -8,8 +8,8 @@ from typing import List, Optional, Literal, Dict, Any
 from pydantic import BaseModel, Field, ConfigDict
 from .base import BaseResponse
 
-# 定义支持的模型类型
-ModelType = Literal["monica", "zhipu"]
+# 定义支持的模型类型，mock 为离线测试用的模拟提供商，auto 表示按延迟自动选择提供商
+ModelType = Literal["monica", "zhipu", "mock", "auto"]
 
 class ArticleRequest(BaseModel):
     """
@@ -28,9 +28,14 @@ class ArticleRequest(BaseModel):
         max_length=100,
         description="核心主题，用于指导文章生成的方向"
     )
-    model_type: ModelType = Field(
-        "monica",
-        description="AI模型类型，支持'monica'和'zhipu'"
+    model_type: Optional[ModelType] = Field(
+        None,
+        description="AI提供商类型，支持'monica'、'zhipu'、'mock'（模拟提供商，需启用）和'auto'（按延迟自动选择），不指定则使用服务端配置的AI_PROVIDER"
+    )
+    model: Optional[str] = Field(
+        None,
+        max_length=100,
+        description="模型名称，必须是服务端允许的模型（<PROVIDER>_MODEL 或 <PROVIDER>_MODELS），不指定则使用提供商的默认模型"
     )
 
     model_config = ConfigDict(
@@ -38,7 +43,8 @@ class ArticleRequest(BaseModel):
             "example": {
                 "description": "写一篇关于人工智能在教育领域应用的文章",
                 "core_idea": "AI如何改变传统教育模式",
-                "model_type": "monica"
+                "model_type": "zhipu",
+                "model": "glm-4-flash"
             }
         },
         protected_namespaces=()
@@ -58,12 +64,17 @@ class ArticleData(BaseModel):
         ...,
         description="保存的文件路径"
     )
+    article_id: Optional[str] = Field(
+        None,
+        description="文章存储中的ID，可通过 /article/history/{article_id} 查询，未开启文章存储时为空"
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "content": "# AI如何改变传统教育模式\n\n## 引言\n\n...",
-                "file_path": "output/202312201234.md"
+                "file_path": "output/20231220123456-1a2b3c4d.md",
+                "article_id": "5f0c6a0e-8d5b-4d0f-9a53-2f6a3b1c7e21"
             }
         },
         protected_namespaces=()
@@ -102,7 +113,7 @@ class ArticleResponse(BaseResponse):
                         "教师角色转变：AI在课堂中的辅助与替代",
                         "未来技能培养：AI时代需要的核心素养"
                     ],
-                    "file_path": "output/202312211234.md"
+                    "file_path": "output/20231221123456-5e6f7a8b.md"
                 }
             }
         },
@@ -111,12 +122,191 @@ class ArticleResponse(BaseResponse):
 
 class TitleRequest(BaseModel):
     description: str = Field(..., min_length=5, max_length=1000, description="文章描述")
-    platform: str = Field(..., description="目标平台，如：xiaohongshu")
+    platform: str = Field(..., description="目标平台：xiaohongshu, weixin, zhihu")
+    model_type: Optional[ModelType] = Field(None, description="AI提供商类型，不指定则使用服务端配置")
+    model: Optional[str] = Field(None, max_length=100, description="模型名称，不指定则使用提供商的默认模型")
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class TitleItem(BaseModel):
+    title: str = Field(..., description="标题")
+    type: str = Field("", description="标题类型，如励志型、干货型")
+    scenario: str = Field("", description="适用场景，如个人日记、经验分享")
+    effect: str = Field("", description="预期效果，如激励、教育、共鸣")
 
 class TitleData(BaseModel):
-    content: str = Field(..., description="生成的标题内容")
+    content: str = Field(..., description="生成的标题内容（带序号的文本，兼容旧客户端）")
+    titles: List[TitleItem] = Field(default_factory=list, description="解析后的标题列表")
 
 class TitleResponse(BaseModel):
     success: bool = Field(..., description="是否成功")
     message: str = Field(..., description="响应消息")
     data: Optional[TitleData] = Field(None, description="标题数据")
+
+class MultiTitleRequest(BaseModel):
+    description: str = Field(..., min_length=5, max_length=1000, description="文章描述")
+    platforms: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=10,
+        description="目标平台列表：xiaohongshu, weixin, zhihu"
+    )
+    model_type: Optional[ModelType] = Field(None, description="AI提供商类型，不指定则使用服务端配置")
+    model: Optional[str] = Field(None, max_length=100, description="模型名称，不指定则使用提供商的默认模型")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "description": "写一篇关于城市夜跑的文章",
+                "platforms": ["xiaohongshu", "weixin", "zhihu"]
+            }
+        },
+        protected_namespaces=()
+    )
+
+class PlatformTitleData(BaseModel):
+    platform: str = Field(..., description="平台名称")
+    success: bool = Field(..., description="该平台是否生成成功")
+    data: Optional[TitleData] = Field(None, description="该平台的标题数据")
+    error: Optional[str] = Field(None, description="该平台失败时的原因")
+
+class MultiTitleResponse(BaseModel):
+    success: bool = Field(..., description="是否至少有一个平台生成成功")
+    message: str = Field(..., description="响应消息")
+    data: List[PlatformTitleData] = Field(default_factory=list, description="各平台的生成结果，顺序与请求相同")
+
+# 批量任务和单项的状态
+JobStatus = Literal["pending", "running", "succeeded", "failed"]
+
+class BatchRequest(BaseModel):
+    """
+    批量文章生成请求模型
+    """
+    items: List[ArticleRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="文章生成请求列表，每项与 /article/generate 的请求相同"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"description": "写一篇关于人工智能在教育领域应用的文章", "core_idea": "AI如何改变传统教育模式"},
+                    {"description": "写一篇关于城市夜跑的文章", "core_idea": "跑步让平凡的日子也能亮起来"}
+                ]
+            }
+        },
+        protected_namespaces=()
+    )
+
+class BatchItemData(BaseModel):
+    """
+    批量任务中单项的状态和结果
+    """
+    index: int = Field(..., description="在请求列表中的位置")
+    status: JobStatus = Field("pending", description="状态：pending, running, succeeded, failed")
+    content: Optional[str] = Field(None, description="生成的文章内容")
+    file_path: Optional[str] = Field(None, description="保存的文件路径")
+    error: Optional[str] = Field(None, description="失败原因")
+
+class BatchJobData(BaseModel):
+    """
+    批量任务状态
+    """
+    job_id: str = Field(..., description="任务ID")
+    status: JobStatus = Field(..., description="任务状态")
+    total: int = Field(..., description="总项数")
+    succeeded: int = Field(0, description="成功项数")
+    failed: int = Field(0, description="失败项数")
+    items: List[BatchItemData] = Field(default_factory=list, description="各项的状态和结果")
+
+class BatchResponse(BaseResponse):
+    """
+    批量文章生成响应模型
+    """
+    data: Optional[BatchJobData] = Field(
+        None,
+        description="批量任务状态"
+    )
+
+class JobRequest(ArticleRequest):
+    """
+    后台文章生成任务请求模型，字段与 /article/generate 相同
+    """
+
+class JobData(BaseModel):
+    """
+    后台任务状态
+    """
+    job_id: str = Field(..., description="任务ID")
+    status: JobStatus = Field(..., description="任务状态：pending, running, succeeded, failed")
+    result: Optional[ArticleData] = Field(None, description="任务成功时的文章数据")
+    error: Optional[str] = Field(None, description="任务失败时的原因")
+    created_at: float = Field(..., description="创建时间（Unix时间戳）")
+    updated_at: float = Field(..., description="最后更新时间（Unix时间戳）")
+
+class JobResponse(BaseResponse):
+    """
+    后台任务响应模型
+    """
+    data: Optional[JobData] = Field(
+        None,
+        description="任务状态"
+    )
+
+class ArticleSummary(BaseModel):
+    """
+    文章存储中的文章摘要（不含正文），用于列表和搜索结果
+    """
+    id: str = Field(..., description="文章ID")
+    title: str = Field(..., description="标题（取自正文的第一个标题）")
+    description: str = Field(..., description="文章描述")
+    core_idea: Optional[str] = Field(None, description="核心观点")
+    directions: List[str] = Field(default_factory=list, description="写作方向")
+    provider: Optional[str] = Field(None, description="实际调用的AI提供商")
+    model: Optional[str] = Field(None, description="实际调用的模型")
+    prompt_version: Optional[str] = Field(None, description="提示词模板版本")
+    latency_ms: Optional[float] = Field(None, description="生成耗时（毫秒）")
+    prompt_tokens: int = Field(0, description="输入token数，命中缓存时为0")
+    completion_tokens: int = Field(0, description="输出token数，命中缓存时为0")
+    file_path: Optional[str] = Field(None, description="保存的文件路径")
+    created_at: str = Field(..., description="创建时间（UTC，ISO 8601）")
+    updated_at: str = Field(..., description="最后更新时间（UTC，ISO 8601）")
+    snippet: Optional[str] = Field(None, description="搜索时正文中命中的片段，命中的部分用 [] 标出")
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class ArticleRecord(ArticleSummary):
+    """
+    文章存储中的完整文章
+    """
+    content: str = Field(..., description="文章内容")
+
+class ArticleListData(BaseModel):
+    """
+    分页的文章列表
+    """
+    items: List[ArticleSummary] = Field(default_factory=list, description="当前页的文章")
+    total: int = Field(..., description="符合条件的文章总数")
+    page: int = Field(..., description="页码，从1开始")
+    page_size: int = Field(..., description="每页数量")
+
+class ArticleListResponse(BaseResponse):
+    """
+    文章列表和搜索响应模型
+    """
+    data: Optional[ArticleListData] = Field(
+        None,
+        description="分页的文章列表"
+    )
+
+class ArticleRecordResponse(BaseResponse):
+    """
+    单篇历史文章响应模型
+    """
+    data: Optional[ArticleRecord] = Field(
+        None,
+        description="文章内容和元数据"
+    )
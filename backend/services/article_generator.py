@@ -5,18 +5,32 @@
 """
 
 import os
+import asyncio
 import logging
 import hashlib
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from backend.utils.api_client import APIClient
 from backend.utils.cache import Cache
+from backend.utils.metrics import PROMPT_BUILD_SECONDS, UsageTotals, timed, usage_scope
+from backend.utils.paths import CACHE_DIR
+from backend.utils.singleflight import SingleFlight, SQLiteLockStore
+from backend.utils.storage import save_article_file
 from backend.config import Config
-from backend.schemas.article import ArticleRequest, ArticleResponse, ArticleData
+from backend.models.article import Article
+from backend.services.article_store import ArticleStore
+from backend.services.prompts import PromptRegistry, PromptTemplate
+from backend.services.title_parser import format_titles, parse_titles
+from backend.schemas.article import ArticleRequest, ArticleResponse, ArticleData, TitleData, TitleItem
 
 logger = logging.getLogger(__name__)
 
+# 文章内容的提示词模板名称
+CONTENT_TEMPLATE = "article_content"
+
+# 请求实际使用的 (提供商, 模型)
+ModelRoute = Tuple[str, str]
+
 class ArticleGenerator:
     """
     文章生成器：负责文章的生成、缓存和存储
@@ -25,53 +39,218 @@ class ArticleGenerator:
     1. 根据描述和核心主题生成文章内容
     2. 将生成的文章保存到文件
 
+    应用中使用 get_instance() 获取进程内共享的实例，每个请求通过参数指定提供商，
+    不修改生成器的状态。
+
     属性：
-        api_client: API客户端，用于调用AI接口
+        default_model_type: 请求未指定提供商时使用的提供商
+        clients: 以提供商类型为键的API客户端，用于调用AI接口
         cache: 缓存客户端，用于缓存生成结果
         config: 配置对象，包含文章生成的相关配置
     """
 
+    # 进程内共享的请求合并器，相同内容的并发生成请求只调用一次AI接口
+    _content_flight: Optional[SingleFlight] = None
+    # 进程内共享的生成器实例，由应用的lifespan创建
+    _instance: Optional['ArticleGenerator'] = None
+
     def __init__(self, model_type: Optional[str] = None):
         """
         初始化文章生成器
 
+        生成器不保存任何请求相关的状态，可以在所有请求间共享。
+
         Args:
-            model_type: AI提供商类型，如果不指定则使用配置文件中的设置
+            model_type: 默认的AI提供商类型，如果不指定则使用配置文件中的设置
         """
+        self.config = Config.get_instance()
         # 如果未指定model_type，从配置中获取
-        if model_type is None:
-            config = Config.get_instance()
-            model_type = config.AI_PROVIDER
-
-        self.api_client = APIClient(model_type)
+        self.default_model_type = model_type or self.config.AI_PROVIDER
+        self.clients: Dict[ModelRoute, APIClient] = {}
         self.cache = Cache()
-        self.config = Config.get_instance()
+        self.content_flight = self._get_content_flight(self.config)
+
+    @classmethod
+    def get_instance(cls) -> 'ArticleGenerator':
+        """
+        获取进程内共享的文章生成器
+
+        Returns:
+            ArticleGenerator: 使用配置中默认提供商的生成器实例
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """丢弃共享的实例，应用关闭、API客户端释放后调用"""
+        cls._instance = None
+
+    @property
+    def api_client(self) -> APIClient:
+        """默认提供商和模型的API客户端"""
+        return self.client_for()
+
+    def resolve_model(self, model_type: Optional[str] = None, model: Optional[str] = None) -> ModelRoute:
+        """
+        确定请求实际使用的提供商和模型
+
+        Args:
+            model_type: AI提供商类型，不指定则使用默认提供商
+            model: 模型名称，不指定则使用提供商的默认模型
+
+        Returns:
+            ModelRoute: (提供商, 模型)
+
+        Raises:
+            ValueError: 提供商不支持或模型不在允许列表中时抛出
+        """
+        model_type = model_type or self.default_model_type
+        allowed = self.config.allowed_models(model_type)
+        if not allowed:
+            raise ValueError(f"不支持的AI提供商: {model_type}")
+        if not self.config.provider_configured(model_type):
+            raise ValueError(f"AI提供商未配置API密钥: {model_type}")
+        model = model or allowed[0]
+        if model not in allowed:
+            raise ValueError(f"不支持的模型: {model_type}:{model}，可选: {', '.join(allowed)}")
+        return model_type, model
+
+    def client_for(self, model_type: Optional[str] = None, model: Optional[str] = None) -> APIClient:
+        """
+        获取指定提供商和模型的API客户端
+
+        每个提供商和模型只创建一次客户端，之后的请求直接复用；创建过程中没有await，
+        并发请求不会重复创建。
+
+        Args:
+            model_type: AI提供商类型，不指定则使用默认提供商
+            model: 模型名称，不指定则使用提供商的默认模型
+
+        Returns:
+            APIClient: 对应的API客户端
 
-    def _get_cache_key(self, *args) -> str:
+        Raises:
+            ValueError: 提供商不支持或模型不在允许列表中时抛出
+        """
+        route = self.resolve_model(model_type, model)
+        client = self.clients.get(route)
+        if client is None:
+            client = APIClient(*route)
+            self.clients[route] = client
+        return client
+
+    @classmethod
+    def _get_content_flight(cls, config: Config) -> SingleFlight:
+        """
+        获取共享的请求合并器，不存在时创建
+
+        配置了 SINGLEFLIGHT_LOCK_STORE=sqlite 且开启了共享缓存（tiered、sqlite 或 file 后端）时，
+        同时在多个worker进程间合并请求。其他进程的等待者从共享缓存读取持锁者的结果，
+        没有共享缓存时等待者读不到结果，只能在锁释放后依次重新生成，因此不使用跨进程锁。
+
+        Args:
+            config: 配置对象
+
+        Returns:
+            SingleFlight: 请求合并器
+        """
+        if cls._content_flight is None:
+            lock_store = None
+            shared_cache = config.CACHE_ENABLED and config.CACHE_BACKEND != "memory"
+            if config.SINGLEFLIGHT_LOCK_STORE == "sqlite" and not shared_cache:
+                logger.warning("SINGLEFLIGHT_LOCK_STORE=sqlite 需要开启共享缓存，只在进程内合并请求")
+            elif config.SINGLEFLIGHT_LOCK_STORE == "sqlite":
+                lock_store = SQLiteLockStore(
+                    config.SINGLEFLIGHT_LOCK_DB_PATH or os.path.join(CACHE_DIR, "locks.db"),
+                    lease_seconds=config.SINGLEFLIGHT_LEASE_SECONDS
+                )
+            cls._content_flight = SingleFlight(
+                "content",
+                lock_store=lock_store,
+                wait_timeout=config.SINGLEFLIGHT_LEASE_SECONDS
+            )
+        return cls._content_flight
+
+    def _get_cache_key(self, route: ModelRoute, *args) -> str:
         """
         生成缓存键
 
         Args:
+            route: 请求实际使用的 (提供商, 模型)
             *args: 用于生成缓存键的参数列表
 
         Returns:
             str: MD5格式的缓存键
         """
-        # 获取模型信息
-        provider = self.api_client.client.config.AI_PROVIDER
-        model = (
-            self.api_client.client.config.MONICA_MODEL
-            if provider == "monica"
-            else self.api_client.client.config.ZHIPU_MODEL
-        )
         # 添加提供商和模型信息到缓存键
-        content = f"{provider}:{model}:" + ''.join(str(arg) for arg in args)
+        content = f"{self._model_scope(route)}:" + ''.join(str(arg) for arg in args)
         return hashlib.md5(content.encode()).hexdigest()
 
-    async def generate_content(
+    @staticmethod
+    def _model_scope(route: ModelRoute) -> str:
+        """
+        获取提供商和模型的标识，用于区分不同模型生成的缓存
+
+        Args:
+            route: 请求实际使用的 (提供商, 模型)
+
+        Returns:
+            str: 格式为 "提供商:模型"
+        """
+        return f"{route[0]}:{route[1]}"
+
+    def _semantic_input(
+        self,
+        route: ModelRoute,
+        description: str,
+        core_idea: Optional[str]
+    ) -> Tuple[str, str]:
+        """
+        构建语义近似缓存的匹配范围和输入文本
+
+        只有相同模型和提示词模板生成的文章才能互相复用。
+
+        Args:
+            route: 请求实际使用的 (提供商, 模型)
+            description: 文章描述
+            core_idea: 核心观点（可选）
+
+        Returns:
+            Tuple[str, str]: (匹配范围, 输入文本)
+        """
+        scope = f"{self._model_scope(route)}:{PromptRegistry.get(CONTENT_TEMPLATE).key}"
+        return scope, f"{description}\n{core_idea or ''}"
+
+    def _build_content_messages(
         self,
         description: str,
         core_idea: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        构建文章生成的消息列表
+
+        系统提示词在模板加载时已渲染好，这里只填充用户提示词。
+
+        Args:
+            description: 文章描述
+            core_idea: 核心观点（可选）
+
+        Returns:
+            List[Dict[str, Any]]: 发送给AI接口的消息列表
+        """
+        return PromptRegistry.get(CONTENT_TEMPLATE).render(
+            description=description,
+            core_idea=core_idea if core_idea else '无'
+        )
+
+    async def generate_content(
+        self,
+        description: str,
+        core_idea: Optional[str] = None,
+        model_type: Optional[str] = None,
+        model: Optional[str] = None
     ) -> str:
         """
         生成文章内容
@@ -79,129 +258,198 @@ class ArticleGenerator:
         Args:
             description: 文章描述
             core_idea: 核心观点（可选）
+            model_type: AI提供商类型，不指定则使用默认提供商
+            model: 模型名称，不指定则使用提供商的默认模型
 
         Returns:
             str: 生成的文章内容
 
         Raises:
+            ValueError: 提供商或模型不支持时抛出
             Exception: 当API调用失败时抛出
         """
         try:
-            cache_key = self._get_cache_key('content', description, core_idea)
-            cached_result = self.cache.get(cache_key)
+            route = self.resolve_model(model_type, model)
+            cache_key = self._get_cache_key(route, 'content', PromptRegistry.get(CONTENT_TEMPLATE).key, description, core_idea)
+            cached_result = await self.cache.aget(cache_key)
             if cached_result:
                 logger.info("使用缓存的文章内容")
                 return cached_result
 
-            min_word_count = self.config.MIN_WORD_COUNT
-            max_word_count = self.config.MAX_WORD_COUNT
-            min_core_word_count = self.config.MIN_CORE_WORD_COUNT
-
-            messages = [
-                {
-                    "role": "system",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": (
-                                f"你是一位经验丰富的微信公众号爆文创作者，拥有丰富的写作技巧和对热点传播的敏感度。请基于下面提供的信息，创作一篇{min_word_count} - {max_word_count}字的文章，并以markdown格式输出。\n\n"
-                                f"【创作要求】\n\n"
-                                f"1. 内容要求\n"
-                                f"- 文章总字数控制在{min_word_count} - {max_word_count}之间\n"
-                                "- 主题鲜明，观点突出\n"
-                                "- 可以有二级标题，不能有小标题\n"
-                                "- 语言生动，表达流畅\n"
-                                "- 避免表情符号，请勿使用表情符号\n"
-                                f"- 特别强调，必须要遵循的：每个主题下的数据字数不少于{min_core_word_count}个字 。写完后请注意检查是否符合标准\n"
-                                "2. 写作技巧\n"
-                                "**标题**：吸引人，能够引发读者点击，不超过20个字。\n"
-                                "**开头**： 开头要吸引读者注意，不超过100个字。\n"
-                                "**内容（一定要遵守，会有人工审核的哦）***：\n"
-                                "- **自然融入**：数据和案例应自然融入文章，避免使用 '数据支撑'、'案例'等突兀词汇。\n"
-                                "- **丰富性**：每段文字都要丰富、有理有据，包含具体案例、数据支撑或引用权威观点，但需自然嵌入。\n"
-                                "- 使用相关数据或研究结果，提升内容的可信度。\n"
-                                "- 通过故事情节或情感表达，引发读者的共鸣。\n"
-                                "- 在适当位置设置互动性问题，增加读者的参与感。\n\n"
-                                "3. 格式规范\n"
-                                "- 使用markdown语法\n"
-                                "- 标题层级清晰(#、##、###)\n"
-                                "- 重点内容加粗(**文字**)\n"
-                                "- 适当使用列表和引用\n"
-                                "- 段落间留出适当空行\n\n"
-                                "请确保文章符合以上要求，适合微信公众号发布。"
-                            )
-                        }
-                    ]
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": (
-                                "请根据以下信息撰写文章：\n"
-                                f"描述：{description}\n"
-                                f"核心观点：{core_idea if core_idea else '无'}"
-                            )
-                        }
-                    ]
-                }
-            ]
-
-            content = await self.api_client.call_api(messages=messages)
-            if not content:
-                raise ValueError("生成的文章内容为空")
+            cached_result = await self.cache.aget_similar(*self._semantic_input(route, description, core_idea))
+            if cached_result:
+                logger.info("使用语义近似缓存的文章内容")
+                return cached_result
 
-            self.cache.set(cache_key, content)
-            logger.info(f"成功生成文章内容，长度: {len(content)}")
-            return content
+            # 相同请求并发到达时只调用一次AI接口
+            return await self.content_flight.do(
+                cache_key,
+                lambda: self._generate_uncached_content(cache_key, route, description, core_idea),
+                recheck=lambda: self.cache.aget(cache_key)
+            )
 
         except Exception as e:
             logger.error(f"生成文章内容时发生错误: {str(e)}")
             raise
 
-    def save_article(
+    async def _generate_uncached_content(
         self,
-        content: str
+        cache_key: str,
+        route: ModelRoute,
+        description: str,
+        core_idea: Optional[str] = None
     ) -> str:
         """
-        保存文章到文件
+        调用AI接口生成文章内容并写入缓存
 
         Args:
-            content: 文章内容
+            cache_key: 缓存键
+            route: 使用的 (提供商, 模型)
+            description: 文章描述
+            core_idea: 核心观点（可选）
 
         Returns:
-            str: 保存的文件路径
+            str: 生成的文章内容
 
         Raises:
-            OSError: 当文件创建或写入失败时抛出
+            ValueError: 当生成的内容为空时抛出
+        """
+        with timed(PROMPT_BUILD_SECONDS, "prompt"):
+            messages = self._build_content_messages(description, core_idea)
+        content = await self.client_for(*route).call_api(messages=messages)
+        if not content:
+            raise ValueError("生成的文章内容为空")
+
+        await self.cache.aset(cache_key, content)
+        await self.cache.aadd_similar(*self._semantic_input(route, description, core_idea), cache_key)
+        logger.info(f"成功生成文章内容，模型: {self._model_scope(route)}，长度: {len(content)}")
+        return content
+
+    async def stream_content(
+        self,
+        description: str,
+        core_idea: Optional[str] = None,
+        model_type: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        流式生成文章内容
+
+        命中缓存时一次性返回缓存内容；否则边生成边返回文本片段，
+        生成结束后把完整内容写入缓存。
+
+        Args:
+            description: 文章描述
+            core_idea: 核心观点（可选）
+            model_type: AI提供商类型，不指定则使用默认提供商
+            model: 模型名称，不指定则使用提供商的默认模型
+
+        Yields:
+            str: 文章内容片段
+
+        Raises:
+            Exception: 当API调用失败时抛出
         """
         try:
-            os.makedirs('output', exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d%H%M")
-            filename = f"output/{timestamp}.md"
+            route = self.resolve_model(model_type, model)
+            cache_key = self._get_cache_key(route, 'content', PromptRegistry.get(CONTENT_TEMPLATE).key, description, core_idea)
+            cached_result = await self.cache.aget(cache_key)
+            if not cached_result:
+                cached_result = await self.cache.aget_similar(*self._semantic_input(route, description, core_idea))
+            if cached_result:
+                logger.info("使用缓存的文章内容")
+                yield cached_result
+                return
 
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with timed(PROMPT_BUILD_SECONDS, "prompt"):
+                messages = self._build_content_messages(description, core_idea)
 
-            logger.info(f"文章已保存到: {filename}")
-            return filename
+            parts: List[str] = []
+            async for chunk in self.client_for(*route).stream_api(messages=messages):
+                parts.append(chunk)
+                yield chunk
+
+            content = ''.join(parts)
+            if not content:
+                raise ValueError("生成的文章内容为空")
+
+            await self.cache.aset(cache_key, content)
+            await self.cache.aadd_similar(*self._semantic_input(route, description, core_idea), cache_key)
+            logger.info(f"成功流式生成文章内容，模型: {self._model_scope(route)}，长度: {len(content)}")
+
+        except Exception as e:
+            logger.error(f"流式生成文章内容时发生错误: {str(e)}")
+            raise
+
+    async def save_article(
+        self,
+        content: str,
+        request: Optional[ArticleRequest] = None,
+        usage: Optional[UsageTotals] = None
+    ) -> ArticleData:
+        """
+        保存文章到文件，并记录到文章存储
+
+        写入在线程池中进行，并通过临时文件和原子重命名保证文件完整。
+        开启了 ARTICLE_STORE_ENABLED 时，文章和元数据加入文章存储的待写列表，由后台批量写入。
+
+        Args:
+            content: 文章内容
+            request: 生成文章的请求，用于记录描述、提供商和模型
+            usage: 生成过程的耗时和token用量（由 usage_scope() 统计）
+
+        Returns:
+            ArticleData: 文章内容、已写入文件相对于项目根目录的路径和文章ID
 
+        Raises:
+            OSError: 当文件创建或写入失败时抛出
+        """
+        try:
+            filename = await save_article_file(content)
+            logger.info(f"文章已保存到: {filename}")
         except OSError as e:
             logger.error(f"保存文章时发生错误: {str(e)}")
             raise
 
-    def switch_model(self, model_type: str) -> None:
+        article_id = None
+        if self.config.ARTICLE_STORE_ENABLED:
+            article = self._build_article(content, filename, request, usage)
+            ArticleStore.get_instance().add(article)
+            article_id = article.id
+        return ArticleData(content=content, file_path=filename, article_id=article_id)
+
+    def _build_article(
+        self,
+        content: str,
+        file_path: str,
+        request: Optional[ArticleRequest],
+        usage: Optional[UsageTotals]
+    ) -> Article:
         """
-        切换AI模型类型
+        构建要保存到文章存储的记录
 
-        Args:
-            model_type: 新的AI提供商类型
+        自动路由时记录实际调用的提供商和模型；命中缓存时token用量为0。
         """
-        current_provider = self.api_client.client.config.AI_PROVIDER
-        if model_type != current_provider:
-            logger.info(f"切换AI提供商: {current_provider} -> {model_type}")
-            self.api_client = APIClient(model_type)
+        provider, model = self.resolve_model(
+            request.model_type if request else None,
+            request.model if request else None
+        )
+        if usage is not None and usage.provider:
+            provider, model = usage.provider, usage.model
+        return Article(
+            title=Article.title_from_content(content),
+            content=content,
+            directions=[],
+            description=request.description if request else "",
+            core_idea=request.core_idea if request else None,
+            provider=provider,
+            model=model,
+            prompt_version=PromptRegistry.get(CONTENT_TEMPLATE).key,
+            latency_ms=round(usage.seconds * 1000, 1) if usage and usage.seconds is not None else None,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            file_path=file_path
+        )
 
     async def generate(self, request: ArticleRequest) -> ArticleResponse:
         """
@@ -216,115 +464,179 @@ class ArticleGenerator:
         Raises:
             Exception: 当文章生成过程中发生错误时抛出
         """
-        logger.info(f"开始生成文章: 描述长度={len(request.description)}, AI提供商={request.model_type}")
+        logger.info(f"开始生成文章: 描述长度={len(request.description)}, AI提供商={request.model_type}, 模型={request.model}")
 
         try:
-            # 如果需要，切换到新的模型
-            self.switch_model(request.model_type)
-
-            # 生成文章内容
-            content = await self.generate_content(request.description, request.core_idea)
+            # 生成文章内容，使用请求指定的提供商和模型
+            with usage_scope() as usage:
+                content = await self.generate_content(
+                    request.description,
+                    request.core_idea,
+                    request.model_type,
+                    request.model
+                )
 
             # 保存文章
-            file_path = self.save_article(content)
+            data = await self.save_article(content, request, usage)
 
             # 创建响应
             response = ArticleResponse(
                 success=True,
                 message="文章生成成功",
-                data=ArticleData(
-                    content=content,
-                    file_path=file_path
-                )
+                data=data
             )
 
-            logger.info(f"文章生成成功: 文件={file_path}, AI提供商={request.model_type}, 内容长度={len(content)}")
+            logger.info(f"文章生成成功: 文件={data.file_path}, AI提供商={request.model_type}, 内容长度={len(content)}")
             return response
 
         except Exception as e:
             logger.error(f"生成文章时发生错误: {str(e)}, AI提供商={request.model_type}")
             raise
 
-    async def generate_titles(self, description: str, platform: str = "xiaohongshu") -> List[str]:
+    def _title_template(self, platform: str) -> PromptTemplate:
+        """
+        获取平台对应的标题模板
+
+        TITLE_OUTPUT_FORMAT=json 时优先使用 titles_<平台>_json 模板，平台没有JSON模板时使用文本模板。
+
+        Args:
+            platform: 目标平台
+
+        Returns:
+            PromptTemplate: 标题提示词模板
+
+        Raises:
+            ValueError: 平台没有对应的模板时抛出
+        """
+        name = f"titles_{platform.lower()}"
+        if self.config.TITLE_OUTPUT_FORMAT == "json":
+            try:
+                return PromptRegistry.get(f"{name}_json")
+            except KeyError:
+                pass
+        try:
+            return PromptRegistry.get(name)
+        except KeyError:
+            raise ValueError(f"不支持的平台类型: {platform}")
+
+    async def generate_titles(
+        self,
+        description: str,
+        platform: str = "xiaohongshu",
+        model_type: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> TitleData:
         """
         生成多个标题建议
 
+        结果和文章内容使用同一个缓存，缓存键包含平台和模板版本。
+
         Args:
             description: 文章描述
             platform: 目标平台，支持 xiaohongshu/weixin/zhihu 等
+            model_type: AI提供商类型，不指定则使用默认提供商
+            model: 模型名称，不指定则使用提供商的默认模型
 
         Returns:
-            List[str]: 生成的标题列表
+            TitleData: 带序号的标题文本和解析后的标题列表
+
+        Raises:
+            ValueError: 平台、提供商或模型不支持，或未能生成有效的标题时抛出
         """
         try:
-            # 构建消息列表
-            if platform.lower() == "xiaohongshu":
-                messages = [
-                    {
-                        "role": "system",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": (
-                                    "作为一位资深小红书标题优化专家，你的任务是依据提供的内容，创作10个风格迥异的标题。以下是具体要求和指南："
-                                )
-                            }
-                        ]
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": (
-                                    f"输入内容：\n\n[{description}]\n\n"
-                                    "输出要求：\n"
-                                    "1. 标题结构规则：\n"
-                                    "- 灵活使用'|'分隔符，但非强制\n"
-                                    "- 适用于以下场景：\n"
-                                    "  * 时间/进度标记：如'DAY15|破PB了'\n"
-                                    "  * 场景切换：如'都市|清晨五点的跑步日记'\n"
-                                    "  * 身份标记：如'新手记录|第一次5K'\n"
-                                    "  * 情绪转换：如'治愈|雨天跑步'\n"
-                                    "  * 数据分享：如'配速5:30|半马完赛故事'\n\n"
-                                    "2. 风格参考（需涵盖以下几种风格）：\n"
-                                    "- 励志激励型：如'100天跑步计划第30天，终于突破了'\n"
-                                    "- 专业干货型：如'跑步心率到底该怎么控制？过来人经验分享'\n"
-                                    "- 情感共鸣型：如'当代打工人的跑步日记，治愈孤独的良药'\n"
-                                    "- 话题互动型：如'你们跑步时都在想些什么？来聊聊'\n"
-                                    "- 实用建议型：如'入门级跑鞋推荐，这些百元好物真的香'\n\n"
-                                    "3. 具体要求：\n"
-                                    "- 每个标题添加2-3个相关emoji\n"
-                                    "- 标题长度控制在15-30字之间\n"
-                                    "- 根据内容自然选择是否使用分隔符\n"
-                                    "- 确保标题具有吸引力和传播潜力\n"
-                                    "- 避免标题党和过度营销\n\n"
-                                    "附加说明（针对每个标题）：\n"
-                                    "- 标题类型：如励志型、干货型等\n"
-                                    "- 适用场景：如个人日记、经验分享等\n"
-                                    "- 预期效果：如激励、教育、共鸣等\n"
-                                )
-                            }
-                        ]
-                    }
-                ]
-            else:
-                raise ValueError(f"不支持的平台类型: {platform}")
-
-            # 调用API生成标题
-            content = await self.api_client.call_api(
-                messages=messages,
-                temperature=0.8,  # 使用较高的温度以获得更多样化的结果
-                max_tokens=4095
-            )
+            route = self.resolve_model(model_type, model)
+            template = self._title_template(platform)
+            cache_key = self._get_cache_key(route, 'titles', platform.lower(), template.key, description)
 
-            # 如果内容为空，抛出异常
-            if not content:
-                raise ValueError("未能生成有效的标题")
+            content = await self.cache.aget(cache_key)
+            if content:
+                logger.info("使用缓存的标题")
+            else:
+                content = await self.content_flight.do(
+                    cache_key,
+                    lambda: self._generate_uncached_titles(cache_key, route, template, description),
+                    recheck=lambda: self.cache.aget(cache_key)
+                )
 
-            # 直接返回API生成的内容
-            return [content]
+            items = parse_titles(content)
+            if template.name.endswith("_json") and items:
+                # 旧客户端只读取 content，JSON模式下渲染为和文本模式相同的格式
+                content = format_titles(items)
+            return TitleData(content=content, titles=[TitleItem(**item) for item in items])
 
         except Exception as e:
             logger.error(f"生成标题失败: {str(e)}")
             raise
+
+    async def generate_titles_for_platforms(
+        self,
+        description: str,
+        platforms: List[str],
+        model_type: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Dict[str, Union[TitleData, Exception]]:
+        """
+        同时为多个平台生成标题
+
+        各平台并发生成，总耗时接近最慢的单个平台。某个平台失败不影响其他平台，
+        失败的平台在结果中对应异常对象。
+
+        Args:
+            description: 文章描述
+            platforms: 目标平台列表，重复的平台只生成一次
+            model_type: AI提供商类型，不指定则使用默认提供商
+            model: 模型名称，不指定则使用提供商的默认模型
+
+        Returns:
+            Dict[str, Union[TitleData, Exception]]: 以平台名称（小写）为键、按请求顺序排列的结果
+        """
+        platforms = list(dict.fromkeys(platform.lower() for platform in platforms))
+        results = await asyncio.gather(
+            *[self.generate_titles(description, platform, model_type, model) for platform in platforms],
+            return_exceptions=True
+        )
+        failed = [platform for platform, result in zip(platforms, results) if isinstance(result, Exception)]
+        if failed:
+            logger.warning(f"部分平台标题生成失败: {', '.join(failed)}")
+        return dict(zip(platforms, results))
+
+    async def _generate_uncached_titles(
+        self,
+        cache_key: str,
+        route: ModelRoute,
+        template: PromptTemplate,
+        description: str
+    ) -> str:
+        """
+        调用AI接口生成标题并写入缓存
+
+        Args:
+            cache_key: 缓存键
+            route: 使用的 (提供商, 模型)
+            template: 标题提示词模板
+            description: 文章描述
+
+        Returns:
+            str: 模型返回的原始内容
+
+        Raises:
+            ValueError: 当生成的内容为空时抛出
+        """
+        with timed(PROMPT_BUILD_SECONDS, "prompt"):
+            messages = template.render(description=description)
+
+        content = await self.client_for(*route).call_api(
+            messages=messages,
+            temperature=0.8,  # 使用较高的温度以获得更多样化的结果
+            max_tokens=self.config.TITLE_MAX_TOKENS
+        )
+        if not content:
+            raise ValueError("未能生成有效的标题")
+
+        # 解析不出任何标题时不写入缓存，下次请求重新生成
+        if parse_titles(content):
+            await self.cache.aset(cache_key, content)
+        else:
+            logger.warning(f"未能从模型输出中解析出标题，长度: {len(content)}")
+        logger.info(f"成功生成标题，模型: {self._model_scope(route)}，模板: {template.key}")
+        return content
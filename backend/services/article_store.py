@@ -0,0 +1,429 @@
+"""
+文章存储模块
+
+把生成的文章及其元数据（提供商、模型、提示词模板版本、耗时、token用量）保存到
+SQLite，并通过FTS5全文索引支持按关键词搜索历史文章，不再需要在 output 目录中逐个查找。
+
+- 写入先进入内存中的待写列表，由后台任务按批在线程池中写入，一批一个事务，
+  请求处理中不等待磁盘IO
+- SQLite自带的分词器不切分中文，写入索引前把连续的中文切成重叠的二元组（「城市夜跑」→「城市 市夜 夜跑」），
+  搜索时关键词按同样方式切分后作为短语匹配，任意两个及以上的字都能走索引；单个汉字改用 LIKE 扫描
+- 读取前会先写完本进程中待写的文章，保存后立即可以查到
+- 数据库使用WAL模式，所有worker进程共享
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config import Config
+from backend.models.article import Article
+from backend.utils.executor import BoundedExecutor
+from backend.utils.metrics import PERSIST_SECONDS, timed
+from backend.utils.paths import CACHE_DIR
+from backend.utils.sqlite import ThreadLocalConnection
+from backend.utils.stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+# 写入和查询的字段顺序
+_COLUMNS = (
+    "id", "title", "content", "directions", "description", "core_idea",
+    "provider", "model", "prompt_version", "latency_ms", "prompt_tokens",
+    "completion_tokens", "file_path", "created_at", "updated_at",
+)
+# 列表和搜索结果不返回正文
+_SUMMARY_COLUMNS = tuple(column for column in _COLUMNS if column != "content")
+
+# 中日韩文字（切分为二元组）和其他连续的字母数字（保持原样）
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN = re.compile(f"[{_CJK}]+|[^\\s{_CJK}]+")
+_CJK_RUN = re.compile(f"^[{_CJK}]+$")
+# 只保留字母数字，其余字符（标点、FTS5语法字符）不进入索引和查询
+_WORD = re.compile(r"\w+")
+# 正文中命中片段的前后长度
+_SNIPPET_CONTEXT = 30
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles ("
+    "id TEXT PRIMARY KEY, "
+    "title TEXT NOT NULL, "
+    "content TEXT NOT NULL, "
+    "directions TEXT NOT NULL, "
+    "description TEXT NOT NULL, "
+    "core_idea TEXT, "
+    "provider TEXT, "
+    "model TEXT, "
+    "prompt_version TEXT, "
+    "latency_ms REAL, "
+    "prompt_tokens INTEGER NOT NULL DEFAULT 0, "
+    "completion_tokens INTEGER NOT NULL DEFAULT 0, "
+    "file_path TEXT, "
+    "created_at TEXT NOT NULL, "
+    "updated_at TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_created ON articles(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_model ON articles(provider, model, created_at)",
+    # 全文索引只保存切分后的词，不保存原文（contentless），rowid 与 articles 表对应
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    "title, content, description, content='')",
+)
+
+def _segment(text: str) -> List[str]:
+    """
+    把文本切分为索引词
+
+    连续的中文切分为重叠的二元组，只有一个字时保留单字；其他连续的字母数字保持原样。
+
+    Args:
+        text: 原文
+
+    Returns:
+        List[str]: 索引词列表
+    """
+    tokens: List[str] = []
+    for run in _TOKEN.findall(text):
+        if _CJK_RUN.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.extend(_WORD.findall(run))
+    return tokens
+
+def _index_text(text: str) -> str:
+    """把文本转换为写入全文索引的内容（以空格分隔的索引词）"""
+    return " ".join(_segment(text))
+
+def _match_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换为FTS5查询
+
+    每个关键词按索引的方式切分后作为短语匹配，多个关键词之间为AND关系，
+    FTS5的查询语法字符不会生效。
+
+    Returns:
+        Optional[str]: FTS5查询，有关键词无法通过索引匹配（单个汉字或没有字母数字）时返回None
+    """
+    phrases = []
+    for term in query.split():
+        tokens = _segment(term)
+        if not tokens or any(_CJK_RUN.match(token) and len(token) == 1 for token in tokens):
+            return None
+        phrases.append('"{}"'.format(" ".join(tokens)))
+    return " ".join(phrases) or None
+
+def _snippet(content: str, query: str) -> Optional[str]:
+    """截取正文中第一个关键词前后的片段，关键词用 [] 标出"""
+    for term in query.split():
+        position = content.find(term)
+        if position == -1:
+            continue
+        start = max(0, position - _SNIPPET_CONTEXT)
+        end = min(len(content), position + len(term) + _SNIPPET_CONTEXT)
+        text = (
+            content[start:position] + f"[{term}]" + content[position + len(term):end]
+        ).replace("\n", " ").strip()
+        return ("…" if start > 0 else "") + text + ("…" if end < len(content) else "")
+    return None
+
+def _escape_like(term: str) -> str:
+    """转义LIKE模式中的通配符"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class ArticleStore:
+    """
+    SQLite文章存储
+
+    应用中使用 get_instance() 获取进程内共享的实例。
+
+    属性：
+        path: 数据库文件路径
+        batch_size: 每批最多写入的文章数
+        flush_interval: 待写文章最多等待的时间（秒），待写数量达到 batch_size 时立即写入
+    """
+
+    _instance: Optional['ArticleStore'] = None
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 0.2, max_workers: int = 4):
+        """
+        初始化文章存储并创建表和全文索引
+
+        Args:
+            path: 数据库文件路径
+            batch_size: 每批最多写入的文章数
+            flush_interval: 待写文章最多等待的时间（秒）
+            max_workers: 读写线程池的最大并发数
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._db = ThreadLocalConnection(path)
+        self._executor = BoundedExecutor("article_store", max_workers)
+        self._pending: List[Article] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        # flush() 调用后不再等待攒批，直到写完所有待写文章
+        self._draining = False
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self._create_schema()
+        register_stats("article_store", self.stats)
+
+    @classmethod
+    def get_instance(cls) -> 'ArticleStore':
+        """
+        获取进程内共享的文章存储，不存在时按配置创建
+
+        Returns:
+            ArticleStore: 文章存储实例
+        """
+        if cls._instance is None:
+            config = Config.get_instance()
+            cls._instance = cls(
+                config.ARTICLE_STORE_DB_PATH or os.path.join(CACHE_DIR, "articles.db"),
+                batch_size=config.ARTICLE_STORE_BATCH_SIZE,
+                flush_interval=config.ARTICLE_STORE_FLUSH_INTERVAL,
+                max_workers=config.STORAGE_MAX_WORKERS
+            )
+        return cls._instance
+
+    @classmethod
+    async def close_instance(cls) -> None:
+        """写完待写的文章并释放共享实例，应用关闭时调用"""
+        if cls._instance is not None:
+            await cls._instance.flush()
+            cls._instance = None
+
+    def _create_schema(self) -> None:
+        """创建表、索引和全文索引"""
+        conn = self._db.conn
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+    @staticmethod
+    def _to_row(article: Article) -> Tuple[Any, ...]:
+        data = article.to_dict()
+        data["directions"] = json.dumps(article.directions, ensure_ascii=False)
+        return tuple(data[column] for column in _COLUMNS)
+
+    @staticmethod
+    def _from_row(columns: Tuple[str, ...], row: Tuple[Any, ...]) -> Dict[str, Any]:
+        data = dict(zip(columns, row))
+        data["directions"] = json.loads(data["directions"])
+        return data
+
+    def _write_batch(self, articles: List[Article]) -> None:
+        """在一个事务中写入一批文章及其全文索引"""
+        conn = self._db.conn
+        insert = (
+            f"INSERT OR IGNORE INTO articles ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+        )
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for article in articles:
+                cursor = conn.execute(insert, self._to_row(article))
+                if cursor.rowcount != 1:
+                    # ID已存在，不重复建立索引
+                    continue
+                conn.execute(
+                    "INSERT INTO articles_fts(rowid, title, content, description) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, _index_text(article.title),
+                     _index_text(article.content), _index_text(article.description))
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _flush_loop(self) -> None:
+        """后台写入任务：攒够一批或等待 flush_interval 后写入，直到没有待写文章"""
+        try:
+            while self._pending:
+                if len(self._pending) < self.batch_size and not self._draining:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                self._wake.clear()
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    with timed(PERSIST_SECONDS, "article_store"):
+                        await self._executor.run(self._write_batch, batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception as e:
+                    # 文章文件已经写入 output 目录，这里只记录错误，不影响请求
+                    self.failed += len(batch)
+                    logger.error(f"写入文章存储失败: {len(batch)} 篇, {str(e)}")
+        finally:
+            self._flusher = None
+            self._draining = False
+
+    def add(self, article: Article) -> None:
+        """
+        把文章加入待写列表，由后台任务批量写入
+
+        Args:
+            article: 要保存的文章
+        """
+        self._pending.append(article)
+        if self._flusher is None:
+            self._wake = asyncio.Event()
+            self._flusher = asyncio.ensure_future(self._flush_loop())
+        elif len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """立即写入所有待写的文章并等待完成"""
+        flusher = self._flusher
+        if flusher is not None:
+            self._draining = True
+            self._wake.set()
+            await asyncio.shield(flusher)
+
+    def _get(self, article_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM articles WHERE id = ?",
+            (article_id,)
+        ).fetchone()
+        return self._from_row(_COLUMNS, row) if row else None
+
+    def _list(
+        self,
+        offset: int,
+        limit: int,
+        provider: Optional[str],
+        model: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        conditions, params = [], []
+        if provider:
+            conditions.append("provider = ?")
+            params.append(provider)
+        if model:
+            conditions.append("model = ?")
+            params.append(model)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        conn = self._db.conn
+        total = conn.execute(f"SELECT COUNT(*) FROM articles {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM articles {where} "
+            "ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [self._from_row(_SUMMARY_COLUMNS, row) for row in rows], total
+
+    def _search(self, query: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        conn = self._db.conn
+        columns = ", ".join(f"a.{column}" for column in _SUMMARY_COLUMNS)
+        match = _match_query(query)
+
+        if match is not None:
+            # 按BM25相关度排序
+            total = conn.execute(
+                "SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ?", (match,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {columns}, a.content FROM ("
+                "SELECT rowid, bm25(articles_fts) AS rank FROM articles_fts "
+                "WHERE articles_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?"
+                ") AS hits JOIN articles a ON a.rowid = hits.rowid ORDER BY hits.rank",
+                (match, limit, offset)
+            ).fetchall()
+        else:
+            # 单个汉字无法通过二元组索引匹配
+            conditions, params = [], []
+            for term in query.split():
+                pattern = f"%{_escape_like(term)}%"
+                conditions.append(
+                    "(a.title LIKE ? ESCAPE '\\' OR a.content LIKE ? ESCAPE '\\' "
+                    "OR a.description LIKE ? ESCAPE '\\')"
+                )
+                params.extend([pattern] * 3)
+            where = " AND ".join(conditions) or "1 = 1"
+            total = conn.execute(f"SELECT COUNT(*) FROM articles a WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {columns}, a.content FROM articles a WHERE {where} "
+                "ORDER BY a.created_at DESC, a.rowid DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        items = []
+        for row in rows:
+            item = self._from_row(_SUMMARY_COLUMNS, row[:-1])
+            item["snippet"] = _snippet(row[-1], query)
+            items.append(item)
+        return items, total
+
+    async def get(self, article_id: str) -> Optional[Dict[str, Any]]:
+        """
+        按ID获取文章
+
+        Args:
+            article_id: 文章ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 包含正文和元数据的文章，不存在时返回None
+        """
+        await self.flush()
+        return await self._executor.run(self._get, article_id)
+
+    async def list(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        provider: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        按创建时间倒序分页列出文章
+
+        Args:
+            page: 页码，从1开始
+            page_size: 每页数量
+            provider: 只列出该提供商生成的文章（可选）
+            model: 只列出该模型生成的文章（可选）
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: (当前页的文章摘要（不含正文）, 总数)
+        """
+        await self.flush()
+        return await self._executor.run(self._list, (page - 1) * page_size, page_size, provider, model)
+
+    async def search(self, query: str, page: int = 1, page_size: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        全文搜索文章的标题、正文和描述
+
+        多个关键词以空格分隔，结果需包含所有关键词，按相关度排序。
+
+        Args:
+            query: 搜索关键词
+            page: 页码，从1开始
+            page_size: 每页数量
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: (当前页的文章摘要（含命中片段 snippet）, 总数)
+        """
+        await self.flush()
+        return await self._executor.run(self._search, query, (page - 1) * page_size, page_size)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 待写数量、已写入数量、写入批次数和写入失败数量
+        """
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
@@ -0,0 +1,242 @@
+"""
+批量文章生成模块
+
+这个模块负责批量任务的调度和状态管理。
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from backend.config import Config
+from backend.schemas.article import ArticleRequest, BatchItemData, BatchJobData
+from backend.services.article_generator import ArticleGenerator
+from backend.utils.metrics import usage_scope
+from backend.utils.stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+class BatchJob:
+    """
+    批量任务：保存各项的状态，并在每项完成时通知订阅者
+
+    属性：
+        job_id: 任务ID
+        requests: 文章生成请求列表
+        items: 各项的状态和结果
+        finished: 按完成顺序排列的项索引
+        created_at: 创建时间
+        finished_at: 全部完成的时间
+    """
+
+    def __init__(self, requests: List[ArticleRequest]):
+        self.job_id = uuid.uuid4().hex
+        self.requests = requests
+        self.items = [BatchItemData(index=i) for i in range(len(requests))]
+        self.finished: List[int] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.tasks: List[asyncio.Task] = []
+        self._updated = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        """是否所有项都已完成"""
+        return len(self.finished) == len(self.items)
+
+    def mark_running(self, index: int) -> None:
+        """标记某项开始执行"""
+        self.items[index].status = "running"
+
+    def mark_finished(
+        self,
+        index: int,
+        content: Optional[str] = None,
+        file_path: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        记录某项的结果并通知订阅者
+
+        Args:
+            index: 项索引
+            content: 文章内容
+            file_path: 保存的文件路径
+            error: 失败原因，为None表示成功
+        """
+        item = self.items[index]
+        item.status = "failed" if error else "succeeded"
+        item.content = content
+        item.file_path = file_path
+        item.error = error
+        self.finished.append(index)
+        if self.done:
+            self.finished_at = time.time()
+
+        # 唤醒所有等待中的订阅者，并为下一次更新换一个新的事件
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    def to_data(self) -> BatchJobData:
+        """
+        转换为响应数据
+
+        Returns:
+            BatchJobData: 任务状态
+        """
+        succeeded = sum(1 for item in self.items if item.status == "succeeded")
+        failed = sum(1 for item in self.items if item.status == "failed")
+        if self.done:
+            status = "failed" if failed == len(self.items) else "succeeded"
+        elif any(item.status != "pending" for item in self.items):
+            status = "running"
+        else:
+            status = "pending"
+
+        return BatchJobData(
+            job_id=self.job_id,
+            status=status,
+            total=len(self.items),
+            succeeded=succeeded,
+            failed=failed,
+            items=self.items
+        )
+
+    async def results(self) -> AsyncIterator[BatchItemData]:
+        """
+        按完成顺序依次返回各项结果，已完成的项会先全部返回
+
+        Yields:
+            BatchItemData: 已完成项的状态和结果
+        """
+        sent = 0
+        while True:
+            while sent < len(self.finished):
+                yield self.items[self.finished[sent]]
+                sent += 1
+            if self.done:
+                return
+            await self._updated.wait()
+
+class BatchManager:
+    """
+    批量任务管理器
+
+    在当前worker进程内调度批量任务。每个AI提供商有独立的并发上限，
+    所有批量任务共享该上限，吞吐量取决于提供商的限额而不是客户端的往返次数。
+    """
+
+    _instance: Optional['BatchManager'] = None
+
+    def __init__(self):
+        self.config = Config.get_instance()
+        self.jobs: Dict[str, BatchJob] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        register_stats("batch", self.stats)
+
+    @classmethod
+    def get_instance(cls) -> 'BatchManager':
+        """
+        获取进程内的批量任务管理器
+
+        Returns:
+            BatchManager: 批量任务管理器实例
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        """获取提供商的并发信号量，不存在时创建"""
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            limit = self.config.batch_concurrency(provider)
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[provider] = semaphore
+            logger.info(f"批量任务并发上限: provider={provider}, limit={limit}")
+        return semaphore
+
+    def _purge_expired(self) -> None:
+        """清理已完成且超过保留时间的任务"""
+        deadline = time.time() - self.config.BATCH_JOB_TTL
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < deadline
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def submit(self, requests: List[ArticleRequest]) -> BatchJob:
+        """
+        提交批量任务，立即返回，各项在后台执行
+
+        Args:
+            requests: 文章生成请求列表
+
+        Returns:
+            BatchJob: 新建的批量任务
+        """
+        self._purge_expired()
+
+        job = BatchJob(requests)
+        self.jobs[job.job_id] = job
+        generator = ArticleGenerator.get_instance()
+        job.tasks = [
+            asyncio.create_task(self._run_item(job, index, generator))
+            for index in range(len(requests))
+        ]
+        logger.info(f"提交批量任务: job_id={job.job_id}, 项数={len(requests)}")
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        """
+        获取批量任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Optional[BatchJob]: 任务不存在时返回None
+        """
+        return self.jobs.get(job_id)
+
+    async def _run_item(self, job: BatchJob, index: int, generator: ArticleGenerator) -> None:
+        """在提供商并发上限内执行单项生成"""
+        request = job.requests[index]
+        provider = request.model_type or generator.default_model_type
+
+        async with self._semaphore(provider):
+            job.mark_running(index)
+            try:
+                with usage_scope() as usage:
+                    content = await generator.generate_content(
+                        request.description,
+                        request.core_idea,
+                        request.model_type,
+                        request.model
+                    )
+                data = await generator.save_article(content, request, usage)
+                job.mark_finished(index, content=content, file_path=data.file_path)
+            except Exception as e:
+                logger.error(f"批量任务单项失败: job_id={job.job_id}, index={index}, {str(e)}")
+                job.mark_finished(index, error=str(e))
+
+        if job.done:
+            logger.info(f"批量任务完成: job_id={job.job_id}")
+
+    def stats(self) -> Dict[str, object]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, object]: 任务数量和各提供商的可用并发数
+        """
+        return {
+            "jobs": len(self.jobs),
+            "running_jobs": sum(1 for job in self.jobs.values() if not job.done),
+            "available_slots": {
+                provider: semaphore._value for provider, semaphore in self._semaphores.items()
+            },
+        }
@@ -0,0 +1,580 @@
+"""
+后台任务队列模块
+
+文章生成任务提交后立即返回任务ID，由后台worker池消费队列并调用生成器，
+客户端通过轮询或订阅事件获取进度，不再需要长时间占用HTTP连接。
+
+支持两种存储：
+- memory: 进程内队列，任务只在提交它的worker进程中可见
+- sqlite: 基于SQLite的持久化队列，所有worker进程共享，进程重启后未完成的任务会重新执行
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from backend.config import Config
+from backend.schemas.article import ArticleData, ArticleRequest, JobData
+from backend.services.article_generator import ArticleGenerator
+from backend.utils.paths import CACHE_DIR
+from backend.utils.sqlite import ThreadLocalConnection
+from backend.utils.stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+# 任务的终止状态
+FINAL_STATUSES = ("succeeded", "failed")
+
+class JobStore(ABC):
+    """
+    任务存储基类
+
+    任务以字典形式保存，字段包括 job_id, request, status, result, error,
+    created_at, updated_at。
+    """
+
+    @abstractmethod
+    async def add(self, job: Dict[str, Any]) -> None:
+        """添加新任务"""
+        raise NotImplementedError("子类必须实现add方法")
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务，不存在时返回None"""
+        raise NotImplementedError("子类必须实现get方法")
+
+    @abstractmethod
+    async def claim(self, owner: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        领取一个待执行的任务并标记为running
+
+        Args:
+            owner: 领取者标识
+            timeout: 没有任务时最多等待的时间（秒）
+
+        Returns:
+            Optional[Dict[str, Any]]: 领取到的任务，没有时返回None
+        """
+        raise NotImplementedError("子类必须实现claim方法")
+
+    @abstractmethod
+    async def renew(self, job_id: str, owner: str) -> bool:
+        """
+        延长执行中任务的租约
+
+        Args:
+            job_id: 任务ID
+            owner: 领取者标识
+
+        Returns:
+            bool: 任务仍由 owner 执行时返回True，租约已被其他worker接管时返回False
+        """
+        raise NotImplementedError("子类必须实现renew方法")
+
+    @abstractmethod
+    async def finish(
+        self,
+        job_id: str,
+        owner: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        记录任务结果，只有任务仍由 owner 执行时才会写入
+
+        Args:
+            job_id: 任务ID
+            owner: 领取者标识
+            result: 成功时的结果
+            error: 失败时的错误信息
+
+        Returns:
+            bool: 是否写入了结果
+        """
+        raise NotImplementedError("子类必须实现finish方法")
+
+    @abstractmethod
+    async def release(self, job_id: str, owner: str) -> None:
+        """把 owner 执行中的任务放回队列（例如worker退出时）"""
+        raise NotImplementedError("子类必须实现release方法")
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """按状态统计任务数量"""
+        raise NotImplementedError("子类必须实现counts方法")
+
+class MemoryJobStore(JobStore):
+    """进程内任务存储"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def _purge_expired(self) -> None:
+        """清理已完成且超过保留时间的任务"""
+        deadline = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] in FINAL_STATUSES and job["updated_at"] < deadline
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def add(self, job: Dict[str, Any]) -> None:
+        self._purge_expired()
+        self.jobs[job["job_id"]] = job
+        self.queue.put_nowait(job["job_id"])
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def claim(self, owner: str, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            job_id = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        job = self.jobs.get(job_id)
+        if job is None or job["status"] != "pending":
+            return None
+        job.update(status="running", owner=owner, updated_at=time.time())
+        return dict(job)
+
+    def _owned(self, job_id: str, owner: str) -> Optional[Dict[str, Any]]:
+        """获取由 owner 执行中的任务"""
+        job = self.jobs.get(job_id)
+        if job is None or job["status"] != "running" or job.get("owner") != owner:
+            return None
+        return job
+
+    async def renew(self, job_id: str, owner: str) -> bool:
+        # 进程内任务没有租约，只检查任务仍由 owner 执行
+        return self._owned(job_id, owner) is not None
+
+    async def finish(
+        self,
+        job_id: str,
+        owner: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        job = self._owned(job_id, owner)
+        if job is None:
+            return False
+        job.update(
+            status="failed" if error else "succeeded",
+            result=result,
+            error=error,
+            owner=None,
+            updated_at=time.time()
+        )
+        return True
+
+    async def release(self, job_id: str, owner: str) -> None:
+        job = self._owned(job_id, owner)
+        if job is not None:
+            job.update(status="pending", owner=None, updated_at=time.time())
+            self.queue.put_nowait(job_id)
+
+    async def counts(self) -> Dict[str, int]:
+        result: Dict[str, int] = {}
+        for job in self.jobs.values():
+            result[job["status"]] = result.get(job["status"], 0) + 1
+        return result
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite持久化任务存储
+
+    所有worker进程共享同一个数据库。领取任务时设置租约，执行期间由持有者定期续租，
+    持有者异常退出后租约到期，任务会被其他worker重新领取。
+    写入结果和放回队列都要求任务仍由调用者持有，租约被接管后原持有者的结果不会覆盖新持有者。
+    每次领取都会累计执行次数，达到 max_attempts 后租约到期的任务直接标记为失败，
+    避免每次执行都会导致worker崩溃的任务被无限重试。
+    """
+
+    def __init__(self, path: str, lease_seconds: float, poll_interval: float, ttl: int, max_attempts: int):
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self._db = ThreadLocalConnection(path)
+        self._db.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, "
+            "request TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "result TEXT, "
+            "error TEXT, "
+            "owner TEXT, "
+            "lease_expires_at REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._db.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        # 本进程提交任务时唤醒等待中的worker，减少轮询延迟
+        self._submitted = asyncio.Event()
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        return {
+            "job_id": row[0],
+            "request": json.loads(row[1]),
+            "status": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "created_at": row[5],
+            "updated_at": row[6],
+        }
+
+    def _add(self, job: Dict[str, Any]) -> None:
+        conn = self._db.conn
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+            (time.time() - self.ttl,)
+        )
+        conn.execute(
+            "INSERT INTO jobs (job_id, request, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (job["job_id"], json.dumps(job["request"], ensure_ascii=False), job["status"],
+             job["created_at"], job["updated_at"])
+        )
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.conn.execute(
+            "SELECT job_id, request, status, result, error, created_at, updated_at FROM jobs WHERE job_id = ?",
+            (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def _claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        conn = self._db.conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 执行次数已用完的过期任务不再领取，直接标记为失败
+            abandoned = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                (f"任务执行了{self.max_attempts}次仍未完成", now, now, self.max_attempts)
+            ).rowcount
+            # 待执行的任务，或租约已过期（持有者异常退出）的执行中任务
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_expires_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    (owner, now + self.lease_seconds, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if abandoned:
+            logger.warning(f"{abandoned}个后台任务达到最大执行次数，已标记为失败")
+        return self._get(row[0]) if row else None
+
+    def _renew(self, job_id: str, owner: str) -> bool:
+        cursor = self._db.conn.execute(
+            "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND owner = ? AND status = 'running'",
+            (time.time() + self.lease_seconds, job_id, owner)
+        )
+        return cursor.rowcount > 0
+
+    def _finish(self, job_id: str, owner: str, result: Optional[Dict], error: Optional[str]) -> bool:
+        cursor = self._db.conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, owner = NULL, "
+            "lease_expires_at = NULL, updated_at = ? WHERE job_id = ? AND owner = ? AND status = 'running'",
+            ("failed" if error else "succeeded",
+             json.dumps(result, ensure_ascii=False) if result else None,
+             error, time.time(), job_id, owner)
+        )
+        return cursor.rowcount > 0
+
+    def _release(self, job_id: str, owner: str) -> None:
+        # 主动放回队列的任务没有执行失败，不计入执行次数
+        self._db.conn.execute(
+            "UPDATE jobs SET status = 'pending', owner = NULL, lease_expires_at = NULL, "
+            "attempts = MAX(attempts - 1, 0), updated_at = ? "
+            "WHERE job_id = ? AND owner = ? AND status = 'running'",
+            (time.time(), job_id, owner)
+        )
+
+    def _counts(self) -> Dict[str, int]:
+        rows = self._db.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    async def add(self, job: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._add, job)
+        self._submitted.set()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def claim(self, owner: str, timeout: float) -> Optional[Dict[str, Any]]:
+        job = await asyncio.to_thread(self._claim, owner)
+        if job is None:
+            # 等待本进程提交新任务，或到达轮询间隔后再查询（其他进程提交的任务）
+            self._submitted.clear()
+            try:
+                await asyncio.wait_for(self._submitted.wait(), min(timeout, self.poll_interval))
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def renew(self, job_id: str, owner: str) -> bool:
+        return await asyncio.to_thread(self._renew, job_id, owner)
+
+    async def finish(
+        self,
+        job_id: str,
+        owner: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        return await asyncio.to_thread(self._finish, job_id, owner, result, error)
+
+    async def release(self, job_id: str, owner: str) -> None:
+        await asyncio.to_thread(self._release, job_id, owner)
+
+    async def counts(self) -> Dict[str, int]:
+        return await asyncio.to_thread(self._counts)
+
+class JobQueue:
+    """
+    后台任务队列
+
+    管理任务存储和消费任务的worker池。
+    """
+
+    _instance: Optional['JobQueue'] = None
+
+    def __init__(self):
+        self.config = Config.get_instance()
+        self.store = self._create_store(self.config)
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.workers: List[asyncio.Task] = []
+        self.running: Dict[str, float] = {}
+        self.completed = 0
+        self.failed = 0
+        register_stats("job_queue", self.stats)
+
+    @classmethod
+    def get_instance(cls) -> 'JobQueue':
+        """
+        获取进程内的任务队列
+
+        Returns:
+            JobQueue: 任务队列实例
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _create_store(config: Config) -> JobStore:
+        """根据配置创建任务存储"""
+        if config.JOB_QUEUE_BACKEND == "sqlite":
+            return SQLiteJobStore(
+                config.JOB_QUEUE_DB_PATH or os.path.join(CACHE_DIR, "jobs.db"),
+                lease_seconds=config.JOB_LEASE_SECONDS,
+                poll_interval=config.JOB_POLL_INTERVAL,
+                ttl=config.JOB_TTL,
+                max_attempts=config.JOB_MAX_ATTEMPTS
+            )
+        if config.JOB_QUEUE_BACKEND == "memory":
+            return MemoryJobStore(ttl=config.JOB_TTL)
+        raise ValueError(f"不支持的任务队列后端: {config.JOB_QUEUE_BACKEND}")
+
+    def start(self) -> None:
+        """启动worker池，已启动时不做任何操作"""
+        if self.workers:
+            return
+        self.workers = [
+            asyncio.create_task(self._worker(i))
+            for i in range(self.config.JOB_WORKERS)
+        ]
+        logger.info(f"任务队列已启动: backend={self.config.JOB_QUEUE_BACKEND}, workers={self.config.JOB_WORKERS}")
+
+    async def stop(self) -> None:
+        """停止worker池，执行中的任务会放回队列"""
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if workers:
+            logger.info("任务队列已停止")
+
+    async def submit(self, request: ArticleRequest) -> Dict[str, Any]:
+        """
+        提交文章生成任务
+
+        Args:
+            request: 文章生成请求
+
+        Returns:
+            Dict[str, Any]: 新建的任务
+        """
+        self.start()
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "request": request.model_dump(),
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.store.add(job)
+        logger.info(f"提交后台任务: job_id={job['job_id']}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 任务不存在时返回None
+        """
+        return await self.store.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        订阅任务进度，每次状态变化时返回一次任务，到达终止状态后结束
+
+        Args:
+            job_id: 任务ID
+
+        Yields:
+            Dict[str, Any]: 状态变化后的任务
+        """
+        last_status = None
+        while True:
+            job = await self.store.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield job
+            if job["status"] in FINAL_STATUSES:
+                return
+            await asyncio.sleep(self.config.JOB_POLL_INTERVAL)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """
+        任务执行期间定期续租
+
+        每隔租约时间的三分之一续租一次，一次生成无论耗时多久都不会因租约到期被其他worker重复执行。
+        租约已被接管时（例如事件循环长时间阻塞）停止续租。
+        """
+        interval = self.config.JOB_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.store.renew(job_id, self.owner):
+                    logger.warning(f"后台任务的租约已被其他worker接管，本次结果不会写入: job_id={job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"后台任务续租失败: job_id={job_id}, {str(e)}")
+
+    async def _finish(self, job_id: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        """写入任务结果，任务已被其他worker接管时只记录日志"""
+        if not await self.store.finish(job_id, self.owner, result=result, error=error):
+            logger.warning(f"后台任务已由其他worker接管，丢弃本次结果: job_id={job_id}")
+
+    async def _worker(self, index: int) -> None:
+        """
+        worker循环：领取任务并调用生成器
+
+        存储出错（如数据库被锁、磁盘已满）时记录日志，等待一个轮询间隔后继续，worker不会因此退出。
+        """
+        generator = ArticleGenerator.get_instance()
+        while True:
+            try:
+                job = await self.store.claim(self.owner, timeout=self.config.JOB_POLL_INTERVAL)
+            except Exception as e:
+                logger.error(f"领取后台任务失败: worker={index}, {str(e)}")
+                await asyncio.sleep(self.config.JOB_POLL_INTERVAL)
+                continue
+            if job is None:
+                continue
+
+            job_id = job["job_id"]
+            self.running[job_id] = time.time()
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                request = ArticleRequest(**job["request"])
+                response = await generator.generate(request)
+                result, error = response.data.model_dump(), None
+            except asyncio.CancelledError:
+                # worker退出时把任务放回队列，由其他worker或重启后的进程继续执行
+                await asyncio.shield(self.store.release(job_id, self.owner))
+                raise
+            except Exception as e:
+                logger.error(f"后台任务失败: job_id={job_id}, {str(e)}")
+                result, error = None, str(e)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+                self.running.pop(job_id, None)
+
+            try:
+                await self._finish(job_id, result=result, error=error)
+            except Exception as e:
+                # 结果未写入，租约到期后任务会被重新执行
+                logger.error(f"写入后台任务结果失败: job_id={job_id}, {str(e)}")
+                await asyncio.sleep(self.config.JOB_POLL_INTERVAL)
+                continue
+            if error:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: worker数量、执行中任务数、完成和失败数
+        """
+        return {
+            "backend": self.config.JOB_QUEUE_BACKEND,
+            "workers": len(self.workers),
+            "running": len(self.running),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+def to_job_data(job: Dict[str, Any]) -> JobData:
+    """
+    把任务字典转换为响应数据
+
+    Args:
+        job: 任务字典
+
+    Returns:
+        JobData: 任务状态和结果
+    """
+    return JobData(
+        job_id=job["job_id"],
+        status=job["status"],
+        result=ArticleData(**job["result"]) if job["result"] else None,
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
@@ -0,0 +1,155 @@
+"""
+提示词模板模块
+
+提示词保存在 backend/prompts/<模板名>/v<版本号>/ 目录下：
+- system.txt: 系统提示词，只能引用配置项（如 {min_word_count}），加载时渲染一次后缓存
+- user.txt: 用户提示词，包含每个请求的变量（如 {description}），每次请求时填充
+
+消息按「固定的系统提示词在前、每个请求的内容在后」排列，系统消息的内容每次完全相同，
+支持提示词缓存的提供商可以复用这段前缀，命中部分按缓存价格计费。
+
+每个模板默认使用最高版本。修改提示词时新建一个版本目录，缓存键中包含模板版本，
+不会再命中旧提示词生成的缓存内容。
+"""
+
+import hashlib
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from backend.config import Config
+from backend.utils.api_client import Message
+from backend.utils.paths import PROMPT_DIR
+
+logger = logging.getLogger(__name__)
+
+_VERSION_DIR = re.compile(r"^v(\d+)$")
+
+def _text_message(role: str, text: str) -> Message:
+    """构建单段文本的消息"""
+    return {
+        "role": role,
+        "content": [
+            {
+                "type": "text",
+                "text": text
+            }
+        ]
+    }
+
+class PromptTemplate:
+    """
+    提示词模板
+
+    属性：
+        name: 模板名称
+        version: 模板版本号
+        key: 用于缓存键的模板标识，包含版本号和渲染后内容的摘要
+        system_message: 预先渲染好的系统消息，所有请求共享，不能修改
+    """
+
+    def __init__(self, name: str, version: int, system: str, user: str, context: Dict[str, Any]):
+        """
+        初始化模板并预先渲染系统提示词
+
+        Args:
+            name: 模板名称
+            version: 模板版本号
+            system: 系统提示词模板
+            user: 用户提示词模板
+            context: 渲染系统提示词使用的配置项
+        """
+        self.name = name
+        self.version = version
+        self.user = user
+        self.system_message = _text_message("system", system.format(**context))
+
+        # 配置项（如字数要求）变化时摘要也会变化，避免命中旧配置生成的缓存
+        digest = hashlib.md5(
+            (self.system_message["content"][0]["text"] + user).encode()
+        ).hexdigest()[:8]
+        self.key = f"{name}:v{version}:{digest}"
+
+    def render(self, **slots: Any) -> List[Message]:
+        """
+        填充用户提示词，返回完整的消息列表
+
+        Args:
+            **slots: 用户提示词中的变量
+
+        Returns:
+            List[Message]: 系统消息和用户消息
+        """
+        return [self.system_message, _text_message("user", self.user.format(**slots))]
+
+class PromptRegistry:
+    """
+    提示词模板注册表
+
+    首次使用时从 PROMPT_DIR 加载所有模板，进程内共享。
+    """
+
+    _templates: Optional[Dict[str, PromptTemplate]] = None
+
+    @classmethod
+    def load(cls, directory: str = PROMPT_DIR) -> Dict[str, PromptTemplate]:
+        """
+        从目录加载所有模板的最高版本
+
+        Args:
+            directory: 模板根目录
+
+        Returns:
+            Dict[str, PromptTemplate]: 以模板名称为键的模板字典
+        """
+        config = Config.get_instance()
+        context = {
+            "min_word_count": config.MIN_WORD_COUNT,
+            "max_word_count": config.MAX_WORD_COUNT,
+            "min_core_word_count": config.MIN_CORE_WORD_COUNT,
+        }
+
+        templates: Dict[str, PromptTemplate] = {}
+        for name in sorted(os.listdir(directory)):
+            template_dir = os.path.join(directory, name)
+            if not os.path.isdir(template_dir):
+                continue
+            versions = [
+                int(match.group(1))
+                for match in (_VERSION_DIR.match(entry) for entry in os.listdir(template_dir))
+                if match
+            ]
+            if not versions:
+                continue
+
+            version = max(versions)
+            version_dir = os.path.join(template_dir, f"v{version}")
+            with open(os.path.join(version_dir, "system.txt"), encoding="utf-8") as f:
+                system = f.read().rstrip("\n")
+            with open(os.path.join(version_dir, "user.txt"), encoding="utf-8") as f:
+                user = f.read().rstrip("\n")
+            templates[name] = PromptTemplate(name, version, system, user, context)
+
+        cls._templates = templates
+        logger.info(f"加载提示词模板: {', '.join(t.key for t in templates.values())}")
+        return templates
+
+    @classmethod
+    def get(cls, name: str) -> PromptTemplate:
+        """
+        获取模板
+
+        Args:
+            name: 模板名称
+
+        Returns:
+            PromptTemplate: 提示词模板
+
+        Raises:
+            KeyError: 模板不存在时抛出
+        """
+        templates = cls._templates if cls._templates is not None else cls.load()
+        if name not in templates:
+            raise KeyError(f"提示词模板不存在: {name}")
+        return templates[name]
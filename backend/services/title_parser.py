@@ -0,0 +1,170 @@
+"""
+标题解析模块
+
+把模型返回的标题建议解析为结构化列表，每项包含标题、类型、适用场景和预期效果。
+
+模型输出的格式并不稳定（序号写法、Markdown加粗、全角/半角冒号、JSON外面包代码块等），
+解析器逐行扫描一遍，能识别的字段就提取，识别不了的行直接跳过，不会因为格式偏差而失败。
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# 序号行：「1. 」「1、」「(1)」「标题1：」「第1个：」等，后面是标题本身
+_NUMBERED = re.compile(
+    r"^(?:标题\s*)?[（(]?\s*(?:第\s*)?\d{1,2}\s*(?:个|条)?\s*(?:[.、:：)）]|\s)\s*(?:标题\s*[:：]\s*)?(.+)$"
+)
+# 不带序号的标题行：「标题：xxx」
+_TITLE_LINE = re.compile(r"^标题\s*[:：]\s*(.+)$")
+# 附加说明行：「标题类型：励志型」「适用场景：个人日记」「预期效果：激励」
+_FIELD_LINE = re.compile(
+    r"^(标题类型|类型|风格|适用场景|场景|预期效果|效果)\s*[:：]\s*(.*)$"
+)
+_FIELD_NAMES = {
+    "标题类型": "type",
+    "类型": "type",
+    "风格": "type",
+    "适用场景": "scenario",
+    "场景": "scenario",
+    "预期效果": "effect",
+    "效果": "effect",
+}
+# JSON输出中字段名的别名
+_JSON_KEYS = {
+    "title": "title", "t": "title", "标题": "title",
+    "type": "type", "y": "type", "类型": "type", "标题类型": "type",
+    "scenario": "scenario", "s": "scenario", "场景": "scenario", "适用场景": "scenario",
+    "effect": "effect", "e": "effect", "效果": "effect", "预期效果": "effect",
+}
+
+# 行首的Markdown列表、引用、标题符号和行内的加粗符号
+_LEADING = re.compile(r"^[\s\-*+>#•·]+")
+_EMPHASIS = re.compile(r"\*\*|__|`")
+_QUOTES = "\"'“”‘’「」『』《》"
+_PAIRED_QUOTES = {"“": "”", "‘": "’", "「": "」", "『": "』", "\"": "\"", "'": "'"}
+
+def _clean(line: str) -> str:
+    """去掉行首的列表符号和行内的Markdown强调符号"""
+    return _LEADING.sub("", _EMPHASIS.sub("", line)).strip()
+
+def _strip_quotes(title: str) -> str:
+    """去掉包住标题的引号，引号后面跟着emoji时也能去掉"""
+    title = title.strip()
+    closing = _PAIRED_QUOTES.get(title[:1])
+    if closing and closing in title[1:]:
+        end = title.index(closing, 1)
+        title = title[1:end] + title[end + 1:]
+    return title.strip(_QUOTES).strip()
+
+def _empty_item(title: str) -> Dict[str, str]:
+    """创建只有标题的条目"""
+    return {"title": _strip_quotes(title), "type": "", "scenario": "", "effect": ""}
+
+def _parse_json(text: str) -> Optional[List[Dict[str, str]]]:
+    """
+    解析JSON格式的输出
+
+    兼容代码块包裹、顶层为数组或 {"titles": [...]} 的写法，失败时返回None。
+    """
+    start = text.find("[")
+    obj_start = text.find("{")
+    if start == -1 or (obj_start != -1 and obj_start < start):
+        start, end = obj_start, text.rfind("}")
+    else:
+        end = text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data: Any = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+    if isinstance(data, dict):
+        data = data.get("titles")
+    if not isinstance(data, list):
+        return None
+
+    items: List[Dict[str, str]] = []
+    for entry in data:
+        if isinstance(entry, str):
+            item = _empty_item(entry)
+        elif isinstance(entry, dict):
+            item = _empty_item("")
+            for key, value in entry.items():
+                field = _JSON_KEYS.get(str(key).lower())
+                if field and value is not None:
+                    item[field] = _strip_quotes(str(value)) if field == "title" else str(value).strip()
+        else:
+            continue
+        if item["title"]:
+            items.append(item)
+    return items
+
+def _parse_text(text: str) -> List[Dict[str, str]]:
+    """逐行解析带序号的文本输出"""
+    items: List[Dict[str, str]] = []
+    current: Optional[Dict[str, str]] = None
+
+    for raw in text.splitlines():
+        line = _clean(raw)
+        if not line:
+            continue
+
+        match = _FIELD_LINE.match(line)
+        if match:
+            if current is not None:
+                current[_FIELD_NAMES[match.group(1)]] = match.group(2).strip()
+            continue
+
+        match = _NUMBERED.match(line) or _TITLE_LINE.match(line)
+        if match:
+            current = _empty_item(match.group(1))
+            if current["title"]:
+                items.append(current)
+            else:
+                current = None
+
+    return items
+
+def parse_titles(text: str) -> List[Dict[str, str]]:
+    """
+    解析模型返回的标题建议
+
+    输出看起来是JSON时按JSON解析，解析失败或不是JSON时按带序号的文本逐行解析。
+
+    Args:
+        text: 模型返回的原始内容
+
+    Returns:
+        List[Dict[str, str]]: 标题列表，每项包含 title、type、scenario、effect，缺失的字段为空字符串
+    """
+    stripped = text.lstrip()
+    if stripped.startswith(("[", "{", "```")):
+        items = _parse_json(stripped)
+        if items is not None:
+            return items
+    return _parse_text(text)
+
+def format_titles(items: List[Dict[str, str]]) -> str:
+    """
+    把标题列表渲染为带序号的文本
+
+    JSON模式下用于生成兼容旧客户端的 content 字段。
+
+    Args:
+        items: 标题列表
+
+    Returns:
+        str: Markdown格式的标题文本
+    """
+    lines: List[str] = []
+    for index, item in enumerate(items, 1):
+        lines.append(f"{index}. {item['title']}")
+        if item.get("type"):
+            lines.append(f"   - 标题类型：{item['type']}")
+        if item.get("scenario"):
+            lines.append(f"   - 适用场景：{item['scenario']}")
+        if item.get("effect"):
+            lines.append(f"   - 预期效果：{item['effect']}")
+    return "\n".join(lines)
@@ -0,0 +1,12 @@
+"""
+测试公共配置
+
+测试使用模拟提供商，不需要API密钥，也不读取 backend/.env。
+运行方式（在仓库根目录）：
+
+    python -m pytest backend/tests
+"""
+
+import os
+
+os.environ.setdefault("AI_PROVIDER", "mock")
@@ -0,0 +1,191 @@
+"""准入控制的测试"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from backend.config import Config
+from backend.routers.article import admit_generation
+from backend.utils.admission import AdmissionController, AdmissionRejected, SQLiteSlotStore
+
+def controller(max_in_flight: int = 1, max_queue: int = 1, queue_timeout: float = 1.0, **kwargs) -> AdmissionController:
+    return AdmissionController(max_in_flight, max_queue, queue_timeout, **kwargs)
+
+def test_queue_full_is_rejected_with_retry_after():
+    admission = controller(max_in_flight=1, max_queue=0)
+
+    async def run():
+        slot = await admission.acquire()
+        with pytest.raises(AdmissionRejected) as info:
+            await admission.acquire()
+        await slot.release()
+        return info.value
+
+    rejected = asyncio.run(run())
+    assert rejected.reason == "queue_full"
+    assert rejected.retry_after >= 1
+    assert admission.shed["queue_full"] == 1
+
+def test_queue_timeout_is_rejected():
+    admission = controller(queue_timeout=0.05)
+
+    async def run():
+        slot = await admission.acquire()
+        with pytest.raises(AdmissionRejected) as info:
+            await admission.acquire()
+        await slot.release()
+        return info.value.reason
+
+    assert asyncio.run(run()) == "timeout"
+    assert admission.stats()["in_flight"] == 0
+    assert admission.stats()["queue_depth"] == 0
+
+def test_release_hands_slot_to_waiter_and_is_idempotent():
+    admission = controller()
+
+    async def run():
+        first = await admission.acquire()
+        waiter = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.stats()["queue_depth"] == 1
+        await first.release()
+        await first.release()
+        second = await waiter
+        assert admission.stats()["in_flight"] == 1
+        await second.release()
+
+    asyncio.run(run())
+    assert admission.stats()["in_flight"] == 0
+
+def test_cancelled_waiter_leaves_queue():
+    admission = controller()
+
+    async def run():
+        slot = await admission.acquire()
+        waiter = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert admission.stats()["queue_depth"] == 0
+        await slot.release()
+
+    asyncio.run(run())
+    assert admission.stats()["in_flight"] == 0
+
+def test_waiter_cancelled_after_handoff_passes_slot_on():
+    admission = controller(max_queue=2)
+
+    async def run():
+        slot = await admission.acquire()
+        cancelled = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        following = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        # 槽位已转交给第一个等待者，但它在恢复执行前被取消
+        await slot.release()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        await (await following).release()
+
+    asyncio.run(run())
+    assert admission.stats()["in_flight"] == 0
+
+def test_global_slot_released_when_local_wait_fails(tmp_path):
+    store = SQLiteSlotStore(str(tmp_path / "admission.db"), limit=1, lease_seconds=60)
+    admission = controller(max_in_flight=2, queue_timeout=0.1, global_store=store)
+
+    async def run():
+        slot = await admission.acquire()
+        with pytest.raises(AdmissionRejected) as info:
+            await admission.acquire()
+        assert info.value.reason == "global_full"
+        await slot.release()
+
+    asyncio.run(run())
+    assert store.count() == 0
+    assert admission.stats()["in_flight"] == 0
+
+def admission_app(monkeypatch, admission: AdmissionController) -> FastAPI:
+    """只包含准入依赖的应用"""
+    monkeypatch.setattr(Config.get_instance(), "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(AdmissionController, "_instance", admission)
+    app = FastAPI()
+
+    @app.post("/fail", dependencies=[Depends(admit_generation)])
+    async def fail():
+        raise RuntimeError("生成失败")
+
+    @app.post("/slow", dependencies=[Depends(admit_generation)])
+    async def slow():
+        await asyncio.sleep(3600)
+
+    return app
+
+def test_slot_released_when_endpoint_raises(monkeypatch):
+    admission = controller()
+    app = admission_app(monkeypatch, admission)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.post("/fail")).status_code
+
+    assert asyncio.run(run()) == 500
+    assert admission.stats()["in_flight"] == 0
+
+def test_slot_released_when_request_cancelled(monkeypatch):
+    admission = controller()
+    app = admission_app(monkeypatch, admission)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = asyncio.ensure_future(client.post("/slow"))
+            await asyncio.sleep(0.05)
+            assert admission.stats()["in_flight"] == 1
+            request.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await request
+
+    asyncio.run(run())
+    assert admission.stats()["in_flight"] == 0
+
+def test_overloaded_endpoint_returns_503(monkeypatch):
+    admission = controller(max_queue=0)
+    app = admission_app(monkeypatch, admission)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            busy = asyncio.ensure_future(client.post("/slow"))
+            await asyncio.sleep(0.05)
+            response = await client.post("/slow")
+            busy.cancel()
+            await asyncio.gather(busy, return_exceptions=True)
+            return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_global_count_skips_expired_slots(tmp_path):
+    store = SQLiteSlotStore(str(tmp_path / "admission.db"), limit=2, lease_seconds=0.05)
+    assert store.try_acquire("a")
+    assert store.count() == 1
+    time.sleep(0.1)
+    # 租约已到期的槽位还没有被清理，但不再计入占用数
+    assert store.count() == 0
+
+def test_lease_defaults_to_job_lease(monkeypatch):
+    monkeypatch.delenv("ADMISSION_LEASE_SECONDS", raising=False)
+    monkeypatch.delenv("JOB_LEASE_SECONDS", raising=False)
+    # 绕过单例，按当前环境变量重新读取配置
+    config = object.__new__(Config)
+    config.__init__()
+    assert config.ADMISSION_LEASE_SECONDS == config.JOB_LEASE_SECONDS
+    assert config.ADMISSION_LEASE_SECONDS > config.HTTP_TIMEOUT
@@ -0,0 +1,30 @@
+"""文章存储全文索引分词的测试"""
+
+from backend.services.article_store import _match_query, _segment
+
+def test_segment_splits_chinese_into_bigrams():
+    assert _segment("坚持跑步") == ["坚持", "持跑", "跑步"]
+
+def test_segment_keeps_single_chinese_character():
+    assert _segment("跑") == ["跑"]
+
+def test_segment_mixed_text():
+    assert _segment("Python异步IO, v2.0") == ["Python", "异步", "IO", "v2", "0"]
+
+def test_segment_ignores_punctuation_and_whitespace():
+    assert _segment("  ，。！  ") == []
+
+def test_match_query_builds_phrase_per_term():
+    assert _match_query("跑步 习惯") == '"跑步" "习惯"'
+    assert _match_query("坚持跑步") == '"坚持 持跑 跑步"'
+
+def test_match_query_neutralizes_fts_syntax():
+    # FTS5的运算符和引号被当作普通字符丢弃，不会改变查询结构
+    assert _match_query('a OR "b*"') == '"a" "OR" "b"'
+    assert _match_query("NEAR(x y)") == '"NEAR x" "y"'
+
+def test_match_query_rejects_unmatchable_terms():
+    assert _match_query("跑") is None
+    assert _match_query("跑步 跑") is None
+    assert _match_query("!!!") is None
+    assert _match_query("   ") is None
@@ -0,0 +1,79 @@
+"""缓存后端的测试"""
+
+import asyncio
+import time
+
+from backend.config import Config
+from backend.utils.cache import Cache, MemoryCacheBackend, SQLiteCacheBackend, TieredCacheBackend
+from backend.utils.semantic_cache import SemanticCacheIndex
+
+def test_disabled_cache_does_not_create_backend(tmp_path, monkeypatch):
+    config = Config.get_instance()
+    db_path = tmp_path / "cache.db"
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "CACHE_BACKEND", "tiered")
+    monkeypatch.setattr(config, "CACHE_DB_PATH", str(db_path))
+    monkeypatch.setattr(Cache, "_backend", None)
+
+    cache = Cache()
+    assert cache.backend is None
+    assert cache.get("key") is None
+    asyncio.run(cache.aset("key", {"content": "x"}))
+    assert asyncio.run(cache.aget("key")) is None
+    assert not db_path.exists()
+
+def test_tiered_backfill_keeps_disk_expiry(tmp_path):
+    disk = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=100, expire_time=3600)
+    disk.set("key", {"content": "x"})
+    _, disk_expires_at = disk.get_entry("key")
+
+    # 内存层的过期时间更长，回填时仍按磁盘条目剩余的时间过期
+    tiered = TieredCacheBackend(MemoryCacheBackend(max_entries=100, expire_time=86400), disk)
+    assert tiered.get("key") == {"content": "x"}
+    _, memory_expires_at = tiered.memory.get_entry("key")
+    assert memory_expires_at == disk_expires_at
+
+def test_tiered_backfill_expires_with_disk_entry(tmp_path):
+    disk = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=100, expire_time=1)
+    tiered = TieredCacheBackend(MemoryCacheBackend(max_entries=100, expire_time=3600), disk)
+    disk.set("key", "value")
+    assert asyncio.run(tiered.aget("key")) == "value"
+    assert tiered.memory.get_entry("key")[1] <= time.time() + 1
+
+def semantic_cache(tmp_path, monkeypatch, backend) -> Cache:
+    """创建使用给定后端和临时语义索引的缓存"""
+    config = Config.get_instance()
+    monkeypatch.setattr(config, "CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(Cache, "_backend", backend)
+    monkeypatch.setattr(Cache, "_semantic", SemanticCacheIndex(
+        str(tmp_path / "semantic.db"), threshold=0.85, ngram=3, max_entries=1000, expire_time=3600
+    ))
+    return Cache()
+
+def test_similar_lookup_does_not_count_exact_hits(tmp_path, monkeypatch):
+    memory = MemoryCacheBackend(max_entries=100, expire_time=3600)
+    backend = TieredCacheBackend(memory, SQLiteCacheBackend(str(tmp_path / "cache.db"), 100, 3600))
+    cache = semantic_cache(tmp_path, monkeypatch, backend)
+
+    async def run():
+        await cache.aset("key", {"content": "x"})
+        await cache.aadd_similar("scope", "写一篇关于人工智能发展历史的文章", "key")
+        hit = await cache.aget_similar("scope", "写一篇关于人工智能发展历史的文章。")
+        miss = await cache.aget_similar("scope", "今天晚饭吃什么")
+        return hit, miss
+
+    assert asyncio.run(run()) == ({"content": "x"}, None)
+    assert (backend.hits, backend.misses) == (0, 0)
+    assert (memory.hits, memory.misses) == (0, 0)
+    assert cache.semantic.stats()["hits"] == 1
+
+def test_similar_index_errors_are_logged(tmp_path, monkeypatch, caplog):
+    cache = semantic_cache(tmp_path, monkeypatch, MemoryCacheBackend(max_entries=100, expire_time=3600))
+
+    def broken_add(scope, text, key):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(cache.semantic, "add", broken_add)
+    asyncio.run(cache.aadd_similar("scope", "text", "key"))
+    assert "database is locked" in caplog.text
@@ -0,0 +1,143 @@
+"""后台任务队列租约和结果归属的测试"""
+
+import asyncio
+import time
+
+from backend.services.job_queue import JobQueue, MemoryJobStore, SQLiteJobStore
+
+def new_job(job_id: str = "job-1") -> dict:
+    now = time.time()
+    return {
+        "job_id": job_id,
+        "request": {"description": "测试文章"},
+        "status": "pending",
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def sqlite_store(tmp_path, lease_seconds: float, max_attempts: int = 3) -> SQLiteJobStore:
+    return SQLiteJobStore(
+        str(tmp_path / "jobs.db"), lease_seconds=lease_seconds, poll_interval=0.01, ttl=3600,
+        max_attempts=max_attempts
+    )
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_finish(tmp_path):
+    async def run():
+        store = sqlite_store(tmp_path, lease_seconds=0.05)
+        await store.add(new_job())
+        assert (await store.claim("worker-a", timeout=0))["job_id"] == "job-1"
+        await asyncio.sleep(0.1)
+        # 租约到期，任务被另一个worker接管
+        assert (await store.claim("worker-b", timeout=0))["job_id"] == "job-1"
+
+        assert not await store.renew("job-1", "worker-a")
+        assert not await store.finish("job-1", "worker-a", result={"title": "a"})
+        await store.release("job-1", "worker-a")
+        assert (await store.get("job-1"))["status"] == "running"
+
+        assert await store.finish("job-1", "worker-b", result={"title": "b"})
+        job = await store.get("job-1")
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"title": "b"}
+        # 已完成的任务不能再被覆盖
+        assert not await store.finish("job-1", "worker-b", error="late")
+
+    asyncio.run(run())
+
+def test_renew_keeps_job_owned(tmp_path):
+    async def run():
+        store = sqlite_store(tmp_path, lease_seconds=0.2)
+        await store.add(new_job())
+        await store.claim("worker-a", timeout=0)
+        for _ in range(3):
+            await asyncio.sleep(0.1)
+            assert await store.renew("job-1", "worker-a")
+        assert await store.claim("worker-b", timeout=0) is None
+
+    asyncio.run(run())
+
+def test_release_requires_owner(tmp_path):
+    async def run():
+        store = sqlite_store(tmp_path, lease_seconds=60)
+        await store.add(new_job())
+        await store.claim("worker-a", timeout=0)
+        await store.release("job-1", "worker-b")
+        assert (await store.get("job-1"))["status"] == "running"
+        await store.release("job-1", "worker-a")
+        assert (await store.get("job-1"))["status"] == "pending"
+
+    asyncio.run(run())
+
+def test_memory_store_finish_requires_owner():
+    async def run():
+        store = MemoryJobStore(ttl=3600)
+        await store.add(new_job())
+        await store.claim("worker-a", timeout=0.1)
+        assert not await store.finish("job-1", "worker-b", error="other")
+        assert await store.renew("job-1", "worker-a")
+        assert await store.finish("job-1", "worker-a", result={"title": "a"})
+        assert (await store.get("job-1"))["status"] == "succeeded"
+
+    asyncio.run(run())
+
+def test_heartbeat_renews_lease_while_job_runs(tmp_path, monkeypatch):
+    queue = JobQueue()
+    monkeypatch.setattr(queue.config, "JOB_LEASE_SECONDS", 0.15)
+
+    async def run():
+        queue.store = sqlite_store(tmp_path, lease_seconds=0.15)
+        await queue.store.add(new_job())
+        await queue.store.claim(queue.owner, timeout=0)
+        heartbeat = asyncio.create_task(queue._heartbeat("job-1"))
+        # 运行时间超过租约的数倍，任务仍不会被其他worker领取
+        await asyncio.sleep(0.5)
+        assert await queue.store.claim("other-worker", timeout=0) is None
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+    asyncio.run(run())
+
+def test_job_fails_after_max_attempts(tmp_path):
+    async def run():
+        store = sqlite_store(tmp_path, lease_seconds=0.05, max_attempts=2)
+        await store.add(new_job())
+        assert await store.claim("worker-a", timeout=0) is not None
+        # 主动放回队列不计入执行次数
+        await store.release("job-1", "worker-a")
+        assert await store.claim("worker-a", timeout=0) is not None
+        await asyncio.sleep(0.1)
+        assert await store.claim("worker-b", timeout=0) is not None
+        await asyncio.sleep(0.1)
+        # 第二次执行的租约也到期了，任务不再被领取
+        assert await store.claim("worker-c", timeout=0) is None
+        job = await store.get("job-1")
+        assert job["status"] == "failed"
+        assert "2次" in job["error"]
+
+    asyncio.run(run())
+
+def test_worker_survives_store_errors(tmp_path, monkeypatch):
+    queue = JobQueue()
+    monkeypatch.setattr(queue.config, "JOB_POLL_INTERVAL", 0.01)
+    calls = []
+
+    class BrokenStore(MemoryJobStore):
+        async def claim(self, owner, timeout):
+            calls.append(owner)
+            if len(calls) <= 2:
+                raise RuntimeError("database is locked")
+            return await super().claim(owner, timeout)
+
+    async def run():
+        queue.store = BrokenStore(ttl=3600)
+        worker = asyncio.create_task(queue._worker(0))
+        await asyncio.sleep(0.1)
+        alive = not worker.done()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        return alive
+
+    assert asyncio.run(run())
+    assert len(calls) > 2
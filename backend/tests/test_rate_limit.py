@@ -0,0 +1,29 @@
+"""客户端限流的测试"""
+
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from backend.utils.api_client.rate_limit import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+
+def test_waiting_for_tokens_keeps_request_quota(tmp_path):
+    requests = ("test:requests", 1, 1.0, 1.0)
+    tokens = ("test:tokens", 10, 1.0, 10.0)
+    for store in (MemoryBucketStore(), SQLiteBucketStore(str(tmp_path / "rate_limit.db"))):
+        assert store.take([tokens]) == 0
+        # token不足时需要等待，请求数配额也不会被扣除
+        assert store.take([requests, tokens]) > 0
+        assert store.take([requests]) == 0
+
+def test_acquire_records_metrics():
+    limiter = RateLimiter("metrics_test", rpm=600, tpm=60000, burst_seconds=10, store=MemoryBucketStore())
+
+    async def run():
+        await limiter.acquire(100)
+        await limiter.debit(50)
+
+    asyncio.run(run())
+    labels = {"provider": "metrics_test"}
+    assert REGISTRY.get_sample_value("blog_rate_limit_admitted_total", labels) == 1
+    assert REGISTRY.get_sample_value("blog_rate_limit_tokens_total", labels) == 150
+    assert REGISTRY.get_sample_value("blog_rate_limit_wait_duration_seconds_count", labels) == 1
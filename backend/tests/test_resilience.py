@@ -0,0 +1,91 @@
+"""熔断器探测请求的测试"""
+
+import asyncio
+
+import pytest
+
+from backend.utils.api_client.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientAPIClient,
+    RetryPolicy,
+)
+
+class StatusError(Exception):
+    """带HTTP状态码的接口错误"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def half_open_client() -> ResilientAPIClient:
+    """创建熔断器已经打开、下一次调用即为探测请求的客户端"""
+    client = ResilientAPIClient("mock", client=None, policy=RetryPolicy(0, 0, 0))
+    client.health.breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    client.health.breaker.record_failure()
+    assert client.health.breaker.state == "open"
+    return client
+
+async def succeed() -> str:
+    return "ok"
+
+def test_successful_probe_closes_breaker():
+    client = half_open_client()
+    assert asyncio.run(client._with_retries(succeed)) == "ok"
+    assert client.health.breaker.state == "closed"
+
+def test_retryable_probe_failure_reopens_breaker():
+    client = half_open_client()
+
+    async def fail():
+        raise StatusError(503)
+
+    with pytest.raises(StatusError):
+        asyncio.run(client._with_retries(fail))
+    assert client.health.breaker.state == "open"
+
+def test_non_retryable_probe_error_releases_probe():
+    client = half_open_client()
+
+    async def bad_request():
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        asyncio.run(client._with_retries(bad_request))
+    # 提供商能正常响应，熔断器恢复，后续调用不再被拒绝
+    assert client.health.breaker.state == "closed"
+    for _ in range(3):
+        assert asyncio.run(client._with_retries(succeed)) == "ok"
+
+def test_cancelled_probe_releases_probe():
+    client = half_open_client()
+
+    async def cancel_probe():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(3600)
+
+        task = asyncio.ensure_future(client._with_retries(hang))
+        await started.wait()
+        # 探测进行中，其他调用被拒绝
+        with pytest.raises(CircuitOpenError):
+            await client._with_retries(succeed)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    # 取消既不算成功也不算失败：仍为half_open，下一个请求可以重新探测
+    assert client.health.breaker.state == "half_open"
+    assert asyncio.run(client._with_retries(succeed)) == "ok"
+    assert client.health.breaker.state == "closed"
+
+def test_release_probe_allows_next_probe():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
@@ -0,0 +1,107 @@
+"""自动路由对冲请求的测试"""
+
+import asyncio
+import threading
+
+from backend.utils.api_client.resilience import (
+    CircuitBreaker, ProviderHealth, ResilientAPIClient, RetryPolicy
+)
+from backend.utils.api_client.routing import AutoRoutingClient
+from backend.utils.latency import ModelLatency
+
+def routing_client(hedge_delay: float) -> AutoRoutingClient:
+    """创建不依赖已配置提供商的路由客户端，只用于测试 _race"""
+    client = AutoRoutingClient.__new__(AutoRoutingClient)
+    client._lock = threading.Lock()
+    client.hedged = 0
+    client.backup_wins = 0
+    client._hedge_delay = lambda provider, stream=False: hedge_delay
+    return client
+
+def test_cancelled_hedge_loser_releases_probe():
+    primary = ResilientAPIClient("monica", client=None, policy=RetryPolicy(0, 0, 0))
+    primary.health.breaker = CircuitBreaker(failure_threshold=1, recovery_time=0)
+    primary.health.breaker.record_failure()
+    backup = ResilientAPIClient("zhipu", client=None, policy=RetryPolicy(0, 0, 0))
+
+    async def slow():
+        await asyncio.sleep(3600)
+
+    async def fast():
+        return "backup"
+
+    calls = {"monica": lambda: primary._with_retries(slow), "zhipu": lambda: backup._with_retries(fast)}
+    router = routing_client(hedge_delay=0.01)
+
+    async def race():
+        result = await router._race(["monica", "zhipu"], lambda provider: calls[provider]())
+        # 返回时被取消的请求已经结束，首选提供商的探测名额已释放
+        return result, primary.health.breaker.allow()
+
+    assert asyncio.run(race()) == ("backup", True)
+    assert router.hedged == 1
+
+def test_stream_closed_when_consumer_stops():
+    closed = []
+
+    class Provider:
+        model = "mock-model"
+
+        async def stream_api(self, prompt=None, messages=None, **kwargs):
+            try:
+                for chunk in ("a", "b", "c"):
+                    yield chunk
+            finally:
+                closed.append(True)
+
+    client = ResilientAPIClient("mock", Provider(), policy=RetryPolicy(0, 0, 0))
+
+    async def read_first():
+        stream = client.stream_api("prompt")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first, list(closed)
+
+    assert asyncio.run(read_first()) == ("a", [True])
+
+def test_slow_first_chunk_triggers_stream_hedge(monkeypatch):
+    class Provider:
+        def __init__(self, model, delay):
+            self.model = model
+            self.delay = delay
+
+        async def stream_api(self, prompt=None, messages=None, **kwargs):
+            await asyncio.sleep(self.delay)
+            yield self.model
+            yield "done"
+
+    monkeypatch.setattr(ProviderHealth, "_providers", {})
+    clients = {
+        "monica": ResilientAPIClient("monica", Provider("slow-model", 3600), policy=RetryPolicy(0, 0, 0)),
+        "zhipu": ResilientAPIClient("zhipu", Provider("fast-model", 0), policy=RetryPolicy(0, 0, 0)),
+    }
+    router = AutoRoutingClient.__new__(AutoRoutingClient)
+    router._lock = threading.Lock()
+    router.hedged = 0
+    router.backup_wins = 0
+    router.providers = list(clients)
+    router._clients = clients
+    router.config = type("Settings", (), {
+        "AUTO_HEDGE_ENABLED": True,
+        "AUTO_HEDGE_DELAY": 600.0,
+        "AUTO_STREAM_HEDGE_DELAY": 0.0,
+        "allowed_models": staticmethod(lambda provider: [clients[provider].model]),
+    })()
+    monkeypatch.setattr(router, "rank", lambda: ["monica", "zhipu"], raising=False)
+    monkeypatch.setattr(ModelLatency, "_first_chunk_trackers", {})
+    # 首个片段通常很快到达，阈值取首个片段耗时的p95，而不是普通调用的600秒
+    tracker = ModelLatency.get("monica", "slow-model", first_chunk=True)
+    for _ in range(20):
+        tracker.record(0.01, True)
+
+    async def read_all():
+        return [chunk async for chunk in router.stream_api("prompt")]
+
+    assert asyncio.run(asyncio.wait_for(read_all(), timeout=5)) == ["fast-model", "done"]
+    assert (router.hedged, router.backup_wins) == (1, 1)
+    assert ModelLatency.get("zhipu", "fast-model", first_chunk=True).snapshot()["samples"] == 1
@@ -0,0 +1,23 @@
+"""语义近似缓存规范化和MinHash的测试"""
+
+from backend.utils.semantic_cache import minhash, normalize_text, similarity
+
+BASE = "请写一篇关于 Python 异步编程的入门文章，介绍 asyncio 的事件循环"
+
+def test_normalize_text_folds_width_case_and_whitespace():
+    assert normalize_text("  Ｐｙｔｈｏｎ\t异步\n\n编程　ＡＰＩ ") == "python 异步 编程 api"
+
+def test_whitespace_and_full_width_variants_match():
+    variants = [
+        "请写一篇关于Python异步编程的入门文章,介绍asyncio的事件循环",
+        "  请写一篇关于   PYTHON 异步编程的入门文章，\n介绍 asyncio 的事件循环。",
+        "请写一篇关于 Ｐｙｔｈｏｎ 异步编程的入门文章，介绍 ａｓｙｎｃｉｏ 的事件循环",
+    ]
+    base = minhash(normalize_text(BASE), 3)
+    for variant in variants:
+        assert similarity(base, minhash(normalize_text(variant), 3)) >= 0.85
+
+def test_different_requests_do_not_match():
+    base = minhash(normalize_text(BASE), 3)
+    other = minhash(normalize_text("帮我总结一下今年新能源汽车行业的市场格局和主要厂商"), 3)
+    assert similarity(base, other) < 0.5
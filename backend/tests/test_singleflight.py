@@ -0,0 +1,75 @@
+"""请求合并的测试"""
+
+import asyncio
+
+from backend.config import Config
+from backend.services.article_generator import ArticleGenerator
+from backend.utils.singleflight import SingleFlight, SQLiteLockStore
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test_local")
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+
+def test_remote_waiter_uses_recheck(tmp_path):
+    store = SQLiteLockStore(str(tmp_path / "locks.db"), lease_seconds=60)
+    leader = SingleFlight("test_leader", lock_store=store, poll_interval=0.01)
+    waiter = SingleFlight("test_waiter", lock_store=store, poll_interval=0.01)
+    shared = {}
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        shared["key"] = "result"
+        return "result"
+
+    async def recheck():
+        return shared.get("key")
+
+    async def run():
+        first = asyncio.ensure_future(leader.do("key", fn, recheck))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, waiter.do("key", fn, recheck))
+
+    assert asyncio.run(run()) == ["result", "result"]
+    assert len(calls) == 1
+    assert waiter.coalesced_remote == 1
+
+def test_cross_process_lock_requires_shared_cache(tmp_path, monkeypatch):
+    config = Config.get_instance()
+    monkeypatch.setattr(config, "SINGLEFLIGHT_LOCK_STORE", "sqlite")
+    monkeypatch.setattr(config, "SINGLEFLIGHT_LOCK_DB_PATH", str(tmp_path / "locks.db"))
+    monkeypatch.setattr(config, "CACHE_BACKEND", "tiered")
+
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(ArticleGenerator, "_content_flight", None)
+    assert ArticleGenerator._get_content_flight(config).lock_store is None
+    assert not (tmp_path / "locks.db").exists()
+
+    monkeypatch.setattr(config, "CACHE_ENABLED", True)
+    monkeypatch.setattr(ArticleGenerator, "_content_flight", None)
+    assert ArticleGenerator._get_content_flight(config).lock_store is not None
+
+def test_leader_renews_lock_while_running(tmp_path):
+    store = SQLiteLockStore(str(tmp_path / "locks.db"), lease_seconds=0.15)
+    flight = SingleFlight("test_renew", lock_store=store, poll_interval=0.01)
+
+    async def fn():
+        # 运行时间超过租约的数倍，其他进程仍无法获取锁
+        await asyncio.sleep(0.5)
+        return store.try_acquire("key", "other-process")
+
+    assert asyncio.run(flight.do("key", fn)) is False
+    # 执行结束后锁已释放
+    assert store.try_acquire("key", "other-process")
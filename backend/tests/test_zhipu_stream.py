@@ -0,0 +1,66 @@
+"""智谱AI流式调用的测试，SDK的流式响应用同步迭代器代替，不发送网络请求"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from backend.config import Config
+from backend.utils.api_client.zhipu import ZhipuAPIClient
+from backend.utils.executor import BoundedExecutor
+
+class FakeStream:
+    """模拟SDK的同步流式响应：逐块返回，在指定位置抛出异常"""
+
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.closed = False
+        self.response = SimpleNamespace(close=self.close)
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        for i, text in enumerate(self.chunks):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise RuntimeError("连接中断")
+            time.sleep(0.01)
+            yield {"choices": [{"delta": {"content": text}}]}
+
+def zhipu_client(stream: FakeStream) -> ZhipuAPIClient:
+    """创建不连接智谱接口的客户端"""
+    client = ZhipuAPIClient.__new__(ZhipuAPIClient)
+    client.config = Config.get_instance()
+    client.model = "glm-4"
+    client.executor = BoundedExecutor("zhipu_test", 1)
+    completions = SimpleNamespace(create=lambda **params: stream)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client
+
+def read_first_and_close(client: ZhipuAPIClient, loop_errors: list) -> str:
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: loop_errors.append(context))
+        stream = client.stream_api("prompt")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    return asyncio.run(run())
+
+def test_early_exit_waits_for_reader_thread():
+    stream = FakeStream(["a", "b", "c", "d"])
+    client = zhipu_client(stream)
+    errors = []
+    assert read_first_and_close(client, errors) == "a"
+    # 调用方退出时读取线程已经结束，执行器的槽位已释放
+    assert stream.closed
+    assert client.executor.stats()["in_flight"] == 0
+    assert errors == []
+
+def test_early_exit_retrieves_reader_exception():
+    stream = FakeStream(["a", "b", "c"], fail_after=1)
+    client = zhipu_client(stream)
+    errors = []
+    assert read_first_and_close(client, errors) == "a"
+    assert stream.closed
+    assert errors == []
@@ -0,0 +1,379 @@
+"""
+准入控制模块
+
+限制生成接口同时处理的请求数，超出容量的请求快速失败，而不是全部压到上游提供商上一起变慢：
+- 每个worker最多同时处理 max_in_flight 个请求，超出的请求进入有界的等待队列（先到先得）
+- 队列已满或等待超时的请求被拒绝（503），Retry-After 按最近的平均处理时间和排队长度估算
+- 配置了全局上限时，所有worker通过SQLite共享槽位，进程崩溃后槽位在租约到期时自动释放
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from ..config import Config
+from .metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REQUESTS, ADMISSION_WAIT_SECONDS
+from .paths import CACHE_DIR
+from .sqlite import ThreadLocalConnection
+from .stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+# 平均处理时间的指数移动平均系数
+SERVICE_TIME_ALPHA = 0.2
+# 等待全局槽位时的轮询间隔（秒）
+GLOBAL_POLL_INTERVAL = 0.05
+
+class AdmissionRejected(Exception):
+    """
+    请求被拒绝（负载过高）
+
+    属性：
+        reason: 拒绝原因：queue_full、timeout 或 global_full
+        retry_after: 建议客户端重试前等待的秒数
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"服务繁忙，请 {retry_after} 秒后重试")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class SQLiteSlotStore:
+    """
+    基于SQLite的全局槽位存储
+
+    每个正在处理的请求占用一行，带有租约时间；槽位已满时清理租约到期的行和已退出进程的行。
+
+    属性：
+        path: 数据库文件路径
+        limit: 所有worker合计的最大槽位数
+        lease_seconds: 槽位的租约时间（秒）
+    """
+
+    def __init__(self, path: str, limit: int, lease_seconds: float):
+        self.path = path
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self._db = ThreadLocalConnection(path)
+        self._db.conn.execute(
+            "CREATE TABLE IF NOT EXISTS slots ("
+            "id TEXT PRIMARY KEY, "
+            "pid INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        """判断本机进程是否仍在运行"""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _prune(self, conn: Any, now: float) -> None:
+        """删除租约到期和所属进程已退出的槽位"""
+        conn.execute("DELETE FROM slots WHERE expires_at <= ?", (now,))
+        pids = [row[0] for row in conn.execute("SELECT DISTINCT pid FROM slots")]
+        for pid in pids:
+            if not self._alive(pid):
+                conn.execute("DELETE FROM slots WHERE pid = ?", (pid,))
+
+    def try_acquire(self, slot_id: str) -> bool:
+        """
+        尝试占用一个槽位
+
+        Args:
+            slot_id: 槽位标识
+
+        Returns:
+            bool: 是否占用成功
+        """
+        now = time.time()
+        conn = self._db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM slots").fetchone()[0]
+            if count >= self.limit:
+                self._prune(conn, now)
+                count = conn.execute("SELECT COUNT(*) FROM slots").fetchone()[0]
+            acquired = count < self.limit
+            if acquired:
+                conn.execute(
+                    "INSERT INTO slots (id, pid, expires_at) VALUES (?, ?, ?)",
+                    (slot_id, os.getpid(), now + self.lease_seconds)
+                )
+            conn.execute("COMMIT")
+            return acquired
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release(self, slot_id: str) -> None:
+        """
+        释放槽位
+
+        Args:
+            slot_id: 槽位标识
+        """
+        self._db.conn.execute("DELETE FROM slots WHERE id = ?", (slot_id,))
+
+    def count(self) -> int:
+        """当前占用的槽位数，不包括租约已到期、尚未清理的槽位"""
+        return self._db.conn.execute(
+            "SELECT COUNT(*) FROM slots WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+class AdmissionSlot:
+    """
+    一个已准入请求占用的槽位
+
+    release 可以重复调用，只有第一次生效。流式响应在依赖退出后才发送，
+    调用 detach 后由响应结束时负责释放。
+    """
+
+    def __init__(self, controller: "AdmissionController", global_id: Optional[str]):
+        self._controller = controller
+        self._global_id = global_id
+        self._started_at = time.monotonic()
+        self._released = False
+        self.detached = False
+
+    def detach(self) -> None:
+        """改由响应负责释放槽位"""
+        self.detached = True
+
+    async def release(self) -> None:
+        """释放槽位，并把处理耗时计入平均处理时间"""
+        if self._released:
+            return
+        self._released = True
+        await self._controller._release(self._global_id, time.monotonic() - self._started_at)
+
+class AdmissionController:
+    """
+    生成接口的准入控制器
+
+    只在事件循环线程中使用，不需要加锁。
+
+    属性：
+        max_in_flight: 每个worker同时处理的最大请求数
+        max_queue: 每个worker等待队列的最大长度
+        queue_timeout: 在队列中等待的最长时间（秒）
+        max_retry_after: Retry-After 的上限（秒）
+        global_store: 全局槽位存储，为None时只限制单个worker
+    """
+
+    _instance: Optional["AdmissionController"] = None
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_retry_after: int = 60,
+        global_store: Optional[SQLiteSlotStore] = None
+    ):
+        if max_in_flight <= 0:
+            raise ValueError(f"max_in_flight必须大于0: {max_in_flight}")
+
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retry_after = max_retry_after
+        self.global_store = global_store
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time: Optional[float] = None
+        self.admitted = 0
+        self.queued = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "timeout": 0, "global_full": 0}
+
+        register_stats("admission", self.stats)
+
+    @classmethod
+    def get_instance(cls) -> "AdmissionController":
+        """
+        获取进程内共享的准入控制器，不存在时按配置创建
+
+        Returns:
+            AdmissionController: 准入控制器
+        """
+        if cls._instance is None:
+            config = Config.get_instance()
+            global_store = None
+            if config.ADMISSION_GLOBAL_MAX_IN_FLIGHT > 0:
+                global_store = SQLiteSlotStore(
+                    config.ADMISSION_DB_PATH or os.path.join(CACHE_DIR, "admission.db"),
+                    limit=config.ADMISSION_GLOBAL_MAX_IN_FLIGHT,
+                    lease_seconds=config.ADMISSION_LEASE_SECONDS
+                )
+            cls._instance = cls(
+                config.ADMISSION_MAX_IN_FLIGHT,
+                config.ADMISSION_MAX_QUEUE,
+                config.ADMISSION_QUEUE_TIMEOUT,
+                config.ADMISSION_MAX_RETRY_AFTER,
+                global_store
+            )
+            logger.info(
+                f"启用准入控制: max_in_flight={config.ADMISSION_MAX_IN_FLIGHT}, "
+                f"max_queue={config.ADMISSION_MAX_QUEUE}, "
+                f"global_max_in_flight={config.ADMISSION_GLOBAL_MAX_IN_FLIGHT}"
+            )
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """丢弃共享的准入控制器，下次获取时按配置重新创建"""
+        cls._instance = None
+
+    def retry_after(self) -> int:
+        """
+        估算客户端应等待多久再重试
+
+        按最近的平均处理时间，估算当前正在处理和排队的请求全部完成所需的时间。
+
+        Returns:
+            int: 秒数，在 1 到 max_retry_after 之间
+        """
+        service_time = self._service_time if self._service_time is not None else self.queue_timeout
+        pending = self._in_flight + len(self._waiters)
+        estimate = service_time * pending / self.max_in_flight
+        return max(1, min(self.max_retry_after, math.ceil(estimate)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        """记录一次拒绝并构建异常"""
+        self.shed[reason] += 1
+        ADMISSION_REQUESTS.labels(result=f"shed_{reason}").inc()
+        return AdmissionRejected(reason, self.retry_after())
+
+    def _set_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self._in_flight)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+    async def _acquire_local(self) -> None:
+        """
+        占用本worker的槽位，没有空闲槽位时排队等待
+
+        Raises:
+            AdmissionRejected: 队列已满或等待超时
+        """
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        self.queued += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._set_gauges()
+        try:
+            # 槽位由 _release_local 直接转交给队首的等待者，不会被后到的请求抢走。
+            # 不使用 wait_for：槽位转交和取消同时发生时它可能吞掉取消，返回一个调用方已经不会释放的槽位
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+            if not future.done():
+                future.cancel()
+                self._waiters.remove(future)
+                raise self._reject("timeout")
+        except asyncio.CancelledError:
+            # 客户端断开：已经转交过来的槽位继续转交给下一个等待者
+            if future.done() and not future.cancelled():
+                self._release_local()
+            else:
+                future.cancel()
+                self._waiters.remove(future)
+            raise
+        finally:
+            self._set_gauges()
+
+    def _release_local(self) -> None:
+        """释放本worker的槽位，有等待者时直接转交给队首"""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    async def _acquire_global(self, slot_id: str, deadline: float) -> None:
+        """
+        占用全局槽位，已满时轮询等待到截止时间
+
+        Raises:
+            AdmissionRejected: 等待超时
+        """
+        while not await asyncio.to_thread(self.global_store.try_acquire, slot_id):
+            if time.monotonic() >= deadline:
+                raise self._reject("global_full")
+            await asyncio.sleep(GLOBAL_POLL_INTERVAL)
+
+    async def acquire(self) -> AdmissionSlot:
+        """
+        为一个请求申请槽位
+
+        Returns:
+            AdmissionSlot: 占用的槽位，请求结束时必须释放
+
+        Raises:
+            AdmissionRejected: 负载过高，请求被拒绝
+        """
+        start = time.monotonic()
+        await self._acquire_local()
+        global_id = None
+        if self.global_store is not None:
+            global_id = uuid.uuid4().hex
+            try:
+                await self._acquire_global(global_id, start + self.queue_timeout)
+            except BaseException:
+                self._release_local()
+                self._set_gauges()
+                raise
+
+        self.admitted += 1
+        ADMISSION_REQUESTS.labels(result="admitted").inc()
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - start)
+        self._set_gauges()
+        return AdmissionSlot(self, global_id)
+
+    async def _release(self, global_id: Optional[str], elapsed: float) -> None:
+        """释放槽位并更新平均处理时间"""
+        if self._service_time is None:
+            self._service_time = elapsed
+        else:
+            self._service_time += SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+        self._release_local()
+        self._set_gauges()
+        if global_id is not None:
+            await asyncio.to_thread(self.global_store.release, global_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取准入控制统计信息
+
+        Returns:
+            Dict[str, Any]: 包含处理中请求数、排队数、准入和拒绝次数、平均处理时间等信息
+        """
+        data = {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+            "avg_service_seconds": round(self._service_time, 3) if self._service_time is not None else None,
+            "retry_after": self.retry_after(),
+        }
+        if self.global_store is not None:
+            data["global_max_in_flight"] = self.global_store.limit
+            data["global_in_flight"] = self.global_store.count()
+        return data
@@ -4,9 +4,50 @@ API客户端包
 这个包提供了与不同AI提供商交互的客户端实现。
 """
 
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+from ...config import Config
 from .base import BaseAPIClient, Message
 from .factory import APIClientFactory
+from .mock import MockAPIClient
+from .rate_limit import RateLimitedAPIClient, RateLimiter
+from .registry import ClientRegistry
+from .resilience import FAILOVER_TARGETS, ResilientAPIClient
+from .routing import AUTO_MODEL_TYPE, AutoRoutingClient
+
+def _provider_client(model_type: str, model: Optional[str] = None) -> BaseAPIClient:
+    """
+    获取提供商客户端，配置了限流时包装限流器
+
+    Args:
+        model_type: AI提供商类型
+        model: 模型名称，不指定则使用配置中的默认模型
+
+    Returns:
+        BaseAPIClient: 提供商客户端
+    """
+    client = ClientRegistry.get(model_type, model)
+    limiter = RateLimiter.get(model_type)
+    if limiter is None:
+        return client
+    return RateLimitedAPIClient(client, limiter)
+
+def _failover(model_type: str) -> Optional[Callable[[], BaseAPIClient]]:
+    """
+    获取故障转移客户端的构造函数
+
+    只有开启了FAILOVER_ENABLED，且目标提供商配置了API密钥时才进行故障转移。
+
+    Args:
+        model_type: 当前的AI提供商类型
+
+    Returns:
+        Optional[Callable[[], BaseAPIClient]]: 返回故障转移客户端的函数，不转移时返回None
+    """
+    config = Config.get_instance()
+    target = FAILOVER_TARGETS.get(model_type)
+    if not config.FAILOVER_ENABLED or target is None or not config.provider_configured(target):
+        return None
+    return lambda: ResilientAPIClient(target, _provider_client(target))
 
 class APIClient:
     """
@@ -16,14 +57,26 @@ class APIClient:
     它使用工厂模式来创建具体的AI提供商客户端。
     """
     
-    def __init__(self, model_type: str = "monica"):
+    def __init__(self, model_type: str = "monica", model: Optional[str] = None):
         """
         初始化API客户端
+
+        底层客户端从进程内的注册表获取，同一提供商和模型共享连接池，
+        并包装了限流、重试、熔断和故障转移。每次重试都会重新获取限流配额。
+        model_type 为 "auto" 时使用自动路由客户端，它为每个候选提供商单独包装限流和容错。
         
         Args:
             model_type: AI提供商类型，默认为"monica"
+            model: 模型名称，不指定则使用配置中的默认模型
         """
-        self.client = APIClientFactory.create_client(model_type)
+        if model_type == AUTO_MODEL_TYPE:
+            self.client = ClientRegistry.get(model_type, model)
+            return
+        self.client = ResilientAPIClient(
+            model_type,
+            _provider_client(model_type, model),
+            fallback=_failover(model_type)
+        )
         
     async def call_api(
         self,
@@ -48,9 +101,39 @@ class APIClient:
         """
         return await self.client.call_api(prompt, messages, **kwargs)
 
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用AI API
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+
+        Raises:
+            ValueError: 当参数无效时
+            Exception: 当API调用失败时
+        """
+        async for chunk in self.client.stream_api(prompt, messages, **kwargs):
+            yield chunk
+
 __all__ = [
     'BaseAPIClient',
     'Message',
     'APIClientFactory',
+    'ClientRegistry',
+    'RateLimiter',
+    'RateLimitedAPIClient',
+    'ResilientAPIClient',
+    'AutoRoutingClient',
+    'MockAPIClient',
     'APIClient'
 ] 
\ No newline at end of file
@@ -5,7 +5,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 # 定义消息类型
 Message = Dict[str, Union[str, List[Dict[str, str]]]]
@@ -39,4 +39,35 @@ class BaseAPIClient(ABC):
             NotImplementedError: 当子类没有实现此方法时
             Exception: 当API调用失败时
         """
-        raise NotImplementedError("子类必须实现call_api方法")
\ No newline at end of file
+        raise NotImplementedError("子类必须实现call_api方法")
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用AI API
+
+        默认实现退化为一次性返回完整结果，支持流式输出的子类应覆盖此方法。
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+
+        Raises:
+            Exception: 当API调用失败时
+        """
+        yield await self.call_api(prompt, messages, **kwargs)
+
+    async def aclose(self) -> None:
+        """
+        释放客户端持有的资源（如HTTP连接池）
+
+        默认不做任何操作，持有连接池的子类应覆盖此方法。
+        """
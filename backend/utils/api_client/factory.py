@@ -2,34 +2,62 @@
 API客户端工厂模块
 
 这个模块负责创建不同AI提供商的API客户端实例。
+
+提供商的客户端模块在第一次创建该提供商的客户端时才导入，openai、zhipuai 等SDK
+只在实际使用对应的提供商时加载，不影响应用的导入和启动时间。
 """
 
+import importlib
 import logging
-from typing import Dict, Type
+from typing import Any, Dict, Type
 
 from ...config import Config
 from .base import BaseAPIClient
-from .monica import MonicaAPIClient
-from .zhipu import ZhipuAPIClient
 
 logger = logging.getLogger(__name__)
 
 class APIClientFactory:
     """API客户端工厂类"""
     
-    # 注册可用的AI提供商
-    _clients: Dict[str, Type[BaseAPIClient]] = {
-        "monica": MonicaAPIClient,
-        "zhipu": ZhipuAPIClient
+    # 注册可用的AI提供商："模块:类名"，模块相对于本包
+    _clients: Dict[str, str] = {
+        "monica": ".monica:MonicaAPIClient",
+        "zhipu": ".zhipu:ZhipuAPIClient",
+        # 离线压测和基准测试使用的模拟提供商
+        "mock": ".mock:MockAPIClient",
+        # 在已配置的提供商中按延迟自动选择
+        "auto": ".routing:AutoRoutingClient"
     }
+
+    @classmethod
+    def client_class(cls, model_type: str) -> Type[BaseAPIClient]:
+        """
+        获取提供商的客户端类，首次调用时导入所在模块
+
+        Args:
+            model_type: AI提供商类型
+
+        Returns:
+            Type[BaseAPIClient]: 客户端类
+
+        Raises:
+            ValueError: 当提供的model_type不支持时
+        """
+        if model_type not in cls._clients:
+            available_types = ", ".join(cls._clients.keys())
+            logger.error(f"不支持的模型类型: {model_type}，可用类型: {available_types}")
+            raise ValueError(f"不支持的模型类型: {model_type}")
+        module_name, _, class_name = cls._clients[model_type].partition(":")
+        return getattr(importlib.import_module(module_name, __package__), class_name)
     
     @classmethod
-    def create_client(cls, model_type: str) -> BaseAPIClient:
+    def create_client(cls, model_type: str, **kwargs: Any) -> BaseAPIClient:
         """
         创建API客户端实例
         
         Args:
-            model_type: AI提供商类型，如"monica"或"zhipu"
+            model_type: AI提供商类型，如"monica"、"zhipu"、"mock"或"auto"
+            **kwargs: 传给客户端构造函数的参数，如model
             
         Returns:
             BaseAPIClient: API客户端实例
@@ -38,15 +66,11 @@ class APIClientFactory:
             ValueError: 当提供的model_type不支持时
         """
         try:
-            # 验证模型类型
-            if model_type not in cls._clients:
-                available_types = ", ".join(cls._clients.keys())
-                logger.error(f"不支持的模型类型: {model_type}，可用类型: {available_types}")
-                raise ValueError(f"不支持的模型类型: {model_type}")
-            
+            # 验证模型类型并加载客户端类
+            client_class = cls.client_class(model_type)
+
             # 创建客户端实例
-            client_class = cls._clients[model_type]
-            client = client_class()
+            client = client_class(**kwargs)
             logger.info(f"成功创建{model_type}客户端实例")
             return client
             
@@ -0,0 +1,76 @@
+"""
+HTTP连接池模块
+
+为各AI提供商的SDK构建带连接池、长连接和HTTP/2支持的httpx客户端，
+使同一进程内的请求可以复用连接，避免每次请求都重新建立TLS连接。
+"""
+
+import importlib.util
+import logging
+
+import httpx
+
+from ...config import Config
+
+logger = logging.getLogger(__name__)
+
+def _http2_enabled(config: Config) -> bool:
+    """
+    判断是否启用HTTP/2
+
+    HTTP/2依赖h2库，未安装时自动退回HTTP/1.1
+
+    Args:
+        config: 配置对象
+
+    Returns:
+        bool: 是否启用HTTP/2
+    """
+    if not config.HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("未安装h2库，HTTP/2不可用，使用HTTP/1.1")
+        return False
+    return True
+
+def _limits(config: Config) -> httpx.Limits:
+    """根据配置构建连接池限制"""
+    return httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+    )
+
+def _timeout(config: Config) -> httpx.Timeout:
+    """根据配置构建超时设置"""
+    return httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT)
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """
+    构建异步HTTP客户端，供异步SDK（如OpenAI）使用
+
+    Returns:
+        httpx.AsyncClient: 带连接池的异步HTTP客户端
+    """
+    config = Config.get_instance()
+    return httpx.AsyncClient(
+        limits=_limits(config),
+        timeout=_timeout(config),
+        http2=_http2_enabled(config)
+    )
+
+def build_sync_http_client() -> httpx.Client:
+    """
+    构建同步HTTP客户端，供同步SDK（如智谱）使用
+
+    httpx.Client是线程安全的，可以在线程池的多个线程间共享。
+
+    Returns:
+        httpx.Client: 带连接池的同步HTTP客户端
+    """
+    config = Config.get_instance()
+    return httpx.Client(
+        limits=_limits(config),
+        timeout=_timeout(config),
+        http2=_http2_enabled(config)
+    )
@@ -0,0 +1,222 @@
+"""
+模拟AI API客户端实现
+
+不发送任何网络请求，按配置的延迟分布、输出速度和错误率返回合成的文章或标题，
+用于离线压测和基准测试，不消耗Monica/智谱的调用额度。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+from typing import AsyncIterator, List, Optional
+
+from ...config import Config
+from ..metrics import record_usage, track_llm
+from .base import BaseAPIClient, Message
+
+logger = logging.getLogger(__name__)
+
+# 合成文章使用的段落素材
+_SENTENCES = [
+    "很多人第一次接触这个话题时，都会低估它对日常生活的影响",
+    "真正拉开差距的，往往不是起点，而是日复一日的坚持",
+    "与其焦虑结果，不如先把眼前能做的一小步做好",
+    "数据显示，超过六成的人在三个月内放弃了最初的计划",
+    "换一个角度看问题，困难本身就是成长的一部分",
+    "方法固然重要，但比方法更重要的是开始行动",
+    "身边那些做成事的人，大多有一套简单却有效的习惯",
+    "别急着下结论，先把问题拆开，一件一件地解决",
+]
+
+class MockAPIError(Exception):
+    """模拟的接口错误，status_code 与真实接口的HTTP状态码含义相同，重试和熔断按同样的规则处理"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"模拟接口错误: HTTP {status_code}")
+        self.status_code = status_code
+
+class MockAPIClient(BaseAPIClient):
+    """
+    模拟AI API客户端
+
+    每次调用先等待按 MOCK_LATENCY_* 采样的首字延迟，再按 MOCK_TOKENS_PER_SECOND 的速度输出内容
+    （每个字符按一个token计算），并按 MOCK_ERROR_RATE 的概率抛出 MockAPIError。
+    标题提示词返回10个带序号的标题（提示词要求JSON时返回JSON），其他提示词返回一篇Markdown文章。
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        """
+        初始化模拟客户端
+
+        Args:
+            model: 模型名称，不指定则使用配置中的MOCK_MODEL
+        """
+        self.config = Config.get_instance()
+        self.model = model or self.config.MOCK_MODEL
+        # 配置了 MOCK_SEED 时延迟和错误的序列可重复
+        self.random = random.Random(self.config.MOCK_SEED)
+        logger.info(f"初始化模拟AI客户端成功，使用模型: {self.model}")
+
+    def _sample_latency(self) -> float:
+        """
+        按配置的分布采样首字延迟
+
+        Returns:
+            float: 延迟（秒），不小于0
+        """
+        mean = self.config.MOCK_LATENCY_MEAN
+        stddev = self.config.MOCK_LATENCY_STDDEV
+        distribution = self.config.MOCK_LATENCY_DISTRIBUTION
+        if mean <= 0:
+            return 0.0
+        if distribution == "uniform":
+            return self.random.uniform(max(0.0, mean - stddev), mean + stddev)
+        if distribution == "normal":
+            return max(0.0, self.random.gauss(mean, stddev))
+        if distribution == "lognormal" and stddev > 0:
+            # 由期望和标准差换算对数正态分布的参数，得到右侧长尾的延迟
+            sigma = math.sqrt(math.log(1 + (stddev / mean) ** 2))
+            mu = math.log(mean) - sigma ** 2 / 2
+            return self.random.lognormvariate(mu, sigma)
+        return mean
+
+    def _maybe_fail(self) -> None:
+        """按配置的错误率抛出模拟错误"""
+        if self.config.MOCK_ERROR_RATE > 0 and self.random.random() < self.config.MOCK_ERROR_RATE:
+            raise MockAPIError(self.config.MOCK_ERROR_STATUS)
+
+    @staticmethod
+    def _message_text(prompt: Optional[str], messages: Optional[List[Message]]) -> List[str]:
+        """
+        提取每条消息的文本
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+
+        Returns:
+            List[str]: 每条消息的文本，系统提示词在前
+
+        Raises:
+            ValueError: 当prompt和messages都未提供时
+        """
+        if messages is None:
+            if prompt is None:
+                raise ValueError("必须提供prompt或messages参数")
+            return [prompt]
+        texts = []
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, list):
+                content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+            texts.append(content or "")
+        return texts
+
+    def _compose(self, texts: List[str]) -> str:
+        """
+        生成合成的响应内容
+
+        内容由输入的摘要决定，相同的输入总是得到相同的内容。
+
+        Args:
+            texts: 每条消息的文本
+
+        Returns:
+            str: 标题列表或Markdown文章
+        """
+        prompt = "\n".join(texts)
+        # 用户提示词中（冒号后）最长的一段通常是文章描述，用作主题
+        values = [line.split("：")[-1].strip().strip("[]") for line in texts[-1].splitlines()]
+        subject = max(values, key=len, default="")[:20] or "模拟主题"
+        seed = int(hashlib.md5(prompt.encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+
+        system = texts[0] if len(texts) > 1 else ""
+        if "标题" in system and "markdown" not in system.lower():
+            titles = [f"{subject}：{rng.choice(_SENTENCES)}" for _ in range(10)]
+            if "JSON" in system:
+                return json.dumps({"titles": [{"t": title} for title in titles]}, ensure_ascii=False)
+            return "\n".join(f"{i}. {title}" for i, title in enumerate(titles, 1))
+
+        length = self.config.MOCK_ARTICLE_LENGTH
+        paragraphs: List[str] = []
+        size = 0
+        while size < length:
+            paragraph = "，".join(rng.choice(_SENTENCES) for _ in range(4)) + "。"
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+        return f"# 关于{subject}的一些思考\n\n" + "\n\n".join(paragraphs)
+
+    def _usage(self, texts: List[str], content: str) -> dict:
+        """按字符数估算token用量"""
+        return {"prompt_tokens": sum(len(text) for text in texts), "completion_tokens": len(content)}
+
+    async def call_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> str:
+        """
+        模拟一次普通调用
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，模拟客户端忽略
+
+        Returns:
+            str: 合成的响应文本
+
+        Raises:
+            ValueError: 当参数无效时
+            MockAPIError: 按配置的错误率注入的错误
+        """
+        texts = self._message_text(prompt, messages)
+        with track_llm("mock", self.model):
+            await asyncio.sleep(self._sample_latency())
+            self._maybe_fail()
+            content = self._compose(texts)
+            rate = self.config.MOCK_TOKENS_PER_SECOND
+            if rate > 0:
+                await asyncio.sleep(len(content) / rate)
+        record_usage("mock", self.model, self._usage(texts, content))
+        return content
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        模拟一次流式调用，按 MOCK_STREAM_CHUNK_SIZE 切分内容，按输出速度逐片返回
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，模拟客户端忽略
+
+        Yields:
+            str: 合成的文本片段
+
+        Raises:
+            ValueError: 当参数无效时
+            MockAPIError: 按配置的错误率注入的错误
+        """
+        texts = self._message_text(prompt, messages)
+        with track_llm("mock", self.model, mode="stream"):
+            await asyncio.sleep(self._sample_latency())
+            self._maybe_fail()
+            content = self._compose(texts)
+            size = max(1, self.config.MOCK_STREAM_CHUNK_SIZE)
+            rate = self.config.MOCK_TOKENS_PER_SECOND
+            for start in range(0, len(content), size):
+                chunk = content[start:start + size]
+                if rate > 0 and start:
+                    await asyncio.sleep(len(chunk) / rate)
+                yield chunk
+        record_usage("mock", self.model, self._usage(texts, content))
@@ -5,31 +5,80 @@ Monica AI API客户端实现
 """
 
 import logging
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 from openai import AsyncOpenAI
 
 from ...config import Config
+from ..metrics import record_usage, track_llm
 from .base import BaseAPIClient, Message
+from .http import build_async_http_client
 
 logger = logging.getLogger(__name__)
 
 class MonicaAPIClient(BaseAPIClient):
     """Monica AI API客户端实现类"""
     
-    def __init__(self):
+    def __init__(self, model: Optional[str] = None):
         """
         初始化Monica AI客户端
         
         从配置中获取API密钥和端点信息
+
+        Args:
+            model: 模型名称，不指定则使用配置中的MONICA_MODEL
         """
         self.config = Config.get_instance()
+        self.model = model or self.config.MONICA_MODEL
         
-        # 初始化异步OpenAI客户端
+        # 初始化异步OpenAI客户端，使用带连接池的HTTP客户端
         self.client = AsyncOpenAI(
             base_url=self.config.MONICA_API_ENDPOINT,
-            api_key=self.config.MONICA_API_KEY
+            api_key=self.config.MONICA_API_KEY,
+            http_client=build_async_http_client(),
+            # 重试由 ResilientAPIClient 统一处理，关闭SDK自带的重试
+            max_retries=0
         )
-        logger.info(f"初始化Monica AI客户端成功，使用模型: {self.config.MONICA_MODEL}")
+        logger.info(f"初始化Monica AI客户端成功，使用模型: {self.model}")
+
+    async def aclose(self) -> None:
+        """关闭底层HTTP连接池"""
+        await self.client.close()
+
+    def _build_messages(
+        self,
+        prompt: Optional[str],
+        messages: Optional[List[Message]]
+    ) -> List[Message]:
+        """
+        构建请求消息列表
+
+        如果没有提供messages，则使用prompt创建默认消息
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+
+        Returns:
+            List[Message]: 请求消息列表
+
+        Raises:
+            ValueError: 当prompt和messages都未提供时
+        """
+        if messages is not None:
+            return messages
+        if prompt is None:
+            raise ValueError("必须提供prompt或messages参数")
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    }
+                ]
+            }
+        ]
         
     async def call_api(
         self,
@@ -53,33 +102,73 @@ class MonicaAPIClient(BaseAPIClient):
             Exception: 当API调用失败时
         """
         try:
-            # 如果没有提供messages，则使用prompt创建默认消息
-            if messages is None:
-                if prompt is None:
-                    raise ValueError("必须提供prompt或messages参数")
-                messages = [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ]
-            
+            messages = self._build_messages(prompt, messages)
+
             # 创建完成请求
-            completion = await self.client.chat.completions.create(
-                model=self.config.MONICA_MODEL,
-                messages=messages,
-                temperature=kwargs.get('temperature', self.config.API_TEMPERATURE),
-                max_tokens=kwargs.get('max_tokens', self.config.API_MAX_TOKENS)
-            )
+            with track_llm("monica", self.model):
+                completion = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=kwargs.get('temperature', self.config.API_TEMPERATURE),
+                    max_tokens=kwargs.get('max_tokens', self.config.API_MAX_TOKENS)
+                )
+            record_usage("monica", self.model, completion.usage)
             
             # 返回生成的文本内容
             return completion.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Monica API调用出错: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用Monica AI API
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+
+        Raises:
+            ValueError: 当参数无效时
+            Exception: 当API调用失败时
+        """
+        try:
+            messages = self._build_messages(prompt, messages)
+
+            # 耗时统计到流结束为止
+            with track_llm("monica", self.model, mode="stream"):
+                # 创建流式完成请求
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=kwargs.get('temperature', self.config.API_TEMPERATURE),
+                    max_tokens=kwargs.get('max_tokens', self.config.API_MAX_TOKENS),
+                    stream=True
+                )
+
+                try:
+                    async for chunk in stream:
+                        # 部分服务在最后一个片段中返回usage
+                        record_usage("monica", self.model, getattr(chunk, "usage", None))
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            yield delta
+                finally:
+                    # 客户端提前断开时关闭底层连接
+                    await stream.response.aclose()
+
+        except Exception as e:
+            logger.error(f"Monica API流式调用出错: {str(e)}")
+            raise
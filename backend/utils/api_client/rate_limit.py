@@ -0,0 +1,420 @@
+"""
+客户端限流模块
+
+按提供商限制每分钟请求数（RPM）和每分钟token数（TPM），避免突发请求超出配额导致429。
+- 令牌桶算法，桶容量为 RATE_LIMIT_BURST_SECONDS 秒的配额
+- 请求数和token数两个桶一起检查，都足够时才一起扣除，等待期间不占用任何一个桶的配额
+- 等待中的调用方按到达顺序依次放行
+- 配置 RATE_LIMIT_STORE=sqlite 时，令牌桶状态保存在SQLite中，所有worker进程共享同一份配额
+
+请求前按提示词长度预估并扣除输入token，请求完成后按生成内容的长度补扣输出token，
+余额可以为负，后续请求会相应等待。
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from ...config import Config
+from ..metrics import RATE_LIMIT_ADMITTED, RATE_LIMIT_TOKENS, RATE_LIMIT_WAIT_SECONDS
+from ..paths import CACHE_DIR
+from ..sqlite import ThreadLocalConnection
+from ..stats import register_stats
+from .base import BaseAPIClient, Message
+
+logger = logging.getLogger(__name__)
+
+# 一次扣除的令牌需求：(桶名称, 令牌数, 每秒补充的令牌数, 桶容量)
+BucketRequest = Tuple[str, float, float, float]
+
+def estimate_tokens(prompt: Optional[str], messages: Optional[List[Message]]) -> int:
+    """
+    粗略估算提示词的token数
+
+    中文文本大约每个字符对应一个token，这里直接使用字符数作为偏保守的估计。
+
+    Args:
+        prompt: 简单模式下的提示词
+        messages: 高级模式下的消息列表
+
+    Returns:
+        int: 估算的token数
+    """
+    if messages is None:
+        return len(prompt or "")
+
+    total = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            total += sum(len(item.get("text", "")) for item in content if isinstance(item, dict))
+        else:
+            total += len(str(content))
+    return total
+
+def _take(
+    tokens: float,
+    updated: float,
+    now: float,
+    amount: float,
+    rate: float,
+    capacity: float,
+    force: bool = False
+) -> Tuple[float, float]:
+    """
+    令牌桶的核心计算
+
+    Args:
+        tokens: 当前令牌数
+        updated: 上次更新时间
+        now: 当前时间
+        amount: 需要的令牌数
+        rate: 每秒补充的令牌数
+        capacity: 桶容量
+        force: 为True时无论余额多少都直接扣除
+
+    Returns:
+        Tuple[float, float]: (扣除后的令牌数, 需要等待的秒数)，等待秒数为0表示已扣除
+    """
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if force:
+        return tokens - amount, 0.0
+    # 单次需求超过桶容量时，只要桶满即可放行
+    needed = min(amount, capacity)
+    if tokens >= needed:
+        return tokens - amount, 0.0
+    return tokens, (needed - tokens) / rate
+
+def _take_all(
+    states: List[Tuple[float, float]],
+    now: float,
+    requests: List[BucketRequest],
+    force: bool
+) -> Tuple[List[float], float]:
+    """
+    同时从多个令牌桶中扣除令牌，任一个桶不足时都不扣除
+
+    Args:
+        states: 每个桶的 (当前令牌数, 上次更新时间)
+        now: 当前时间
+        requests: 每个桶的令牌需求
+        force: 为True时无论余额多少都直接扣除
+
+    Returns:
+        Tuple[List[float], float]: (扣除后每个桶的令牌数, 需要等待的秒数)，等待秒数为0表示已扣除
+    """
+    results = [
+        _take(tokens, updated, now, amount, rate, capacity, force)
+        for (tokens, updated), (_, amount, rate, capacity) in zip(states, requests)
+    ]
+    return [tokens for tokens, _ in results], max((wait for _, wait in results), default=0.0)
+
+class MemoryBucketStore:
+    """进程内的令牌桶状态"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, requests: List[BucketRequest], force: bool = False) -> float:
+        """
+        尝试从令牌桶中扣除令牌，所有桶都足够时才一起扣除
+
+        Args:
+            requests: 每个桶的令牌需求
+            force: 为True时无论余额多少都直接扣除
+
+        Returns:
+            float: 需要等待的秒数，为0表示已扣除
+        """
+        now = time.monotonic()
+        with self._lock:
+            states = [self._buckets.get(name, (capacity, now)) for name, _, _, capacity in requests]
+            balances, wait = _take_all(states, now, requests, force)
+            if wait <= 0:
+                for (name, _, _, _), tokens in zip(requests, balances):
+                    self._buckets[name] = (tokens, now)
+        return wait
+
+class SQLiteBucketStore:
+    """基于SQLite的令牌桶状态，所有worker进程共享"""
+
+    def __init__(self, path: str):
+        self._db = ThreadLocalConnection(path)
+        self._db.conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "name TEXT PRIMARY KEY, "
+            "tokens REAL NOT NULL, "
+            "updated REAL NOT NULL)"
+        )
+
+    def take(self, requests: List[BucketRequest], force: bool = False) -> float:
+        """
+        尝试从令牌桶中扣除令牌，所有桶都足够时才在同一个事务中一起扣除
+
+        Args:
+            requests: 每个桶的令牌需求
+            force: 为True时无论余额多少都直接扣除
+
+        Returns:
+            float: 需要等待的秒数，为0表示已扣除
+        """
+        conn = self._db.conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            states = []
+            for name, _, _, capacity in requests:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+                states.append(row if row else (capacity, now))
+            balances, wait = _take_all(states, now, requests, force)
+            if wait <= 0:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    [(name, tokens, now) for (name, _, _, _), tokens in zip(requests, balances)]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+class RateLimiter:
+    """
+    单个提供商的限流器
+
+    同一进程内的调用方通过公平锁排队，队首的调用方等待配额后放行。
+    请求数和token数在一次检查中一起扣除，队首等待token配额时不会先占用请求配额。
+
+    属性：
+        provider: 提供商类型
+        rpm: 每分钟请求数上限，0表示不限制
+        tpm: 每分钟token数上限，0表示不限制
+    """
+
+    _limiters: Dict[str, 'RateLimiter'] = {}
+    _store = None
+
+    def __init__(self, provider: str, rpm: int, tpm: int, burst_seconds: float, store):
+        self.provider = provider
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst_seconds = burst_seconds
+        self.store = store
+        self.blocking = isinstance(store, SQLiteBucketStore)
+        self._lock = asyncio.Lock()
+
+        # 统计数据
+        self.waiting = 0
+        self.admitted = 0
+        self.admitted_tokens = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent: Deque[float] = deque()
+
+    @classmethod
+    def get(cls, provider: str) -> Optional['RateLimiter']:
+        """
+        获取提供商的限流器，未配置限额时返回None
+
+        Args:
+            provider: AI提供商类型
+
+        Returns:
+            Optional[RateLimiter]: 限流器
+        """
+        if provider in cls._limiters:
+            return cls._limiters[provider]
+
+        config = Config.get_instance()
+        rpm, tpm = config.rate_limits(provider)
+        limiter = None
+        if rpm > 0 or tpm > 0:
+            limiter = cls(provider, rpm, tpm, config.RATE_LIMIT_BURST_SECONDS, cls._get_store(config))
+            logger.info(f"启用限流: provider={provider}, rpm={rpm}, tpm={tpm}")
+        cls._limiters[provider] = limiter
+        return limiter
+
+    @classmethod
+    def _get_store(cls, config: Config):
+        """获取令牌桶状态存储，不存在时创建"""
+        if cls._store is None:
+            if config.RATE_LIMIT_STORE == "sqlite":
+                cls._store = SQLiteBucketStore(
+                    config.RATE_LIMIT_DB_PATH or os.path.join(CACHE_DIR, "rate_limit.db")
+                )
+            else:
+                cls._store = MemoryBucketStore()
+        return cls._store
+
+    def _request(self, name: str, amount: float, per_minute: float) -> BucketRequest:
+        """构建一个桶的令牌需求"""
+        rate = per_minute / 60
+        return f"{self.provider}:{name}", amount, rate, max(1.0, rate * self.burst_seconds)
+
+    def _requests(self, tokens: int) -> List[BucketRequest]:
+        """返回一次调用需要的请求数和token数令牌"""
+        requests = []
+        if self.rpm > 0:
+            requests.append(self._request("requests", 1, self.rpm))
+        if self.tpm > 0:
+            requests.append(self._request("tokens", tokens, self.tpm))
+        return requests
+
+    async def _store_take(self, requests: List[BucketRequest], force: bool = False) -> float:
+        """从存储中扣除令牌，SQLite存储在线程中执行"""
+        if self.blocking:
+            return await asyncio.to_thread(self.store.take, requests, force)
+        return self.store.take(requests, force)
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        等待直到请求和token配额都足够
+
+        Args:
+            tokens: 预估的输入token数
+        """
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                requests = self._requests(tokens)
+                while True:
+                    wait = await self._store_take(requests)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        now = time.monotonic()
+        self.admitted += 1
+        self.admitted_tokens += tokens
+        RATE_LIMIT_WAIT_SECONDS.labels(provider=self.provider).observe(waited)
+        RATE_LIMIT_ADMITTED.labels(provider=self.provider).inc()
+        RATE_LIMIT_TOKENS.labels(provider=self.provider).inc(tokens)
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._recent.append(now)
+        if waited > 1:
+            logger.info(f"限流等待: provider={self.provider}, 等待{waited:.2f}秒")
+
+    async def debit(self, tokens: int) -> None:
+        """
+        请求完成后补扣输出token，余额可以为负
+
+        Args:
+            tokens: 输出的token数
+        """
+        if self.tpm <= 0 or tokens <= 0:
+            return
+        await self._store_take([self._request("tokens", tokens, self.tpm)], force=True)
+        self.admitted_tokens += tokens
+        RATE_LIMIT_TOKENS.labels(provider=self.provider).inc(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 排队数、放行数、平均和最大等待时间、最近一分钟的放行数
+        """
+        cutoff = time.monotonic() - 60
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "admitted_tokens": self.admitted_tokens,
+            "admitted_last_minute": len(self._recent),
+            "avg_wait_seconds": round(self.total_wait / self.admitted, 4) if self.admitted else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Any]:
+        """获取所有已启用限流的提供商的统计信息"""
+        return {
+            provider: limiter.stats()
+            for provider, limiter in cls._limiters.items()
+            if limiter is not None
+        }
+
+register_stats("rate_limit", RateLimiter.all_stats)
+
+class RateLimitedAPIClient(BaseAPIClient):
+    """
+    带限流的API客户端
+
+    包装一个提供商客户端，每次调用（包括重试）前先获取配额。
+
+    属性：
+        client: 被包装的提供商客户端
+        limiter: 提供商的限流器
+    """
+
+    def __init__(self, client: BaseAPIClient, limiter: RateLimiter):
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        # 其他属性（如config、model）直接读取被包装的客户端
+        return getattr(self.client, name)
+
+    async def call_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> str:
+        """
+        获取配额后调用AI API
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Returns:
+            str: AI生成的响应文本
+        """
+        await self.limiter.acquire(estimate_tokens(prompt, messages))
+        content = await self.client.call_api(prompt, messages, **kwargs)
+        await self.limiter.debit(len(content or ""))
+        return content
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        获取配额后流式调用AI API
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+        """
+        await self.limiter.acquire(estimate_tokens(prompt, messages))
+        length = 0
+        try:
+            async for chunk in self.client.stream_api(prompt, messages, **kwargs):
+                length += len(chunk)
+                yield chunk
+        finally:
+            await self.limiter.debit(length)
+
+    async def aclose(self) -> None:
+        """被包装的客户端由注册表统一关闭，这里不做任何操作"""
@@ -0,0 +1,95 @@
+"""
+API客户端注册表模块
+
+每个worker进程内为每个 (提供商, 模型) 组合只创建一个长期存在的客户端实例，
+所有请求共享该实例及其连接池，并在应用关闭时统一释放。
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from ...config import Config
+from .base import BaseAPIClient
+from .factory import APIClientFactory
+from ..stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+class ClientRegistry:
+    """
+    API客户端注册表
+
+    以 (model_type, model) 为键缓存客户端实例，首次使用时创建。
+    """
+
+    _clients: Dict[Tuple[str, str], BaseAPIClient] = {}
+
+    @staticmethod
+    def default_model(model_type: str) -> str:
+        """
+        获取提供商在配置中的默认模型
+
+        Args:
+            model_type: AI提供商类型
+
+        Returns:
+            str: 模型名称，未知提供商返回空字符串
+        """
+        config = Config.get_instance()
+        models = {
+            "monica": config.MONICA_MODEL,
+            "zhipu": config.ZHIPU_MODEL,
+            "mock": config.MOCK_MODEL,
+            "auto": "auto",
+        }
+        return models.get(model_type, "")
+
+    @classmethod
+    def get(cls, model_type: str, model: Optional[str] = None) -> BaseAPIClient:
+        """
+        获取共享的API客户端，不存在时创建
+
+        Args:
+            model_type: AI提供商类型，如"monica"或"zhipu"
+            model: 模型名称，不指定则使用配置中的默认模型
+
+        Returns:
+            BaseAPIClient: 共享的API客户端实例
+
+        Raises:
+            ValueError: 当提供的model_type不支持时
+        """
+        model = model or cls.default_model(model_type)
+        key = (model_type, model)
+        client = cls._clients.get(key)
+        if client is None:
+            client = APIClientFactory.create_client(model_type, model=model or None)
+            cls._clients[key] = client
+            logger.info(f"注册共享API客户端: provider={model_type}, model={model}")
+        return client
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        获取注册表统计信息
+
+        Returns:
+            Dict[str, Any]: 已创建的客户端列表
+        """
+        return {
+            "clients": [f"{model_type}:{model}" for model_type, model in cls._clients]
+        }
+
+    @classmethod
+    async def aclose_all(cls) -> None:
+        """关闭所有已创建的客户端并释放连接池"""
+        clients = list(cls._clients.items())
+        cls._clients.clear()
+        for (model_type, model), client in clients:
+            try:
+                await client.aclose()
+                logger.info(f"已关闭API客户端: provider={model_type}, model={model}")
+            except Exception as e:
+                logger.error(f"关闭API客户端失败: provider={model_type}, model={model}, {str(e)}")
+
+register_stats("api_clients", ClientRegistry.stats)
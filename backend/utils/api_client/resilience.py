@@ -0,0 +1,436 @@
+"""
+API调用容错模块
+
+为提供商客户端增加：
+- 指数退避加随机抖动的重试（只重试429、5xx、超时和连接错误）
+- 重试预算，限制重试请求占总请求的比例，避免故障时重试风暴
+- 每个提供商独立的熔断器，连续失败后暂时停止调用
+- 可选的自动故障转移，当前提供商不可用时改用另一个提供商
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from ...config import Config
+from ..latency import ModelLatency
+from ..stats import register_stats
+from .base import BaseAPIClient, Message
+
+logger = logging.getLogger(__name__)
+
+# 故障转移的目标提供商
+FAILOVER_TARGETS = {
+    "monica": "zhipu",
+    "zhipu": "monica",
+}
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    判断异常是否为可重试的临时故障
+
+    Args:
+        exc: API调用抛出的异常
+
+    Returns:
+        bool: 429、408、5xx、超时和连接错误返回True
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # httpx 随提供商SDK按需加载，没有加载时也不可能抛出它的异常
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    # SDK自定义的超时和连接异常（如 APITimeoutError、APIConnectionError）
+    name = type(exc).__name__
+    return name.endswith("TimeoutError") or name.endswith("ConnectionError")
+
+class RetryPolicy:
+    """
+    重试策略：指数退避加完全随机抖动
+
+    属性：
+        max_retries: 最大重试次数（不含首次调用）
+        base_delay: 首次重试的基础等待时间（秒）
+        max_delay: 单次等待时间上限（秒）
+    """
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """
+        计算第 attempt 次重试前的等待时间
+
+        Args:
+            attempt: 重试序号，从0开始
+
+        Returns:
+            float: 等待时间（秒），在 [0, min(max_delay, base_delay * 2^attempt)] 内随机
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class RetryBudget:
+    """
+    重试预算
+
+    每个请求存入 ratio 个令牌，每次重试消耗1个令牌，令牌数不超过 max_tokens。
+    提供商大面积故障时，重试次数被限制在请求数的 ratio 倍以内。
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """记录一次请求，存入令牌"""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        尝试消耗一个令牌用于重试
+
+        Returns:
+            bool: 预算充足返回True
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败 failure_threshold 次后进入open状态，拒绝调用；
+    经过 recovery_time 秒后进入half_open状态，放行一个探测请求，
+    成功则恢复closed，失败则重新open。
+    """
+
+    def __init__(self, failure_threshold: int, recovery_time: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        判断是否允许调用
+
+        Returns:
+            bool: closed状态或half_open状态的探测请求返回True
+        """
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.recovery_time:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """记录一次成功调用"""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """
+        释放half_open状态的探测名额，不改变熔断状态
+
+        探测请求被取消时调用，下一个请求可以重新探测。
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """记录一次失败调用"""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"熔断器打开: 连续失败{self.failures}次")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+class CircuitOpenError(Exception):
+    """提供商熔断中，调用被拒绝"""
+
+class ProviderHealth:
+    """
+    提供商健康状态：每个提供商一个熔断器、一个重试预算和调用统计
+
+    进程内共享，所有该提供商的客户端使用同一份状态。
+    """
+
+    _providers: Dict[str, 'ProviderHealth'] = {}
+
+    def __init__(self, provider: str, config: Config):
+        self.provider = provider
+        self.breaker = CircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RECOVERY_TIME)
+        self.budget = RetryBudget(config.RETRY_BUDGET_RATIO)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self.rejected = 0
+        self.failovers = 0
+
+    @classmethod
+    def get(cls, provider: str) -> 'ProviderHealth':
+        """
+        获取提供商的健康状态，不存在时创建
+
+        Args:
+            provider: AI提供商类型
+
+        Returns:
+            ProviderHealth: 健康状态
+        """
+        health = cls._providers.get(provider)
+        if health is None:
+            health = cls(provider, Config.get_instance())
+            cls._providers[provider] = health
+        return health
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        获取所有提供商的容错统计
+
+        Returns:
+            Dict[str, Any]: 以提供商为键的统计字典
+        """
+        return {
+            provider: {
+                "circuit": health.breaker.state,
+                "calls": health.calls,
+                "failures": health.failures,
+                "retries": health.retries,
+                "retries_denied": health.retries_denied,
+                "rejected": health.rejected,
+                "failovers": health.failovers,
+            }
+            for provider, health in cls._providers.items()
+        }
+
+register_stats("resilience", ProviderHealth.stats)
+
+class ResilientAPIClient(BaseAPIClient):
+    """
+    带重试、熔断和故障转移的API客户端
+
+    包装一个提供商客户端，对外提供相同的接口。
+
+    属性：
+        provider: 被包装客户端的提供商类型
+        client: 被包装的提供商客户端
+        config: 配置对象
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        client: BaseAPIClient,
+        fallback: Optional[Callable[[], Optional[BaseAPIClient]]] = None,
+        policy: Optional[RetryPolicy] = None
+    ):
+        """
+        初始化容错客户端
+
+        Args:
+            provider: 提供商类型
+            client: 被包装的提供商客户端
+            fallback: 返回故障转移客户端的函数，为None或返回None时不做故障转移
+            policy: 重试策略，不指定则使用配置中的MAX_RETRIES和RETRY_DELAY
+        """
+        self.provider = provider
+        self.client = client
+        self.config = Config.get_instance()
+        self.fallback = fallback
+        self.policy = policy or RetryPolicy(
+            max_retries=self.config.MAX_RETRIES,
+            base_delay=self.config.RETRY_DELAY,
+            max_delay=self.config.RETRY_MAX_DELAY
+        )
+        self.health = ProviderHealth.get(provider)
+
+    def __getattr__(self, name: str) -> Any:
+        # 其他属性（如model）直接读取被包装的客户端
+        return getattr(self.client, name)
+
+    def _fallback_client(self) -> Optional[BaseAPIClient]:
+        """获取故障转移客户端"""
+        if self.fallback is None:
+            return None
+        return self.fallback()
+
+    async def _with_retries(self, call: Callable[[], Any]) -> Any:
+        """
+        在重试策略和熔断器的保护下执行调用
+
+        Args:
+            call: 返回协程的无参函数
+
+        Returns:
+            Any: 调用结果
+
+        Raises:
+            CircuitOpenError: 熔断器打开时抛出
+            Exception: 不可重试或重试耗尽时抛出最后一次的异常
+        """
+        health = self.health
+        health.budget.record_request()
+        attempt = 0
+        while True:
+            if not health.breaker.allow():
+                health.rejected += 1
+                raise CircuitOpenError(f"{self.provider} 熔断中，暂停调用")
+            # 本次调用是否为half_open状态的探测请求
+            probe = health.breaker.state == "half_open"
+
+            health.calls += 1
+            try:
+                result = await call()
+            except Exception as e:
+                health.failures += 1
+                if not is_retryable(e):
+                    # 不可重试的错误（如400）说明提供商能正常响应，同样结束探测
+                    health.breaker.record_success()
+                    raise
+                health.breaker.record_failure()
+
+                if attempt >= self.policy.max_retries:
+                    raise
+                if not health.budget.try_spend():
+                    health.retries_denied += 1
+                    logger.warning(f"{self.provider} 重试预算耗尽，不再重试: {str(e)}")
+                    raise
+
+                delay = self.policy.delay(attempt)
+                attempt += 1
+                health.retries += 1
+                logger.warning(f"{self.provider} 调用失败，{delay:.2f}秒后第{attempt}次重试: {str(e)}")
+                await asyncio.sleep(delay)
+            except BaseException:
+                # 调用被取消：既不算成功也不算失败，只释放探测名额
+                if probe:
+                    health.breaker.release_probe()
+                raise
+            else:
+                health.breaker.record_success()
+                return result
+
+    async def call_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> str:
+        """
+        调用AI API，失败时按策略重试，必要时故障转移
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Returns:
+            str: AI生成的响应文本
+
+        Raises:
+            Exception: 重试和故障转移都失败时抛出
+        """
+        try:
+            return await self._with_retries(
+                lambda: self.client.call_api(prompt, messages, **kwargs)
+            )
+        except Exception as e:
+            fallback = self._fallback_client()
+            if fallback is None or not (is_retryable(e) or isinstance(e, CircuitOpenError)):
+                raise
+            self.health.failovers += 1
+            logger.warning(f"{self.provider} 不可用，故障转移到 {fallback.provider}: {str(e)}")
+            return await fallback.call_api(prompt, messages, **kwargs)
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用AI API
+
+        只在收到第一个片段之前重试或故障转移；已经输出内容后发生的错误直接抛出。
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+        """
+        async def open_stream(provider: str, client: BaseAPIClient):
+            """打开流并读取第一个片段，记录收到第一个片段的耗时（自动路由据此决定流式对冲的阈值）"""
+            latency = ModelLatency.get(provider, client.model, first_chunk=True)
+            start = time.perf_counter()
+            stream = client.stream_api(prompt, messages, **kwargs).__aiter__()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except Exception:
+                latency.record(time.perf_counter() - start, False)
+                raise
+            latency.record(time.perf_counter() - start, True)
+            return stream, first
+
+        try:
+            stream, first = await self._with_retries(lambda: open_stream(self.provider, self.client))
+        except Exception as e:
+            fallback = self._fallback_client()
+            if fallback is None or not (is_retryable(e) or isinstance(e, CircuitOpenError)):
+                raise
+            self.health.failovers += 1
+            logger.warning(f"{self.provider} 不可用，流式请求故障转移到 {fallback.provider}: {str(e)}")
+            stream, first = await open_stream(fallback.provider, fallback)
+
+        try:
+            if first is None:
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            # 调用方提前停止读取时关闭底层的流，释放HTTP连接
+            await stream.aclose()
+
+    async def aclose(self) -> None:
+        """被包装的客户端由注册表统一关闭，这里不做任何操作"""
@@ -0,0 +1,322 @@
+"""
+自动路由模块
+
+model_type=auto 时使用的客户端：在已配置的提供商中，按最近的延迟和错误率
+选择当前最快的健康提供商，并可选地发出对冲请求：
+
+- 首选提供商超过阈值仍未返回（流式请求为未收到第一个片段）时，向次优提供商再发一个请求
+- 先成功返回的结果胜出，另一个请求被取消
+- 首选提供商直接失败时立即改用次优提供商
+
+延迟和错误率来自 utils/latency 的滚动窗口，熔断状态来自各提供商的 ProviderHealth。
+对冲阈值默认取首选提供商最近的p95延迟，只有最慢的约5%请求会触发对冲，用少量额外调用换取更低的尾延迟。
+流式请求的阈值取收到第一个片段耗时的p95，第一个片段通常远早于完整响应到达，不能沿用普通调用的阈值。
+"""
+
+import asyncio
+import logging
+import random
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ...config import Config
+from ..latency import ModelLatency
+from ..stats import register_stats
+from .base import BaseAPIClient, Message
+from .resilience import ProviderHealth, ResilientAPIClient
+
+logger = logging.getLogger(__name__)
+
+# 自动路由的 model_type
+AUTO_MODEL_TYPE = "auto"
+
+# 使用p95作为对冲阈值前，首选提供商至少需要的样本数
+MIN_HEDGE_SAMPLES = 20
+
+class AutoRoutingClient(BaseAPIClient):
+    """
+    按延迟自动选择提供商的API客户端
+
+    属性：
+        provider: 固定为 "auto"
+        model: 固定为 "auto"
+        providers: 候选提供商（已配置API密钥的 AUTO_PROVIDERS）
+        config: 配置对象
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        """
+        初始化自动路由客户端
+
+        Args:
+            model: 忽略，各候选提供商使用自己的默认模型
+
+        Raises:
+            ValueError: 没有任何候选提供商配置了API密钥时抛出
+        """
+        self.config = Config.get_instance()
+        self.provider = AUTO_MODEL_TYPE
+        self.model = AUTO_MODEL_TYPE
+        self.providers = [
+            provider for provider in self.config.AUTO_PROVIDERS
+            if provider != AUTO_MODEL_TYPE and self.config.provider_configured(provider)
+        ]
+        if not self.providers:
+            raise ValueError("自动路由没有可用的提供商，请至少为一个 AUTO_PROVIDERS 中的提供商配置API密钥")
+
+        self._clients: Dict[str, BaseAPIClient] = {}
+        self._lock = threading.Lock()
+        self.routed = {provider: 0 for provider in self.providers}
+        self.explored = 0
+        self.hedged = 0
+        self.backup_wins = 0
+        register_stats("auto_routing", self.stats)
+        logger.info(f"初始化自动路由客户端，候选提供商: {', '.join(self.providers)}")
+
+    def _client(self, provider: str) -> BaseAPIClient:
+        """获取候选提供商的客户端（带限流、重试和熔断，不做故障转移），不存在时创建"""
+        client = self._clients.get(provider)
+        if client is None:
+            # 延迟导入，避免与包的 __init__ 循环导入
+            from . import _provider_client
+            client = ResilientAPIClient(provider, _provider_client(provider))
+            self._clients[provider] = client
+        return client
+
+    def _latency(self, provider: str, first_chunk: bool = False) -> Dict[str, Any]:
+        """获取提供商默认模型最近的延迟统计，first_chunk 为True时为流式调用首个片段的耗时"""
+        model = self.config.allowed_models(provider)[0]
+        return ModelLatency.get(provider, model, first_chunk=first_chunk).snapshot()
+
+    def _score(self, provider: str) -> Tuple[int, float]:
+        """
+        计算提供商的排序键，越小越优先
+
+        健康的提供商排在前面，按p50延迟排序；没有样本时延迟按0计算，优先尝试以获得统计。
+        不健康的提供商（熔断中或错误率过高）排在后面，按错误率排序。
+        """
+        latency = self._latency(provider)
+        unhealthy = (
+            ProviderHealth.get(provider).breaker.state == "open"
+            or latency["error_rate"] > self.config.AUTO_MAX_ERROR_RATE
+        )
+        if unhealthy:
+            return 1, latency["error_rate"]
+        return 0, latency["p50_ms"] or 0.0
+
+    def rank(self) -> List[str]:
+        """
+        按当前的延迟和健康状态对候选提供商排序
+
+        Returns:
+            List[str]: 第一个为首选提供商，其余为对冲和故障转移的备选
+        """
+        scores = {provider: self._score(provider) for provider in self.providers}
+        ranked = sorted(self.providers, key=scores.get)
+        if (
+            len(ranked) > 1
+            and scores[ranked[1]][0] == 0
+            and random.random() < self.config.AUTO_EXPLORE_RATE
+        ):
+            # 偶尔改用次优提供商，避免它的延迟统计过时
+            ranked[0], ranked[1] = ranked[1], ranked[0]
+            with self._lock:
+                self.explored += 1
+        with self._lock:
+            self.routed[ranked[0]] += 1
+        return ranked
+
+    def _hedge_delay(self, provider: str, stream: bool = False) -> Optional[float]:
+        """
+        获取对冲阈值
+
+        Args:
+            provider: 首选提供商
+            stream: 是否为流式请求，流式请求以收到第一个片段为准
+
+        Returns:
+            Optional[float]: 阈值（秒），不对冲时返回None
+        """
+        if not self.config.AUTO_HEDGE_ENABLED or len(self.providers) < 2:
+            return None
+        fixed = self.config.AUTO_STREAM_HEDGE_DELAY if stream else self.config.AUTO_HEDGE_DELAY
+        if fixed > 0:
+            return fixed
+        latency = self._latency(provider, first_chunk=stream)
+        if latency["samples"] < MIN_HEDGE_SAMPLES or latency["p95_ms"] is None:
+            return None
+        return latency["p95_ms"] / 1000
+
+    async def _race(
+        self,
+        ranked: List[str],
+        start: Callable[[str], Awaitable[Any]],
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+        stream: bool = False
+    ) -> Any:
+        """
+        向首选提供商发出请求，超过对冲阈值或失败时再向备选提供商发出请求
+
+        Args:
+            ranked: 排好序的提供商列表
+            start: 向指定提供商发出请求的函数
+            discard: 释放未被采用的成功结果的函数（如关闭多余的流）
+            stream: 是否为流式请求，决定使用哪个对冲阈值
+
+        Returns:
+            Any: 最先成功的结果
+
+        Raises:
+            Exception: 所有已尝试的提供商都失败时抛出最后一个异常
+        """
+        delay = self._hedge_delay(ranked[0], stream)
+        backups = iter(ranked[1:])
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch(provider: str) -> None:
+            pending[asyncio.ensure_future(start(provider))] = provider
+
+        launch(ranked[0])
+        hedged = False
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 首选提供商超过阈值仍未返回，向次优提供商发出对冲请求
+                    hedged = True
+                    backup = next(backups, None)
+                    if backup is not None:
+                        logger.info(f"{ranked[0]} 超过 {delay:.2f} 秒未返回，对冲请求 {backup}")
+                        with self._lock:
+                            self.hedged += 1
+                        launch(backup)
+                    continue
+
+                winner = None
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"自动路由: {provider} 调用失败: {str(last_error)}")
+                    elif winner is None:
+                        winner = (provider, task.result())
+                    elif discard is not None:
+                        await discard(task.result())
+                if winner is not None:
+                    if winner[0] != ranked[0]:
+                        with self._lock:
+                            self.backup_wins += 1
+                    return winner[1]
+
+                if not pending:
+                    # 已发出的请求都失败了，改用下一个提供商
+                    hedged = True
+                    backup = next(backups, None)
+                    if backup is not None:
+                        launch(backup)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                # 等待被取消的请求真正结束，熔断器的探测名额随之释放；
+                # 取消前已经成功的结果同样不会被采用，需要释放
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                if discard is not None:
+                    for result in results:
+                        if not isinstance(result, BaseException):
+                            await discard(result)
+
+        raise last_error if last_error is not None else RuntimeError("自动路由没有可用的提供商")
+
+    async def call_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> str:
+        """
+        调用当前最快的健康提供商
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Returns:
+            str: AI生成的响应文本
+
+        Raises:
+            Exception: 所有已尝试的提供商都失败时抛出
+        """
+        return await self._race(
+            self.rank(),
+            lambda provider: self._client(provider).call_api(prompt, messages, **kwargs)
+        )
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用当前最快的健康提供商
+
+        对冲以收到第一个片段为准，之后只读取胜出的流。
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+        """
+        async def open_stream(provider: str):
+            """打开流并读取第一个片段"""
+            stream = self._client(provider).stream_api(prompt, messages, **kwargs).__aiter__()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return stream, first
+
+        async def close_stream(result) -> None:
+            await result[0].aclose()
+
+        stream, first = await self._race(self.rank(), open_stream, discard=close_stream, stream=True)
+        try:
+            if first is None:
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 各提供商的路由次数和最近延迟，以及对冲次数和备选提供商胜出次数
+        """
+        with self._lock:
+            routed = dict(self.routed)
+            counters = {
+                "explored": self.explored,
+                "hedged": self.hedged,
+                "backup_wins": self.backup_wins,
+            }
+        return {
+            "providers": {
+                provider: {"routed": routed[provider], **self._latency(provider)}
+                for provider in self.providers
+            },
+            **counters,
+        }
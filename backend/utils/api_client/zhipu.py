@@ -5,31 +5,76 @@
 参考文档：https://bigmodel.cn/dev/api/normal-model/glm-4
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Union
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Union
 import zhipuai
-import json
 
 from backend.config import Config
 from backend.utils.api_client.base import BaseAPIClient, Message
+from backend.utils.api_client.http import build_sync_http_client
+from backend.utils.executor import BoundedExecutor
+from backend.utils.logger import log_prompt
+from backend.utils.metrics import record_usage, track_llm
+from backend.utils.stats import register_stats
 
 logger = logging.getLogger(__name__)
 
 class ZhipuAPIClient(BaseAPIClient):
-    """智谱AI API客户端实现类"""
+    """
+    智谱AI API客户端实现类
 
-    def __init__(self):
+    智谱SDK只提供同步接口，所有请求都放到进程内共享的有界线程池中执行，
+    避免长时间的生成请求阻塞事件循环。
+    """
+
+    # 进程内共享的线程池，首次创建客户端时初始化
+    _executor: Optional[BoundedExecutor] = None
+
+    def __init__(self, model: Optional[str] = None):
         """
         初始化智谱AI客户端
 
         从配置中获取API密钥和端点信息
+
+        Args:
+            model: 模型名称，不指定则使用配置中的ZHIPU_MODEL
         """
         self.config = Config.get_instance()
+        self.model = model or self.config.ZHIPU_MODEL
 
-        # 初始化智谱AI客户端
+        # 初始化智谱AI客户端，使用带连接池的HTTP客户端（可在线程池中共享）
         zhipuai.api_key = self.config.ZHIPU_API_KEY
-        self.client = zhipuai.ZhipuAI(api_key=self.config.ZHIPU_API_KEY)
-        logger.info(f"初始化智谱AI客户端成功，使用模型: {self.config.ZHIPU_MODEL}")
+        self.client = zhipuai.ZhipuAI(
+            api_key=self.config.ZHIPU_API_KEY,
+            base_url=self.config.ZHIPU_API_ENDPOINT,
+            http_client=build_sync_http_client(),
+            # 重试由 ResilientAPIClient 统一处理，关闭SDK自带的重试
+            max_retries=0
+        )
+        self.executor = self._get_executor(self.config.ZHIPU_MAX_WORKERS)
+        logger.info(f"初始化智谱AI客户端成功，使用模型: {self.model}")
+
+    async def aclose(self) -> None:
+        """关闭底层HTTP连接池"""
+        self.client.close()
+
+    @classmethod
+    def _get_executor(cls, max_workers: int) -> BoundedExecutor:
+        """
+        获取共享线程池，不存在时创建
+
+        Args:
+            max_workers: 最大并发请求数
+
+        Returns:
+            BoundedExecutor: 共享线程池
+        """
+        if cls._executor is None:
+            cls._executor = BoundedExecutor("zhipu", max_workers)
+            register_stats("zhipu_executor", cls._executor.stats)
+        return cls._executor
 
     def _convert_message(self, message: Message) -> Dict:
         """
@@ -57,6 +102,65 @@ class ZhipuAPIClient(BaseAPIClient):
             "content": content
         }
 
+    def _prepare_messages(
+        self,
+        prompt: Optional[str],
+        messages: Optional[List[Message]]
+    ) -> List[Dict]:
+        """
+        构建并转换请求消息列表
+
+        如果没有提供messages，则使用prompt创建默认消息
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+
+        Returns:
+            List[Dict]: 转换为智谱格式的消息列表
+
+        Raises:
+            ValueError: 当prompt和messages都未提供时
+        """
+        if messages is None:
+            if prompt is None:
+                raise ValueError("必须提供prompt或messages参数")
+            messages = [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+
+        # 转换消息格式，日志中只记录消息数和字符数
+        converted_messages = [self._convert_message(msg) for msg in messages]
+        log_prompt(logger, "智谱AI请求消息", converted_messages)
+        return converted_messages
+
+    def _request_params(self, messages: List[Dict], kwargs: Dict) -> Dict:
+        """
+        构建完成请求的参数
+
+        Args:
+            messages: 转换后的消息列表
+            kwargs: 调用方传入的其他参数
+
+        Returns:
+            Dict: 传给SDK的请求参数
+        """
+        return {
+            # SDK的响应模型会丢弃未定义的字段（如 usage.prompt_tokens_details），
+            # 这里直接返回JSON字典，以便统计提示词缓存命中的token数
+            "disable_strict_validation": True,
+            "model": self.model,
+            "messages": messages,
+            "temperature": kwargs.get('temperature', self.config.API_TEMPERATURE),
+            # 用温度取样的另一种方法，称为核取样 取值范围是： [0.0,1.0]
+            # 较小的 top_p：生成更保守、确定性强的文本
+            "top_p": kwargs.get('top_p', 0.7),
+            "max_tokens": kwargs.get('max_tokens', 3000),
+        }
+
     async def call_api(
         self,
         prompt: Optional[str] = None,
@@ -79,39 +183,100 @@ class ZhipuAPIClient(BaseAPIClient):
             Exception: 当API调用失败时
         """
         try:
-            # 如果没有提供messages，则使用prompt创建默认消息
-            if messages is None:
-                if prompt is None:
-                    raise ValueError("必须提供prompt或messages参数")
-                messages = [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-
-            # 转换消息格式
-            logger.info(f"原始消息列表: {json.dumps(messages, ensure_ascii=False, indent=2)}")
-            converted_messages = [self._convert_message(msg) for msg in messages]
-            logger.info(f"转换后的消息列表: {json.dumps(converted_messages, ensure_ascii=False, indent=2)}")
-
-            # 创建完成请求
-            response = self.client.chat.completions.create(
-                model=self.config.ZHIPU_MODEL,
-                messages=converted_messages,
-                temperature=kwargs.get('temperature', self.config.API_TEMPERATURE),
-                # 用温度取样的另一种方法，称为核取样 取值范围是： [0.0,1.0]
-                # 较小的 top_p：生成更保守、确定性强的文本
-                top_p=kwargs.get('top_p', 0.7),
-                max_tokens=kwargs.get('max_tokens', 3000),
-                stream=False  # 非流式返回
-            )
+            converted_messages = self._prepare_messages(prompt, messages)
+
+            # 在线程池中执行同步的完成请求
+            with track_llm("zhipu", self.model):
+                response = await self.executor.run(
+                    self.client.chat.completions.create,
+                    stream=False,  # 非流式返回
+                    **self._request_params(converted_messages, kwargs)
+                )
+            record_usage("zhipu", self.model, response.get("usage"))
 
             # 获取生成的内容
-            content = response.choices[0].message.content
+            content = response["choices"][0]["message"]["content"]
             logger.info(f"智谱AI API调用成功: 生成内容长度={len(content)}")
             return content
 
         except Exception as e:
             logger.error(f"智谱AI API调用出错: {str(e)}")
             raise
+
+    async def stream_api(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用智谱AI API
+
+        SDK的流式响应是同步迭代器，在线程池中逐块读取后通过队列交回事件循环。
+
+        Args:
+            prompt: 简单模式下的提示词
+            messages: 高级模式下的消息列表
+            **kwargs: 其他参数，如temperature、max_tokens等
+
+        Yields:
+            str: AI生成的文本片段
+
+        Raises:
+            ValueError: 当参数无效时
+            Exception: 当API调用失败时
+        """
+        try:
+            converted_messages = self._prepare_messages(prompt, messages)
+            params = self._request_params(converted_messages, kwargs)
+
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            stopped = threading.Event()
+            done = object()
+
+            def consume() -> None:
+                """在线程池中读取流式响应，把文本片段放入队列"""
+                response = self.client.chat.completions.create(stream=True, **params)
+                try:
+                    for chunk in response:
+                        if stopped.is_set():
+                            break
+                        # 最后一个片段中包含usage
+                        record_usage("zhipu", self.model, chunk.get("usage"))
+                        if not chunk.get("choices"):
+                            continue
+                        delta = chunk["choices"][0].get("delta", {}).get("content")
+                        if delta:
+                            loop.call_soon_threadsafe(queue.put_nowait, delta)
+                finally:
+                    response.response.close()
+
+            # 耗时统计到流结束为止
+            with track_llm("zhipu", self.model, mode="stream"):
+                task = asyncio.ensure_future(self.executor.run(consume))
+                task.add_done_callback(lambda _: queue.put_nowait(done))
+
+                drained = False
+                try:
+                    while True:
+                        item = await queue.get()
+                        if item is done:
+                            break
+                        yield item
+                    drained = True
+                    # 读取线程中的异常在这里抛出
+                    await task
+                finally:
+                    # 调用方提前退出时通知读取线程停止
+                    stopped.set()
+                    if not drained:
+                        # 等待读取线程退出，执行器的槽位随之释放；这里不取消任务，
+                        # 线程中的异常只记录日志，不会出现 "Task exception was never retrieved"
+                        await asyncio.wait({task})
+                        if not task.cancelled() and task.exception() is not None:
+                            logger.warning(f"智谱AI流式读取在调用方退出后出错: {str(task.exception())}")
+
+        except Exception as e:
+            logger.error(f"智谱AI API流式调用出错: {str(e)}")
+            raise
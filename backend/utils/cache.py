@@ -1,52 +1,499 @@
+"""
+缓存模块
+
+提供可插拔的缓存后端：
+- memory: 进程内LRU缓存，限制条目数和过期时间
+- sqlite: 基于SQLite WAL的磁盘缓存，所有worker进程共享
+- file: 每个键一个JSON文件的旧版磁盘缓存
+- tiered: 进程内LRU在前、SQLite在后的两级缓存（默认）
+
+后端通过 Config.CACHE_BACKEND 选择，每个进程只创建一个后端实例，
+并统计命中、未命中和淘汰次数。
+"""
+
+import asyncio
 import json
 import os
+import threading
 import time
-from typing import Optional, Any
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
 from ..config import Config
+from .metrics import (
+    CACHE_LOOKUP_SECONDS,
+    CACHE_REQUESTS,
+    SEMANTIC_CACHE_REQUESTS,
+    SEMANTIC_LOOKUP_SECONDS,
+    timed,
+)
+from .paths import CACHE_DIR
+from .semantic_cache import SemanticCacheIndex
+from .sqlite import ThreadLocalConnection
+from .stats import register_stats
 import logging
 
 logger = logging.getLogger(__name__)
-class Cache:
-    """缓存管理器"""
+
+class CacheBackend(ABC):
+    """
+    缓存后端基类
+
+    blocking 为 True 的后端会进行磁盘IO，异步接口会把操作放到线程中执行。
+    """
+
+    name: str = "base"
+    blocking: bool = False
 
     def __init__(self):
-        self.config = Config()
-        self.cache_dir = "cache"
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def _count(self, field: str, n: int = 1) -> None:
+        """线程安全地增加计数"""
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def _count_lookup(self, hit: bool, count: bool) -> None:
+        """记录一次查询的命中或未命中，count 为False时不计入"""
+        if count:
+            self._count("hits" if hit else "misses")
+
+    @abstractmethod
+    def get_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
+        """
+        获取缓存数据及其过期时间（时间戳），不存在或已过期时返回None
+
+        Args:
+            key: 缓存键
+            count: 是否计入命中率统计，语义缓存等内部查询传False
+        """
+        raise NotImplementedError("子类必须实现get_entry方法")
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """设置缓存数据"""
+        raise NotImplementedError("子类必须实现set方法")
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存数据，不存在或已过期时返回None"""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    async def aget_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
+        """异步获取缓存数据及其过期时间"""
+        if self.blocking:
+            return await asyncio.to_thread(self.get_entry, key, count)
+        return self.get_entry(key, count)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """异步获取缓存数据"""
+        entry = await self.aget_entry(key)
+        return entry[0] if entry is not None else None
+
+    async def apeek(self, key: str) -> Optional[Any]:
+        """异步获取缓存数据，不计入命中率统计"""
+        entry = await self.aget_entry(key, count=False)
+        return entry[0] if entry is not None else None
+
+    async def aset(self, key: str, value: Any) -> None:
+        """异步设置缓存数据"""
+        if self.blocking:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 包含命中、未命中、写入和淘汰次数
+        """
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    进程内LRU缓存
+
+    超过 max_entries 时淘汰最久未使用的条目，过期条目在读取时淘汰。
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, expire_time: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.expire_time = expire_time
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self._count_lookup(True, count)
+                    return value, expires_at
+                del self._data[key]
+                self._count("evictions")
+        self._count_lookup(False, count)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_until(key, value, time.time() + self.expire_time)
+
+    def set_until(self, key: str, value: Any, expires_at: float) -> None:
+        """
+        设置缓存数据，并指定过期时间
+
+        Args:
+            key: 缓存键
+            value: 缓存数据
+            expires_at: 过期时间戳
+        """
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        self._count("sets")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        result = super().stats()
+        result["size"] = len(self._data)
+        result["max_entries"] = self.max_entries
+        return result
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite磁盘缓存
+
+    使用WAL模式，多个worker进程共享同一个数据库文件。
+    每写入 PURGE_INTERVAL 次清理一次过期条目，并把条目数限制在 max_entries 以内。
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    PURGE_INTERVAL = 100
+
+    def __init__(self, path: str, max_entries: int, expire_time: int):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.expire_time = expire_time
+        self._db = ThreadLocalConnection(path)
+        self._db.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        self._db.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_created_at ON cache(created_at)")
+
+    def get_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
+        try:
+            row = self._db.conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                if row[1] > time.time():
+                    self._count_lookup(True, count)
+                    return json.loads(row[0]), row[1]
+                self._db.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._count("evictions")
+        except Exception as e:
+            logger.error(f"读取SQLite缓存失败: {str(e)}")
+        self._count_lookup(False, count)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        self._db.conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now, now + self.expire_time)
+        )
+        self._count("sets")
+        if self.sets % self.PURGE_INTERVAL == 0:
+            self.purge()
+
+    def purge(self) -> int:
+        """
+        清理过期条目，并淘汰超出容量的最旧条目
+
+        Returns:
+            int: 淘汰的条目数
+        """
+        conn = self._db.conn
+        evicted = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            evicted += conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY created_at LIMIT ?)",
+                (overflow,)
+            ).rowcount
+        if evicted:
+            self._count("evictions", evicted)
+        return evicted
+
+class FileCacheBackend(CacheBackend):
+    """
+    JSON文件缓存（旧版实现）
+
+    每个键对应一个JSON文件，过期条目在读取时删除。
+    """
+
+    name = "file"
+    blocking = True
+
+    def __init__(self, cache_dir: str, expire_time: int):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.expire_time = expire_time
         os.makedirs(self.cache_dir, exist_ok=True)
 
     def _get_cache_path(self, key: str) -> str:
         """获取缓存文件路径"""
         return os.path.join(self.cache_dir, f"{key}.json")
 
-    def get(self, key: str) -> Optional[Any]:
-        """获取缓存数据"""
-        if not self.config.CACHE_ENABLED:
-            return None
-
+    def get_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
         cache_path = self._get_cache_path(key)
-        if not os.path.exists(cache_path):
-            return None
-
         try:
             with open(cache_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                if time.time() - data['timestamp'] > self.config.CACHE_EXPIRE_TIME:
-                    os.remove(cache_path)
-                    return None
-                return data['value']
+            expires_at = data['timestamp'] + self.expire_time
+            if time.time() > expires_at:
+                os.remove(cache_path)
+                self._count("evictions")
+            else:
+                self._count_lookup(True, count)
+                return data['value'], expires_at
         except Exception:
+            pass
+        self._count_lookup(False, count)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        data = {
+            'timestamp': time.time(),
+            'value': value
+        }
+        with open(self._get_cache_path(key), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        self._count("sets")
+
+class TieredCacheBackend(CacheBackend):
+    """
+    两级缓存
+
+    先查进程内LRU，未命中再查共享的磁盘缓存，磁盘命中后回填到内存。
+    回填的条目沿用磁盘条目剩余的过期时间，不会比原来的过期时间存活更久。
+    写入时同时写两级。
+    """
+
+    name = "tiered"
+    blocking = True
+
+    def __init__(self, memory: MemoryCacheBackend, disk: CacheBackend):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def get_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
+        entry = self.memory.get_entry(key, count)
+        if entry is None:
+            entry = self.disk.get_entry(key, count)
+            if entry is not None:
+                self.memory.set_until(key, *entry)
+        self._count_lookup(entry is not None, count)
+        return entry
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+        self._count("sets")
+
+    async def aget_entry(self, key: str, count: bool = True) -> Optional[Tuple[Any, float]]:
+        # 内存命中时直接返回，不进入线程池
+        entry = self.memory.get_entry(key, count)
+        if entry is None:
+            entry = await self.disk.aget_entry(key, count)
+            if entry is not None:
+                self.memory.set_until(key, *entry)
+        self._count_lookup(entry is not None, count)
+        return entry
+
+    async def aset(self, key: str, value: Any) -> None:
+        await self.memory.aset(key, value)
+        await self.disk.aset(key, value)
+        self._count("sets")
+
+    def stats(self) -> Dict[str, Any]:
+        result = super().stats()
+        result["memory"] = self.memory.stats()
+        result["disk"] = self.disk.stats()
+        return result
+
+def create_backend(config: Config) -> CacheBackend:
+    """
+    根据配置创建缓存后端
+
+    Args:
+        config: 配置对象
+
+    Returns:
+        CacheBackend: 缓存后端实例
+
+    Raises:
+        ValueError: 当配置的后端类型不支持时
+    """
+    backend_type = config.CACHE_BACKEND
+    expire_time = config.CACHE_EXPIRE_TIME
+    db_path = config.CACHE_DB_PATH or os.path.join(CACHE_DIR, "cache.db")
+
+    if backend_type == "memory":
+        return MemoryCacheBackend(config.CACHE_MEMORY_MAX_ENTRIES, expire_time)
+    if backend_type == "sqlite":
+        return SQLiteCacheBackend(db_path, config.CACHE_DISK_MAX_ENTRIES, expire_time)
+    if backend_type == "file":
+        return FileCacheBackend(CACHE_DIR, expire_time)
+    if backend_type == "tiered":
+        return TieredCacheBackend(
+            MemoryCacheBackend(config.CACHE_MEMORY_MAX_ENTRIES, expire_time),
+            SQLiteCacheBackend(db_path, config.CACHE_DISK_MAX_ENTRIES, expire_time)
+        )
+    raise ValueError(f"不支持的缓存后端: {backend_type}")
+
+class Cache:
+    """
+    缓存管理器
+
+    所有实例共享同一个进程内的缓存后端。CACHE_ENABLED为False时不创建后端
+    （不会创建或打开缓存数据库），读取总是返回None，写入不做任何操作。
+    """
+
+    _backend: Optional[CacheBackend] = None
+    _semantic: Optional[SemanticCacheIndex] = None
+
+    def __init__(self):
+        self.config = Config()
+        self.backend = self._get_backend(self.config) if self.config.CACHE_ENABLED else None
+        self.semantic = self._get_semantic_index(self.config)
+
+    @classmethod
+    def _get_backend(cls, config: Config) -> CacheBackend:
+        """获取共享的缓存后端，不存在时创建"""
+        if cls._backend is None:
+            cls._backend = create_backend(config)
+            register_stats("cache", cls._backend.stats)
+            logger.info(f"初始化缓存后端: {cls._backend.name}")
+        return cls._backend
+
+    @classmethod
+    def _get_semantic_index(cls, config: Config) -> Optional[SemanticCacheIndex]:
+        """获取共享的语义近似索引，未开启时返回None"""
+        if not (config.CACHE_ENABLED and config.SEMANTIC_CACHE_ENABLED):
+            return None
+        if cls._semantic is None:
+            cls._semantic = SemanticCacheIndex(
+                config.SEMANTIC_CACHE_DB_PATH or os.path.join(CACHE_DIR, "semantic.db"),
+                threshold=config.SEMANTIC_CACHE_THRESHOLD,
+                ngram=config.SEMANTIC_CACHE_NGRAM,
+                max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
+                expire_time=config.CACHE_EXPIRE_TIME
+            )
+            register_stats("semantic_cache", cls._semantic.stats)
+            logger.info(f"启用语义近似缓存: 阈值={config.SEMANTIC_CACHE_THRESHOLD}")
+        return cls._semantic
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存数据"""
+        if not self.config.CACHE_ENABLED:
             return None
+        with timed(CACHE_LOOKUP_SECONDS, "cache"):
+            value = self.backend.get(key)
+        CACHE_REQUESTS.labels(result="miss" if value is None else "hit").inc()
+        return value
 
     def set(self, key: str, value: Any) -> None:
         """设置缓存数据"""
         if not self.config.CACHE_ENABLED:
             return
+        self.backend.set(key, value)
 
-        cache_path = self._get_cache_path(key)
-        data = {
-            'timestamp': time.time(),
-            'value': value
-        }
+    async def aget(self, key: str) -> Optional[Any]:
+        """异步获取缓存数据，磁盘读取不会阻塞事件循环"""
+        if not self.config.CACHE_ENABLED:
+            return None
+        with timed(CACHE_LOOKUP_SECONDS, "cache"):
+            value = await self.backend.aget(key)
+        CACHE_REQUESTS.labels(result="miss" if value is None else "hit").inc()
+        return value
+
+    async def aset(self, key: str, value: Any) -> None:
+        """异步设置缓存数据，磁盘写入不会阻塞事件循环"""
+        if not self.config.CACHE_ENABLED:
+            return
+        await self.backend.aset(key, value)
+
+    async def aget_similar(self, scope: str, text: str) -> Optional[Any]:
+        """
+        查找与输入近似的请求的缓存数据
+
+        命中与否单独计入语义缓存的统计，不影响精确缓存的命中率。
+
+        Args:
+            scope: 匹配范围，只在同一范围内匹配
+            text: 原始输入文本
 
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        Returns:
+            Optional[Any]: 近似请求的缓存数据，未开启语义缓存或未命中时返回None
+        """
+        if self.semantic is None:
+            return None
+        with timed(SEMANTIC_LOOKUP_SECONDS, "cache"):
+            key = await asyncio.to_thread(self.semantic.lookup, scope, text)
+            # 按近似键读取精确缓存不计入精确缓存的命中率
+            value = await self.backend.apeek(key) if key else None
+        SEMANTIC_CACHE_REQUESTS.labels(result="miss" if value is None else "hit").inc()
+        return value
+
+    async def aadd_similar(self, scope: str, text: str, key: str) -> None:
+        """
+        把输入加入语义近似索引
+
+        索引只是加速手段，写入失败（如数据库被锁）时只记录日志，不影响已生成的结果。
+
+        Args:
+            scope: 匹配范围
+            text: 原始输入文本
+            key: 对应的精确缓存键
+        """
+        if self.semantic is None:
+            return
+        try:
+            await asyncio.to_thread(self.semantic.add, scope, text, key)
+        except Exception as e:
+            logger.error(f"写入语义缓存索引失败: {str(e)}")
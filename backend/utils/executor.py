@@ -0,0 +1,137 @@
+"""
+有界线程池模块
+
+用于把同步阻塞的调用（如同步SDK、磁盘IO）转移到线程池中执行，
+避免阻塞事件循环，并统计排队和执行中的任务数量。
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class BoundedExecutor:
+    """
+    有界线程池
+
+    最多同时运行 max_workers 个任务，超出的任务在线程池内部排队。
+
+    属性：
+        name: 线程池名称，用于线程命名和日志
+        max_workers: 最大并发线程数
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        初始化线程池
+
+        Args:
+            name: 线程池名称
+            max_workers: 最大并发线程数，必须大于0
+        """
+        if max_workers <= 0:
+            raise ValueError(f"max_workers必须大于0: {max_workers}")
+
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name
+        )
+
+        # 统计数据，可能在多个线程中更新，需要加锁
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait_time = 0.0
+        self._total_run_time = 0.0
+
+        logger.info(f"初始化线程池: {name}, max_workers={max_workers}")
+
+    def _wrap(self, fn: Callable[..., T], submitted_at: float) -> Callable[[], T]:
+        """包装任务函数，在线程中记录排队和执行时间"""
+        def runner() -> T:
+            started_at = time.perf_counter()
+            with self._lock:
+                self._waiting -= 1
+                self._in_flight += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+                self._total_wait_time += started_at - submitted_at
+
+            failed = False
+            try:
+                return fn()
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._total_run_time += time.perf_counter() - started_at
+                    if failed:
+                        self._failed += 1
+                    else:
+                        self._completed += 1
+
+        return runner
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        在线程池中执行同步函数并等待结果
+
+        与 asyncio.to_thread 一样，函数在调用方的contextvars上下文中执行。
+
+        Args:
+            fn: 要执行的同步函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            T: 函数的返回值
+        """
+        with self._lock:
+            self._waiting += 1
+        loop = asyncio.get_running_loop()
+        task = self._wrap(functools.partial(fn, *args, **kwargs), time.perf_counter())
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, task)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取线程池统计信息
+
+        Returns:
+            Dict[str, Any]: 包含排队数、执行中任务数、完成数等信息
+        """
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "waiting": self._waiting,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_seconds": round(self._total_wait_time / finished, 4) if finished else 0.0,
+                "avg_run_seconds": round(self._total_run_time / finished, 4) if finished else 0.0,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        关闭线程池
+
+        Args:
+            wait: 是否等待正在执行的任务完成
+        """
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,129 @@
+"""
+模型延迟统计模块
+
+按提供商和模型记录最近若干次AI接口调用的耗时和成败，输出滚动窗口内的
+p50/p95延迟和错误率，用于比较各模型的速度并据此选择模型。
+
+Prometheus的直方图适合长期监控，但进程内无法直接读取最近一段时间的分位数，
+所以这里另外保留一个固定长度的样本窗口。流式调用的总耗时取决于输出长度，
+不能反映模型速度，不计入普通调用的窗口，而是单独统计收到第一个片段的耗时。
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .stats import register_stats
+
+# 每个模型保留的最近样本数
+DEFAULT_WINDOW = 200
+
+def _percentile(ordered: list, p: float) -> float:
+    """计算已排序样本的百分位数（最近秩法）"""
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class ModelLatency:
+    """
+    单个模型的滚动延迟窗口
+
+    属性：
+        provider: 提供商类型
+        model: 模型名称
+    """
+
+    _trackers: Dict[Tuple[str, str], "ModelLatency"] = {}
+    # 流式调用收到第一个片段的耗时，与普通调用的窗口分开
+    _first_chunk_trackers: Dict[Tuple[str, str], "ModelLatency"] = {}
+
+    def __init__(self, provider: str, model: str, window: int = DEFAULT_WINDOW):
+        self.provider = provider
+        self.model = model
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.last_at: Optional[float] = None
+
+    @classmethod
+    def get(cls, provider: str, model: str, first_chunk: bool = False) -> "ModelLatency":
+        """
+        获取模型的延迟窗口，不存在时创建
+
+        Args:
+            provider: 提供商类型
+            model: 模型名称
+            first_chunk: 为True时获取流式调用首个片段耗时的窗口
+
+        Returns:
+            ModelLatency: 延迟窗口
+        """
+        trackers = cls._first_chunk_trackers if first_chunk else cls._trackers
+        key = (provider, model)
+        tracker = trackers.get(key)
+        if tracker is None:
+            tracker = trackers.setdefault(key, cls(provider, model))
+        return tracker
+
+    def record(self, seconds: float, ok: bool) -> None:
+        """
+        记录一次调用
+
+        Args:
+            seconds: 调用耗时（秒）
+            ok: 调用是否成功
+        """
+        with self._lock:
+            self._samples.append((seconds, ok))
+            self.total += 1
+            self.last_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取窗口内的延迟和错误率
+
+        Returns:
+            Dict[str, Any]: 样本数、成功调用的p50/p95延迟（毫秒）和错误率
+        """
+        with self._lock:
+            samples = list(self._samples)
+            total = self.total
+        latencies = sorted(seconds for seconds, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "samples": len(samples),
+            "total": total,
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 1) if latencies else None,
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 1) if latencies else None,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Any]:
+        """
+        获取所有模型的延迟统计
+
+        Returns:
+            Dict[str, Any]: 以 "提供商:模型" 为键的统计字典
+        """
+        return {
+            f"{provider}:{model}": tracker.snapshot()
+            for (provider, model), tracker in list(cls._trackers.items())
+        }
+
+    @classmethod
+    def first_chunk_stats(cls) -> Dict[str, Any]:
+        """
+        获取所有模型流式调用首个片段的延迟统计
+
+        Returns:
+            Dict[str, Any]: 以 "提供商:模型" 为键的统计字典
+        """
+        return {
+            f"{provider}:{model}": tracker.snapshot()
+            for (provider, model), tracker in list(cls._first_chunk_trackers.items())
+        }
+
+register_stats("models", ModelLatency.all_stats)
+register_stats("models_first_chunk", ModelLatency.first_chunk_stats)
@@ -1,34 +1,65 @@
-import os
+"""
+日志配置模块
+
+日志写入不在业务线程中进行：
+- 根日志记录器只挂一个 QueueHandler，调用方只把日志记录放入队列
+- 后台 QueueListener 线程负责格式化并写入控制台和文件
+- 提示词等大段内容默认只记录消息数和字符数，开启DEBUG时才计算哈希，并按采样率记录完整内容
+"""
+
+import atexit
+import hashlib
+import json
 import logging
+import os
+import queue
+import random
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from utils.paths import LOG_DIR
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, List, Optional
+
+from ..config import Config
+from .paths import LOG_DIR, ensure_dir
 
-def setup_logging() -> logging.Logger:
+# 后台写日志的监听线程，setup_logging 时创建
+_listener: Optional[QueueListener] = None
+
+class LazyQueueHandler(QueueHandler):
+    """
+    只入队、不格式化的队列处理器
+
+    默认的 QueueHandler 会在调用线程中格式化消息，这里把格式化也推迟到后台线程，
+    调用方的开销只剩一次入队。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def setup_logging(level: int = logging.INFO) -> logging.Logger:
     """
     设置日志配置
 
+    控制台和按天命名的滚动日志文件都由后台线程写入。重复调用时会先停止之前的监听线程。
+
+    Args:
+        level: 日志级别
+
     Returns:
-        logging.Logger: 配置好的日志记录器
+        logging.Logger: 配置好的根日志记录器
     """
-    # 获取根日志记录器
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-
-    # 清除现有的处理器
-    logger.handlers.clear()
+    global _listener
+    stop_logging()
 
     # 创建控制台处理器
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
+    console_handler.setLevel(level)
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(name)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
+    ))
 
     # 创建文件处理器
+    ensure_dir(LOG_DIR)
     today = datetime.now().strftime('%Y%m%d')
     file_handler = RotatingFileHandler(
         filename=os.path.join(LOG_DIR, f'{today}.log'),
@@ -36,12 +67,79 @@ def setup_logging() -> logging.Logger:
         backupCount=5,
         encoding='utf-8'
     )
-    file_handler.setLevel(logging.INFO)
-    file_format = logging.Formatter(
+    file_handler.setLevel(level)
+    file_handler.setFormatter(logging.Formatter(
         '%(asctime)s - %(levelname)s - [%(name)s:%(funcName)s:%(lineno)d] - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+    ))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+
+    # 根日志记录器只挂队列处理器
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    logger.handlers.clear()
+    logger.addHandler(LazyQueueHandler(log_queue))
 
     return logger
+
+def stop_logging() -> None:
+    """
+    停止后台写日志线程，写完队列中剩余的日志
+
+    之后的日志改为直接由原来的处理器同步写入，进程退出阶段的日志不会丢失。
+    """
+    global _listener
+    if _listener is None:
+        return
+
+    listener, _listener = _listener, None
+    listener.stop()
+
+    logger = logging.getLogger()
+    for handler in list(logger.handlers):
+        if isinstance(handler, LazyQueueHandler):
+            logger.removeHandler(handler)
+    for handler in listener.handlers:
+        logger.addHandler(handler)
+
+atexit.register(stop_logging)
+
+def _content_chars(messages: List[Any]) -> int:
+    """统计消息内容的字符数，不序列化消息"""
+    total = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else message
+        if isinstance(content, str):
+            total += len(content)
+        elif isinstance(content, list):
+            total += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+    return total
+
+def log_prompt(logger: logging.Logger, label: str, messages: List[Any]) -> None:
+    """
+    记录发送给AI接口的消息
+
+    INFO级别只记录消息数和内容字符数，不序列化也不计算哈希；DEBUG级别下另外记录内容哈希，
+    并按 LOG_PAYLOAD_SAMPLE_RATE 采样记录完整内容，避免每次请求都把几KB的系统提示词写入日志。
+
+    Args:
+        logger: 日志记录器
+        label: 日志前缀
+        messages: 消息列表
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    chars = _content_chars(messages)
+    if not logger.isEnabledFor(logging.DEBUG):
+        logger.info("%s: 消息数=%d, 字符数=%d", label, len(messages), chars)
+        return
+
+    payload = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha256(payload.encode()).hexdigest()[:12]
+    logger.info("%s: hash=%s, 消息数=%d, 字符数=%d", label, digest, len(messages), chars)
+    if random.random() < Config.get_instance().LOG_PAYLOAD_SAMPLE_RATE:
+        logger.debug("%s完整内容(hash=%s): %s", label, digest, payload)
@@ -0,0 +1,341 @@
+"""
+Prometheus指标模块
+
+定义应用的各项指标，并提供 /metrics 端点使用的导出函数。
+
+多个uvicorn worker进程部署时，启动前设置环境变量 PROMETHEUS_MULTIPROC_DIR
+指向一个空目录，各进程的指标写入该目录，/metrics 汇总所有进程的数据。
+每次部署启动前需要清空该目录。
+
+prometheus_client 在导入时根据 PROMETHEUS_MULTIPROC_DIR 决定指标写入内存还是该目录，
+因此这个变量必须在导入本模块之前设置（backend.main 在导入本地模块之前加载 .env）。
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+    values,
+)
+
+from .latency import ModelLatency
+
+# 本地操作（缓存、提示词、文件）的耗时分桶（秒）
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# AI接口和HTTP请求的耗时分桶（秒）
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "blog_http_request_duration_seconds",
+    "HTTP请求耗时",
+    ["method", "route", "status"],
+    buckets=SLOW_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "blog_http_requests_in_flight",
+    "正在处理的HTTP请求数",
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "blog_admission_in_flight",
+    "已准入、正在处理的生成请求数",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "blog_admission_queue_depth",
+    "等待准入的生成请求数",
+    multiprocess_mode="livesum",
+)
+ADMISSION_REQUESTS = Counter(
+    "blog_admission_requests_total",
+    "生成请求的准入结果：admitted 或 shed_<原因>（queue_full、timeout、global_full）",
+    ["result"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "blog_admission_wait_duration_seconds",
+    "已准入请求在队列中的等待时间",
+    buckets=FAST_BUCKETS + (5.0, 10.0, 30.0),
+)
+
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "blog_rate_limit_wait_duration_seconds",
+    "AI接口调用等待限流配额的时间",
+    ["provider"],
+    buckets=FAST_BUCKETS + (5.0, 10.0, 30.0, 60.0),
+)
+RATE_LIMIT_ADMITTED = Counter(
+    "blog_rate_limit_admitted_total",
+    "通过限流放行的AI接口调用数",
+    ["provider"],
+)
+RATE_LIMIT_TOKENS = Counter(
+    "blog_rate_limit_tokens_total",
+    "限流扣除的token数（请求前预估的输入token和请求完成后补扣的输出token）",
+    ["provider"],
+)
+
+CACHE_LOOKUP_SECONDS = Histogram(
+    "blog_cache_lookup_duration_seconds",
+    "缓存查询耗时",
+    buckets=FAST_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "blog_cache_requests_total",
+    "缓存查询次数",
+    ["result"],
+)
+
+SEMANTIC_LOOKUP_SECONDS = Histogram(
+    "blog_semantic_cache_lookup_duration_seconds",
+    "语义近似缓存查询耗时",
+    buckets=FAST_BUCKETS,
+)
+SEMANTIC_CACHE_REQUESTS = Counter(
+    "blog_semantic_cache_requests_total",
+    "语义近似缓存查询次数（只在精确缓存未命中时查询）",
+    ["result"],
+)
+
+PROMPT_BUILD_SECONDS = Histogram(
+    "blog_prompt_build_duration_seconds",
+    "提示词构建耗时",
+    buckets=FAST_BUCKETS,
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "blog_llm_request_duration_seconds",
+    "AI接口调用耗时（每次尝试单独计算）",
+    ["provider", "model", "mode"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_IN_FLIGHT = Gauge(
+    "blog_llm_requests_in_flight",
+    "正在进行的AI接口调用数",
+    ["provider"],
+    multiprocess_mode="livesum",
+)
+LLM_TOKENS = Counter(
+    "blog_llm_tokens_total",
+    "AI接口返回的usage中的token数，输入token分为命中提供商提示词缓存（input_cached）和未命中（input_uncached）两部分",
+    ["provider", "model", "direction"],
+)
+
+PERSIST_SECONDS = Histogram(
+    "blog_persist_duration_seconds",
+    "文章保存耗时",
+    buckets=FAST_BUCKETS,
+)
+
+ERRORS = Counter(
+    "blog_errors_total",
+    "各阶段的错误数",
+    ["stage", "type"],
+)
+
+def record_error(stage: str, exc: BaseException) -> None:
+    """
+    按阶段和异常类型记录一次错误
+
+    Args:
+        stage: 出错的阶段，如 llm、cache、persist、http
+        exc: 异常
+    """
+    ERRORS.labels(stage=stage, type=type(exc).__name__).inc()
+
+@contextmanager
+def timed(histogram: Histogram, stage: str) -> Iterator[None]:
+    """
+    统计代码块耗时，出错时记录错误
+
+    Args:
+        histogram: 耗时直方图
+        stage: 出错时记录的阶段名称
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        record_error(stage, e)
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+@contextmanager
+def track_llm(provider: str, model: str, mode: str = "call") -> Iterator[None]:
+    """
+    统计一次AI接口调用的耗时、并发数和错误
+
+    普通调用的耗时和成败同时计入模型的滚动延迟窗口（/stats 的 models）。
+
+    Args:
+        provider: 提供商类型
+        model: 模型名称
+        mode: call（普通调用）或 stream（流式调用，耗时到流结束为止）
+    """
+    in_flight = LLM_IN_FLIGHT.labels(provider=provider)
+    in_flight.inc()
+    start = time.perf_counter()
+    # 被取消的调用（如客户端断开）既不算成功也不算失败，不计入延迟窗口
+    ok: Optional[bool] = None
+    try:
+        yield
+        ok = True
+    except Exception as e:
+        ok = False
+        record_error("llm", e)
+        raise
+    finally:
+        in_flight.dec()
+        elapsed = time.perf_counter() - start
+        LLM_REQUEST_SECONDS.labels(provider=provider, model=model, mode=mode).observe(elapsed)
+        if mode == "call" and ok is not None:
+            ModelLatency.get(provider, model).record(elapsed, ok)
+
+def _field(obj: Any, name: str) -> Any:
+    """读取对象属性或字典字段"""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    读取usage中命中提供商提示词缓存的输入token数
+
+    OpenAI兼容接口和智谱都放在 usage.prompt_tokens_details.cached_tokens 中。
+
+    Args:
+        usage: 响应中的usage对象或字典
+
+    Returns:
+        int: 命中缓存的token数，不支持时为0
+    """
+    return _field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0
+
+class UsageTotals:
+    """
+    一次文章生成的耗时和token用量
+
+    由 usage_scope() 创建，作用域内的AI接口调用通过 record_usage 累加用量。
+
+    属性：
+        provider: 实际调用的提供商，没有调用AI接口（命中缓存）时为None
+        model: 实际调用的模型
+        prompt_tokens: 输入token数
+        completion_tokens: 输出token数
+        seconds: 作用域的耗时（秒），作用域结束前为None
+    """
+
+    def __init__(self):
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds: Optional[float] = None
+        # 智谱的流式响应在线程池中读取，用量可能从其他线程累加
+        self._lock = threading.Lock()
+
+    def add(self, provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """累加一次调用的用量"""
+        with self._lock:
+            self.provider = provider
+            self.model = model
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+# 当前作用域的用量累加器，由 usage_scope() 设置
+_usage_totals: ContextVar[Optional[UsageTotals]] = ContextVar("usage_totals", default=None)
+
+@contextmanager
+def usage_scope() -> Iterator[UsageTotals]:
+    """
+    统计代码块内AI接口调用的token用量和代码块的耗时
+
+    用量通过contextvars传递，在作用域内创建的任务和线程池调用中同样生效。
+
+    Yields:
+        UsageTotals: 用量累加器，代码块结束后 seconds 为总耗时
+    """
+    totals = UsageTotals()
+    token = _usage_totals.set(totals)
+    start = time.perf_counter()
+    try:
+        yield totals
+    finally:
+        totals.seconds = time.perf_counter() - start
+        try:
+            _usage_totals.reset(token)
+        except ValueError:
+            # 流式响应的生成器可能在其他上下文中被关闭，此时无需恢复
+            pass
+
+def record_usage(provider: str, model: str, usage: Any) -> None:
+    """
+    记录AI接口返回的token用量
+
+    Args:
+        provider: 提供商类型
+        model: 模型名称
+        usage: 响应中的usage对象或字典，为None时不记录
+    """
+    if usage is None:
+        return
+    prompt_tokens = _field(usage, "prompt_tokens") or 0
+    completion_tokens = _field(usage, "completion_tokens") or 0
+    cached_tokens = min(cached_prompt_tokens(usage), prompt_tokens)
+    if cached_tokens:
+        LLM_TOKENS.labels(provider=provider, model=model, direction="input_cached").inc(cached_tokens)
+    if prompt_tokens - cached_tokens:
+        LLM_TOKENS.labels(provider=provider, model=model, direction="input_uncached").inc(
+            prompt_tokens - cached_tokens
+        )
+    if completion_tokens:
+        LLM_TOKENS.labels(provider=provider, model=model, direction="output").inc(completion_tokens)
+
+    totals = _usage_totals.get()
+    if totals is not None:
+        totals.add(provider, model, prompt_tokens, completion_tokens)
+
+def multiprocess_enabled() -> bool:
+    """
+    指标是否写入 PROMETHEUS_MULTIPROC_DIR
+
+    以导入 prometheus_client 时的选择为准，之后才设置的环境变量不会生效。
+
+    Returns:
+        bool: 多进程模式返回True
+    """
+    return values.ValueClass is not values.MutexValue
+
+def export_metrics() -> Tuple[bytes, str]:
+    """
+    导出Prometheus文本格式的指标
+
+    多进程模式下汇总所有worker进程的指标，否则只导出当前进程。
+
+    Returns:
+        Tuple[bytes, str]: (指标内容, Content-Type)
+    """
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead() -> None:
+    """worker进程退出时清理其实时指标（如并发数），只在多进程模式下生效"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
@@ -2,6 +2,9 @@
 路径管理模块
 
 提供项目中所需的各种路径常量和工具函数。
+
+导入时不创建任何目录：日志目录在 setup_logging 时创建，输出目录在应用启动和写文章时创建，
+SQLite数据库所在的目录在打开连接时创建。
 """
 
 import os
@@ -19,6 +22,9 @@ OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
 # 缓存路径
 CACHE_DIR = os.path.join(ROOT_DIR, 'cache')
 
+# 提示词模板路径
+PROMPT_DIR = os.path.join(ROOT_DIR, 'backend', 'prompts')
+
 def ensure_dir(dir_path: str) -> None:
     """
     确保目录存在，如果不存在则创建
@@ -27,8 +33,3 @@ def ensure_dir(dir_path: str) -> None:
         dir_path: 目录路径
     """
     os.makedirs(dir_path, exist_ok=True)
-
-# 确保必要的目录存在
-ensure_dir(LOG_DIR)
-ensure_dir(OUTPUT_DIR)
-ensure_dir(CACHE_DIR)
@@ -0,0 +1,241 @@
+"""
+语义近似缓存模块
+
+精确缓存按原始输入的哈希查找，多一个空格或换一个标点就会未命中。
+这里在精确缓存之外增加一层近似匹配：
+- 先对输入做规范化（全角转半角、统一大小写、合并空白）
+- 用字符n-gram的MinHash签名估计两段输入的Jaccard相似度
+- 用LSH分桶只比较可能相似的候选，索引增长到十万条以上时查询仍然只需几次索引查找
+
+索引保存在SQLite中，所有worker进程共享。索引只记录输入与精确缓存键的对应关系，
+文章内容仍然从精确缓存读取，过期和淘汰规则保持不变。
+"""
+
+import hashlib
+import logging
+import random
+import re
+import struct
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from .sqlite import ThreadLocalConnection
+
+logger = logging.getLogger(__name__)
+
+# MinHash签名长度和LSH分桶参数：16个band，每个band 4行
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# 每个置换使用一个固定的64位掩码，所有进程生成的签名一致
+_MASKS = [random.Random(20240101 + i).getrandbits(64) for i in range(NUM_PERM)]
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}Q")
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """
+    规范化输入文本
+
+    全角字符转半角（NFKC），转为小写，连续空白合并为一个空格并去掉首尾空白。
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _WHITESPACE.sub(" ", text).strip()
+
+def _shingles(text: str, ngram: int) -> List[int]:
+    """把文本切分为字符n-gram，并转为64位哈希值"""
+    # 标点和空白不参与相似度计算
+    chars = "".join(ch for ch in text if ch.isalnum())
+    if len(chars) <= ngram:
+        grams = {chars}
+    else:
+        grams = {chars[i:i + ngram] for i in range(len(chars) - ngram + 1)}
+    return [
+        int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "little")
+        for gram in grams
+    ]
+
+def minhash(text: str, ngram: int) -> Tuple[int, ...]:
+    """
+    计算文本的MinHash签名
+
+    Args:
+        text: 规范化后的文本
+        ngram: n-gram的字符数
+
+    Returns:
+        Tuple[int, ...]: 长度为 NUM_PERM 的签名
+    """
+    hashes = _shingles(text, ngram)
+    return tuple(min(h ^ mask for h in hashes) for mask in _MASKS)
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """用两个签名中相同位置相等的比例估计Jaccard相似度"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+def _band_buckets(scope: str, signature: Tuple[int, ...]) -> List[int]:
+    """计算签名在每个band中的桶编号（有符号64位整数，可直接存入SQLite）"""
+    buckets = []
+    for band in range(BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(
+            f"{scope}:{band}:{values}".encode(), digest_size=8
+        ).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+class SemanticCacheIndex:
+    """
+    基于SQLite的MinHash/LSH索引
+
+    属性：
+        threshold: 判定为近似重复的最低相似度
+        ngram: n-gram的字符数
+        max_entries: 索引的最大条目数
+        expire_time: 条目的保留时间（秒）
+    """
+
+    # 每次查询最多比较的候选数，避免大量重复输入时查询变慢
+    MAX_CANDIDATES = 200
+
+    def __init__(self, path: str, threshold: float, ngram: int, max_entries: int, expire_time: int):
+        self.threshold = threshold
+        self.ngram = ngram
+        self.max_entries = max_entries
+        self.expire_time = expire_time
+        self._db = ThreadLocalConnection(path)
+        conn = self._db.conn
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_entries ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "scope TEXT NOT NULL, "
+            "cache_key TEXT NOT NULL, "
+            "signature BLOB NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_buckets ("
+            "bucket INTEGER NOT NULL, "
+            "entry_id INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_bucket ON semantic_buckets(bucket)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_entry ON semantic_buckets(entry_id)")
+
+        self._lock = threading.Lock()
+        self._adds = 0
+        self.lookups = 0
+        self.hits = 0
+        self.candidates = 0
+
+    def lookup(self, scope: str, text: str) -> Optional[str]:
+        """
+        查找与输入近似的已缓存请求
+
+        Args:
+            scope: 匹配范围（如提示词模板和模型），只在同一范围内匹配
+            text: 原始输入文本
+
+        Returns:
+            Optional[str]: 最相似且超过阈值的请求对应的精确缓存键，没有时返回None
+        """
+        signature = minhash(normalize_text(text), self.ngram)
+        buckets = _band_buckets(scope, signature)
+        conn = self._db.conn
+        placeholders = ",".join("?" * len(buckets))
+        rows = conn.execute(
+            "SELECT id, cache_key, signature FROM semantic_entries WHERE id IN ("
+            f"SELECT DISTINCT entry_id FROM semantic_buckets WHERE bucket IN ({placeholders})"
+            ") AND scope = ? AND created_at >= ? ORDER BY id DESC LIMIT ?",
+            (*buckets, scope, time.time() - self.expire_time, self.MAX_CANDIDATES)
+        ).fetchall()
+
+        best_key, best_score = None, 0.0
+        for _, cache_key, blob in rows:
+            score = similarity(signature, _SIGNATURE.unpack(blob))
+            if score > best_score:
+                best_key, best_score = cache_key, score
+
+        with self._lock:
+            self.lookups += 1
+            self.candidates += len(rows)
+            if best_score >= self.threshold:
+                self.hits += 1
+        if best_score >= self.threshold:
+            logger.info(f"语义缓存命中: 相似度={best_score:.2f}, 候选数={len(rows)}")
+            return best_key
+        return None
+
+    def add(self, scope: str, text: str, cache_key: str) -> None:
+        """
+        把请求加入索引
+
+        Args:
+            scope: 匹配范围
+            text: 原始输入文本
+            cache_key: 生成结果的精确缓存键
+        """
+        signature = minhash(normalize_text(text), self.ngram)
+        conn = self._db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO semantic_entries (scope, cache_key, signature, created_at) VALUES (?, ?, ?, ?)",
+                (scope, cache_key, _SIGNATURE.pack(*signature), time.time())
+            )
+            entry_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO semantic_buckets (bucket, entry_id) VALUES (?, ?)",
+                [(bucket, entry_id) for bucket in _band_buckets(scope, signature)]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._adds += 1
+            purge = self._adds % 100 == 0
+        if purge:
+            self.purge()
+
+    def purge(self) -> None:
+        """删除过期和超出数量上限的最早条目"""
+        conn = self._db.conn
+        cutoff = conn.execute(
+            "SELECT MAX(id) FROM semantic_entries WHERE created_at < ?",
+            (time.time() - self.expire_time,)
+        ).fetchone()[0] or 0
+        overflow = conn.execute(
+            "SELECT id FROM semantic_entries ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (self.max_entries,)
+        ).fetchone()
+        if overflow:
+            cutoff = max(cutoff, overflow[0])
+        if cutoff:
+            conn.execute("DELETE FROM semantic_buckets WHERE entry_id <= ?", (cutoff,))
+            conn.execute("DELETE FROM semantic_entries WHERE id <= ?", (cutoff,))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 查询数、命中数、命中率和平均候选数
+        """
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "avg_candidates": round(self.candidates / self.lookups, 2) if self.lookups else 0.0,
+                "threshold": self.threshold,
+            }
@@ -0,0 +1,243 @@
+"""
+请求合并（single-flight）模块
+
+相同键的并发请求只执行一次上游调用，其余请求等待并共享结果。
+- 进程内：同一worker中的相同请求等待同一个任务
+- 跨进程：配置了共享锁存储时，其他worker中的相同请求等待持锁者完成，
+  然后通过 recheck（通常是查询共享缓存）获取结果
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .sqlite import ThreadLocalConnection
+from .stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class SQLiteLockStore:
+    """
+    基于SQLite的跨进程锁存储
+
+    锁带有租约时间，持有期间由持有者定期续租，持锁进程崩溃后租约到期，锁会自动失效。
+
+    属性：
+        path: 数据库文件路径
+        lease_seconds: 锁的租约时间（秒）
+    """
+
+    def __init__(self, path: str, lease_seconds: float):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._db = ThreadLocalConnection(path)
+        self._db.conn.execute(
+            "CREATE TABLE IF NOT EXISTS locks ("
+            "key TEXT PRIMARY KEY, "
+            "owner TEXT NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+
+    def try_acquire(self, key: str, owner: str) -> bool:
+        """
+        尝试获取锁
+
+        Args:
+            key: 锁的键
+            owner: 持有者标识
+
+        Returns:
+            bool: 是否获取成功
+        """
+        now = time.time()
+        conn = self._db.conn
+        conn.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, owner, now + self.lease_seconds)
+        )
+        return cursor.rowcount == 1
+
+    def renew(self, key: str, owner: str) -> bool:
+        """
+        延长锁的租约
+
+        Args:
+            key: 锁的键
+            owner: 持有者标识
+
+        Returns:
+            bool: 锁仍由 owner 持有时返回True，已过期被其他进程获取时返回False
+        """
+        cursor = self._db.conn.execute(
+            "UPDATE locks SET expires_at = ? WHERE key = ? AND owner = ?",
+            (time.time() + self.lease_seconds, key, owner)
+        )
+        return cursor.rowcount > 0
+
+    def release(self, key: str, owner: str) -> None:
+        """
+        释放锁，只会释放自己持有的锁
+
+        Args:
+            key: 锁的键
+            owner: 持有者标识
+        """
+        self._db.conn.execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+class SingleFlight:
+    """
+    请求合并器
+
+    属性：
+        name: 名称，用于统计输出
+        lock_store: 跨进程锁存储，为None时只在进程内合并
+        poll_interval: 等待其他进程释放锁时的轮询间隔（秒）
+        wait_timeout: 等待其他进程的最长时间（秒），超时后自行执行
+    """
+
+    def __init__(
+        self,
+        name: str,
+        lock_store: Optional[SQLiteLockStore] = None,
+        poll_interval: float = 0.5,
+        wait_timeout: float = 600
+    ):
+        self.name = name
+        self.lock_store = lock_store
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced_local = 0
+        self.coalesced_remote = 0
+        self.remote_waits = 0
+
+        register_stats(f"singleflight_{name}", self.stats)
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        recheck: Optional[Callable[[], Awaitable[Optional[T]]]] = None
+    ) -> T:
+        """
+        执行或等待相同键的调用
+
+        Args:
+            key: 合并键，相同键的并发调用只执行一次
+            fn: 实际执行的异步函数
+            recheck: 等待其他进程完成后调用，返回非None时直接使用该结果
+
+        Returns:
+            T: fn的返回值，或共享的结果
+
+        Raises:
+            Exception: fn抛出的异常会传递给所有等待者
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self._count("coalesced_local")
+            logger.info(f"合并进程内相同请求: {self.name}, key={key}")
+            return await asyncio.shield(task)
+
+        # 在独立任务中执行，某个调用方被取消不会影响其他等待者
+        task = asyncio.ensure_future(self._lead(key, fn, recheck))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        recheck: Optional[Callable[[], Awaitable[Optional[T]]]]
+    ) -> T:
+        """作为进程内的执行者，必要时先获取跨进程锁"""
+        if self.lock_store is None:
+            self._count("leaders")
+            return await fn()
+
+        held, waited = await self._acquire_remote(key)
+        heartbeat = asyncio.create_task(self._heartbeat(key)) if held else None
+        try:
+            if waited and recheck is not None:
+                # 其他进程已经执行过相同请求，先检查共享结果
+                result = await recheck()
+                if result is not None:
+                    self._count("coalesced_remote")
+                    logger.info(f"合并跨进程相同请求: {self.name}, key={key}")
+                    return result
+            self._count("leaders")
+            return await fn()
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            if held:
+                await asyncio.to_thread(self.lock_store.release, key, self._owner)
+
+    async def _heartbeat(self, key: str) -> None:
+        """
+        持锁期间定期续租
+
+        每隔租约时间的三分之一续租一次，执行时间超过租约时其他进程也不会重复执行。
+        锁已被其他进程获取时停止续租。
+        """
+        interval = self.lock_store.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(self.lock_store.renew, key, self._owner):
+                    logger.warning(f"跨进程锁已被其他进程获取: {self.name}, key={key}")
+                    return
+            except Exception as e:
+                logger.error(f"跨进程锁续租失败: {self.name}, key={key}, {str(e)}")
+
+    async def _acquire_remote(self, key: str) -> Tuple[bool, bool]:
+        """
+        获取跨进程锁
+
+        Returns:
+            Tuple[bool, bool]: (是否持有锁, 是否等待过其他进程)
+        """
+        if await asyncio.to_thread(self.lock_store.try_acquire, key, self._owner):
+            return True, False
+
+        self._count("remote_waits")
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            if await asyncio.to_thread(self.lock_store.try_acquire, key, self._owner):
+                return True, True
+        logger.warning(f"等待其他进程超时，自行执行: {self.name}, key={key}")
+        return False, True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 执行次数、进程内和跨进程合并次数
+        """
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced_local": self.coalesced_local,
+                "coalesced_remote": self.coalesced_remote,
+                "remote_waits": self.remote_waits,
+                "in_flight": len(self._tasks),
+            }
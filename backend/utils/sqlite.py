@@ -0,0 +1,54 @@
+"""
+SQLite工具模块
+
+提供多线程、多进程共享同一个SQLite数据库文件时使用的连接管理。
+"""
+
+import os
+import sqlite3
+import threading
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    打开SQLite连接并启用WAL模式
+
+    WAL模式允许多个worker进程同时读、单个进程写，适合作为进程间共享的本地存储。
+
+    Args:
+        path: 数据库文件路径
+
+    Returns:
+        sqlite3.Connection: 数据库连接（自动提交模式）
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+class ThreadLocalConnection:
+    """
+    线程本地的SQLite连接
+
+    sqlite3连接不能安全地在线程间并发使用，这里为每个线程维护独立的连接。
+
+    属性：
+        path: 数据库文件路径
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取当前线程的连接，不存在时创建"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path)
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,44 @@
+"""
+Server-Sent Events 工具模块
+
+提供SSE消息格式化和响应构建的辅助函数。
+"""
+
+import json
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+# SSE响应头：禁用缓存，并关闭Nginx的代理缓冲，保证事件实时送达
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    格式化一条SSE消息
+
+    Args:
+        event: 事件名称
+        data: 事件数据，会被序列化为JSON
+
+    Returns:
+        str: 符合SSE协议的消息文本
+    """
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+def sse_response(events: AsyncIterator[str], background: Optional[BackgroundTask] = None) -> StreamingResponse:
+    """
+    构建SSE流式响应
+
+    Args:
+        events: 产生已格式化SSE消息的异步迭代器
+        background: 响应结束（包括客户端断开）后执行的任务
+
+    Returns:
+        StreamingResponse: text/event-stream 响应
+    """
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS, background=background)
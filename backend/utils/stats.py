@@ -0,0 +1,40 @@
+"""
+运行时统计模块
+
+各组件（线程池、缓存等）在这里注册自己的统计函数，
+由 /stats 端点统一汇总输出，便于观察当前 worker 的运行状态。
+"""
+
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# 统计函数注册表：名称 -> 返回统计字典的函数
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_stats(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """
+    注册统计函数
+
+    Args:
+        name: 统计项名称，如 "zhipu_executor"
+        provider: 无参函数，返回当前的统计字典
+    """
+    _providers[name] = provider
+
+def collect_stats() -> Dict[str, Any]:
+    """
+    汇总所有已注册组件的统计信息
+
+    Returns:
+        Dict[str, Any]: 以统计项名称为键的统计字典
+    """
+    result: Dict[str, Any] = {}
+    for name, provider in list(_providers.items()):
+        try:
+            result[name] = provider()
+        except Exception as e:
+            logger.error(f"收集统计信息失败: {name}, {str(e)}")
+            result[name] = {"error": str(e)}
+    return result
@@ -0,0 +1,86 @@
+"""
+文件存储模块
+
+把生成的文章异步写入 OUTPUT_DIR：
+- 写入在专用线程池中进行，不阻塞事件循环
+- 先写临时文件再原子重命名，读取方不会看到写了一半的文件
+- 文件名包含秒级时间戳和随机ID，同一时间生成的文章不会互相覆盖
+"""
+
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from ..config import Config
+from .executor import BoundedExecutor
+from .metrics import PERSIST_SECONDS, timed
+from .paths import OUTPUT_DIR, ROOT_DIR
+from .stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+# 进程内共享的文件写入线程池，首次写入时创建
+_executor: Optional[BoundedExecutor] = None
+
+def _get_executor() -> BoundedExecutor:
+    """获取文件写入线程池，不存在时创建"""
+    global _executor
+    if _executor is None:
+        _executor = BoundedExecutor("storage", Config.get_instance().STORAGE_MAX_WORKERS)
+        register_stats("storage_executor", _executor.stats)
+    return _executor
+
+def new_article_filename() -> str:
+    """
+    生成唯一的文章文件名
+
+    Returns:
+        str: 形如 20241220123456-1a2b3c4d.md 的文件名
+    """
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return f"{timestamp}-{uuid.uuid4().hex[:8]}.md"
+
+def write_atomic(path: str, content: str) -> None:
+    """
+    原子写入文本文件
+
+    先写入同目录下的临时文件，再通过重命名替换目标文件。
+
+    Args:
+        path: 目标文件路径
+        content: 文件内容
+
+    Raises:
+        OSError: 当文件创建或写入失败时抛出
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+async def save_article_file(content: str) -> str:
+    """
+    异步保存文章到 OUTPUT_DIR
+
+    Args:
+        content: 文章内容
+
+    Returns:
+        str: 已写入文件相对于项目根目录的路径，如 output/20241220123456-1a2b3c4d.md
+
+    Raises:
+        OSError: 当文件创建或写入失败时抛出
+    """
+    path = os.path.join(OUTPUT_DIR, new_article_filename())
+    with timed(PERSIST_SECONDS, "persist"):
+        await _get_executor().run(write_atomic, path, content)
+    return os.path.relpath(path, ROOT_DIR)
@@ -4,6 +4,8 @@
 这个模块包含了各种字符串处理的工具函数。
 """
 
+from typing import List
+
 def parse_bool(value: str) -> bool:
     """
     将字符串解析为布尔值
@@ -31,3 +33,21 @@ def parse_bool(value: str) -> bool:
         False
     """
     return str(value).lower() in ('true', '1', 'yes', 'on')
+
+def parse_list(value: str) -> List[str]:
+    """
+    将逗号分隔的字符串解析为列表
+
+    Args:
+        value: 要解析的字符串，各项前后的空白会被去掉，空项会被忽略
+
+    Returns:
+        List[str]: 解析后的列表
+
+    Examples:
+        >>> parse_list("glm-4-flash, glm-4-air")
+        ['glm-4-flash', 'glm-4-air']
+        >>> parse_list("")
+        []
+    """
+    return [item.strip() for item in str(value).split(",") if item.strip()]